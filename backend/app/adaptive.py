@@ -0,0 +1,115 @@
+from __future__ import annotations
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .models import OperatorStats
+
+CROSSOVER_ONE_POINT = "one_point"
+CROSSOVER_UNIFORM = "uniform"
+
+OPERATORS = ("crossover", "mutation", "repair")
+
+# Bits of OperatorControl.origin: the operators that made a child
+BY_CROSSOVER = 1
+BY_MUTATION = 2
+
+# Adaptive rates: population diversity (mean share of genes differing from
+# the best genome) the search aims for, and the stall length that doubles
+# the mutation pressure
+DIVERSITY_TARGET = 0.15
+STALL_SCALE = 20
+# Bounds of the adapted rates, as factors of the configured ones
+MUTATION_FACTOR_MIN = 0.25
+MUTATION_FACTOR_MAX = 4.0
+CROSSOVER_FACTOR_MIN = 0.3
+
+
+def diversity(population: np.ndarray, best_genome: np.ndarray) -> float:
+    return float(np.mean(population != best_genome)) if population.size else 0.0
+
+
+def stalled_for(best_history: List[float]) -> int:
+    # Generations since the best-so-far last improved
+    best = best_history[-1]
+    first = next(i for i, f in enumerate(best_history) if f >= best)
+    return len(best_history) - 1 - first
+
+
+class OperatorControl:
+    """Operator settings of one GA run and the credit each operator earns.
+
+    With `adaptive`, adapt() recomputes the mutation and crossover rates
+    every generation from the population diversity and the stall length
+    alone (no hidden state, so a resumed run adapts exactly as the original
+    would): a converged or stalled population mutates more and recombines
+    less, a diverse improving one mutates less. next_generation records per
+    child which operators made it and its better parent's fitness; the
+    credit_* calls turn that into OperatorStats. Crossover and mutation are
+    credited on the children as scored before repair, new bests included;
+    repair gets a new best only when it goes beyond the children's best.
+    """
+
+    def __init__(
+        self,
+        mutation_rate: float,
+        crossover_rate: float = 1.0,
+        crossover: str = CROSSOVER_ONE_POINT,
+        targeted: bool = False,
+        adaptive: bool = False,
+        stats: Optional[Dict[str, OperatorStats]] = None,
+    ):
+        self.base_mutation_rate = mutation_rate
+        self.base_crossover_rate = crossover_rate
+        self.mutation_rate = mutation_rate
+        self.crossover_rate = crossover_rate
+        self.crossover = crossover
+        self.targeted = targeted
+        self.adaptive = adaptive
+        self.stats = stats if stats is not None else {op: OperatorStats() for op in OPERATORS}
+        # Per individual of the current generation (set by next_generation)
+        self.origin: Optional[np.ndarray] = None  # BY_* bits, 0 for elites
+        self.parent_fitness: Optional[np.ndarray] = None
+
+    def adapt(self, population: np.ndarray, best_genome: np.ndarray, best_history: List[float]) -> None:
+        if not self.adaptive:
+            return
+        div = diversity(population, best_genome)
+        pressure = (1 + stalled_for(best_history) / STALL_SCALE) * (DIVERSITY_TARGET / max(div, 1e-3)) ** 0.5
+        factor = min(max(pressure, MUTATION_FACTOR_MIN), MUTATION_FACTOR_MAX)
+        self.mutation_rate = min(1.0, self.base_mutation_rate * factor)
+        # Children of near-identical parents are copies: recombine less
+        self.crossover_rate = self.base_crossover_rate * max(CROSSOVER_FACTOR_MIN, min(1.0, (div / DIVERSITY_TARGET) ** 0.5))
+
+    def begin(self, population_size: int) -> None:
+        self.origin = np.zeros(population_size, dtype=np.int8)
+        self.parent_fitness = np.zeros(population_size, dtype=np.int64)
+
+    def credit_offspring(self, fitnesses: np.ndarray, best_fitness: float) -> None:
+        # Children against their better parent and the best-so-far, as
+        # scored before repair
+        gain = fitnesses - self.parent_fitness
+        for op, bit in (("crossover", BY_CROSSOVER), ("mutation", BY_MUTATION)):
+            made = (self.origin & bit) != 0
+            better = made & (gain > 0)
+            stats = self.stats[op]
+            stats.applied += int(made.sum())
+            stats.improved += int(better.sum())
+            stats.gain += int(gain[better].sum())
+        top = int(np.argmax(fitnesses))
+        if fitnesses[top] > best_fitness:
+            for op, bit in (("crossover", BY_CROSSOVER), ("mutation", BY_MUTATION)):
+                if self.origin[top] & bit:
+                    self.stats[op].new_best += 1
+
+    def credit_repair(self, before: np.ndarray, after: np.ndarray, best_fitness: float) -> None:
+        gain = after - before
+        stats = self.stats["repair"]
+        stats.applied += int((gain != 0).sum())
+        stats.improved += int((gain > 0).sum())
+        stats.gain += int(gain[gain > 0].sum())
+        if after.max() > max(best_fitness, before.max()):
+            stats.new_best += 1
+
+    def rates(self) -> Dict[str, float]:
+        return {"mutation": round(self.mutation_rate, 6), "crossover": round(self.crossover_rate, 6)}
@@ -0,0 +1,118 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+from dotenv import load_dotenv
+
+from .models import DataScheduling
+from .schemas import GAParams, GenerateResponse
+
+load_dotenv()
+
+# Bump when a change to the engines alters the schedule a given seed yields,
+# so cached results of the old code are not served
+ENGINE_VERSION = "4"
+
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "64"))  # entries in memory, 0 disables
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR")  # optional on-disk copy, survives restarts
+RESULT_CACHE_DISK_SIZE = int(os.getenv("RESULT_CACHE_DISK_SIZE", "1000"))  # files kept in RESULT_CACHE_DIR
+
+
+def data_fingerprint(data: DataScheduling) -> str:
+    # Content hash of the master data (dataclass reprs are deterministic);
+    # unlike the snapshot markers it also changes on in-place edits
+    return hashlib.sha256(repr(data).encode()).hexdigest()
+
+
+def result_key(fingerprint: str, params: GAParams) -> str:
+    # `profile` only adds timings to the response, the schedule is the same
+    payload = {
+        "engine_version": ENGINE_VERSION,
+        "data": fingerprint,
+        "params": params.model_dump(mode="json", exclude={"profile"}),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache:
+    """LRU cache of finished runs, keyed by result_key.
+
+    Entries are kept without timings. With `directory`, every entry is also
+    written there as JSON and memory misses fall back to it; the directory
+    is trimmed to `disk_size` files, least recently written first.
+    """
+
+    def __init__(self, size: int = RESULT_CACHE_SIZE, directory: Optional[str] = RESULT_CACHE_DIR, disk_size: int = RESULT_CACHE_DISK_SIZE):
+        self.size = size
+        self.directory = Path(directory) if directory else None
+        self.disk_size = disk_size
+        self._entries: "OrderedDict[str, GenerateResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.directory is not None and size > 0:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> Optional[GenerateResponse]:
+        if self.size <= 0:
+            return None
+        with self._lock:
+            resp = self._entries.get(key)
+            if resp is not None:
+                self._entries.move_to_end(key)
+                return resp
+        resp = self._read(key)
+        if resp is not None:
+            self._remember(key, resp)
+        return resp
+
+    def put(self, key: str, resp: GenerateResponse) -> None:
+        if self.size <= 0:
+            return
+        resp = resp.model_copy(update={"timings": None})
+        self._remember(key, resp)
+        self._write(key, resp)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.directory is not None:
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def _remember(self, key: str, resp: GenerateResponse) -> None:
+        with self._lock:
+            self._entries[key] = resp
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def _read(self, key: str) -> Optional[GenerateResponse]:
+        if self.directory is None:
+            return None
+        path = self.directory / f"{key}.json"
+        try:
+            return GenerateResponse.model_validate_json(path.read_bytes())
+        except (OSError, ValueError):
+            # missing, or unreadable after a schema change: recompute
+            return None
+
+    def _write(self, key: str, resp: GenerateResponse) -> None:
+        if self.directory is None:
+            return
+        path = self.directory / f"{key}.json"
+        tmp = path.with_name(f"{key}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_text(resp.model_dump_json(), encoding="utf-8")
+            os.replace(tmp, path)
+            files = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+            for old in files[:max(0, len(files) - self.disk_size)]:
+                old.unlink(missing_ok=True)
+        except OSError:
+            # the disk copy is best effort; the memory entry is already in place
+            tmp.unlink(missing_ok=True)
+
+
+RESULT_CACHE = ResultCache()
@@ -0,0 +1,197 @@
+from __future__ import annotations
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+import numpy as np
+
+from .models import OperatorStats
+from .schemas import GAParams
+
+load_dotenv()
+
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR")  # unset: checkpointing disabled
+CHECKPOINT_RETENTION = int(os.getenv("CHECKPOINT_RETENTION", "20"))  # runs kept, least recently saved dropped
+
+# Arrays of a GAState, one .npy file each
+_ARRAYS = ("population", "fitnesses", "hards", "best_genome", "best_history")
+_RUN_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class CheckpointError(Exception):
+    pass
+
+
+@dataclass
+class GAState:
+    # Everything run_ga needs to continue after `generation`
+    generation: int
+    population: np.ndarray  # (N, T, GENOME_WIDTH)
+    fitnesses: np.ndarray  # (N,)
+    hards: np.ndarray  # (N,)
+    best_genome: np.ndarray  # (T, GENOME_WIDTH)
+    best_fitness: int
+    best_hard: int
+    best_history: np.ndarray  # best-so-far fitness per generation 0..generation
+    # random.Random.getstate() and the numpy bit generator state of the run
+    rng: Tuple[tuple, dict]
+    evaluations: int = 0
+    evaluation_cache_hits: int = 0
+    operators: Dict[str, OperatorStats] = field(default_factory=dict)
+
+
+@dataclass
+class Checkpoint:
+    run_id: str
+    params: GAParams
+    fingerprint: str  # cache.data_fingerprint of the data the run works on
+    saved_at: float
+    state: GAState
+
+
+def checkpointable(params: GAParams) -> bool:
+    # Only the single-population GA loop writes checkpoints
+    return params.engine == "ga" and params.islands == 1 and not params.decompose
+
+
+class CheckpointStore:
+    """GA run snapshots on disk, one directory per run id.
+
+    Each save writes a new generation directory (raw .npy arrays plus a small
+    meta.json, no per-gene text) and then atomically repoints `latest` at
+    it, so a crash mid-write leaves the previous snapshot readable. load()
+    memory-maps the arrays. Without a directory the store is disabled.
+    """
+
+    def __init__(self, directory: Optional[str] = CHECKPOINT_DIR, retention: int = CHECKPOINT_RETENTION):
+        self.directory = Path(directory) if directory else None
+        self.retention = retention
+        self._lock = threading.Lock()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def _run_dir(self, run_id: str) -> Path:
+        if self.directory is None:
+            raise CheckpointError("Checkpoint tidak aktif (CHECKPOINT_DIR belum diatur)")
+        if not _RUN_ID.match(run_id):
+            raise CheckpointError(f"Checkpoint {run_id} tidak ditemukan")
+        return self.directory / run_id
+
+    def saver(self, run_id: str, params: GAParams, fingerprint: str) -> Callable[[GAState], None]:
+        return lambda state: self.save(run_id, params, fingerprint, state)
+
+    def save(self, run_id: str, params: GAParams, fingerprint: str, state: GAState) -> None:
+        run_dir = self._run_dir(run_id)
+        name = f"g{state.generation:06d}"
+        target = run_dir / name
+        tmp = run_dir / f"{name}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        for key in _ARRAYS:
+            np.save(tmp / f"{key}.npy", np.asarray(getattr(state, key)), allow_pickle=False)
+        py_state, np_state = state.rng
+        meta = {
+            "run_id": run_id,
+            "params": params.model_dump(mode="json"),
+            "fingerprint": fingerprint,
+            "saved_at": time.time(),
+            "generation": state.generation,
+            "best_fitness": state.best_fitness,
+            "best_hard": state.best_hard,
+            "rng": [[py_state[0], list(py_state[1]), py_state[2]], np_state],
+            "evaluations": state.evaluations,
+            "evaluation_cache_hits": state.evaluation_cache_hits,
+            "operators": {op: asdict(stats) for op, stats in state.operators.items()},
+        }
+        (tmp / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp, target)
+        pointer = run_dir / "latest.tmp"
+        pointer.write_text(name, encoding="utf-8")
+        os.replace(pointer, run_dir / "latest")
+        for old in run_dir.iterdir():
+            if old.is_dir() and old.name != name:
+                shutil.rmtree(old, ignore_errors=True)
+        self._prune()
+
+    def _latest(self, run_id: str) -> Path:
+        run_dir = self._run_dir(run_id)
+        try:
+            return run_dir / (run_dir / "latest").read_text(encoding="utf-8").strip()
+        except OSError:
+            raise CheckpointError(f"Checkpoint {run_id} tidak ditemukan")
+
+    def meta(self, run_id: str) -> dict:
+        try:
+            return json.loads((self._latest(run_id) / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            raise CheckpointError(f"Checkpoint {run_id} tidak ditemukan")
+
+    def load(self, run_id: str) -> Checkpoint:
+        meta = self.meta(run_id)
+        path = self._latest(run_id)
+        try:
+            arrays = {key: np.load(path / f"{key}.npy", mmap_mode="r") for key in _ARRAYS}
+        except (OSError, ValueError):
+            raise CheckpointError(f"Checkpoint {run_id} rusak")
+        py_state, np_state = meta["rng"]
+        return Checkpoint(
+            run_id=run_id,
+            params=GAParams.model_validate(meta["params"]),
+            fingerprint=meta["fingerprint"],
+            saved_at=meta["saved_at"],
+            state=GAState(
+                generation=meta["generation"],
+                best_fitness=meta["best_fitness"],
+                best_hard=meta["best_hard"],
+                rng=((py_state[0], tuple(py_state[1]), py_state[2]), np_state),
+                evaluations=meta["evaluations"],
+                evaluation_cache_hits=meta["evaluation_cache_hits"],
+                operators={op: OperatorStats(**stats) for op, stats in meta.get("operators", {}).items()},
+                **arrays,
+            ),
+        )
+
+    def list(self) -> List[dict]:
+        # meta.json of every run, most recently saved first
+        if self.directory is None:
+            return []
+        metas = []
+        for run_dir in self.directory.iterdir():
+            try:
+                metas.append(self.meta(run_dir.name))
+            except CheckpointError:
+                continue
+        return sorted(metas, key=lambda m: -m["saved_at"])
+
+    def delete(self, run_id: str) -> None:
+        run_dir = self._run_dir(run_id)
+        if not run_dir.exists():
+            raise CheckpointError(f"Checkpoint {run_id} tidak ditemukan")
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+    def _prune(self) -> None:
+        with self._lock:
+            runs = []
+            for run_dir in self.directory.iterdir():  # type: ignore[union-attr]
+                try:
+                    runs.append(((run_dir / "latest").stat().st_mtime, run_dir))
+                except OSError:
+                    continue
+            runs.sort(reverse=True)
+            for _, run_dir in runs[self.retention:]:
+                shutil.rmtree(run_dir, ignore_errors=True)
+
+
+CHECKPOINTS = CheckpointStore()
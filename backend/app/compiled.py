@@ -0,0 +1,305 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .models import Assignment, DataScheduling
+
+# Genome layout: one row per task (data.kelas_matkul order) holding only the
+# decision variables as dense indices. Kelas/matkul are fixed per task and
+# shared through CompiledProblem.task_kelas / task_matkul.
+GENOME_SLOT = 0
+GENOME_RUANGAN = 1
+GENOME_DOSEN = 2
+GENOME_WIDTH = 3
+GENOME_DTYPE = np.int32
+
+# Above this many (individual, slot, entity) cells the conflict counter
+# switches from one bincount to a per-row sort, to bound memory.
+_BINCOUNT_MAX_CELLS = 1 << 24
+
+# Genomes remembered by a FitnessCache before it starts over
+FITNESS_CACHE_LIMIT = 100_000
+
+
+@dataclass
+class CompiledProblem:
+    # Dense index -> database id, per entity
+    dosen_ids: np.ndarray
+    matkul_ids: np.ndarray
+    kelas_ids: np.ndarray
+    ruangan_ids: np.ndarray
+    slot_ids: np.ndarray
+    # Database id -> dense index, per entity
+    dosen_pos: Dict[int, int]
+    matkul_pos: Dict[int, int]
+    kelas_pos: Dict[int, int]
+    ruangan_pos: Dict[int, int]
+    slot_pos: Dict[int, int]
+    # Fixed per-task columns, dense indices
+    task_kelas: np.ndarray  # (T,)
+    task_matkul: np.ndarray  # (T,)
+    # Lookup tables
+    kelas_size: np.ndarray  # (K,) jumlah_mahasiswa
+    ruang_cap: np.ndarray  # (R,) kapasitas
+    pref_violation: np.ndarray  # (D, S) True when S2 is violated
+    dosen_batas_sks: np.ndarray  # (D,)
+    # Per-matkul domains: rooms of the required type, qualified lecturers
+    # (every lecturer when nobody lists the matkul)
+    matkul_rooms: List[List[int]]
+    matkul_dosen: List[List[int]]
+    # Per-task candidate table, built once per problem. Rooms are type- and
+    # capacity-feasible, falling back to type-only and then to every room.
+    # Lists are shared between tasks with the same candidates: treat as read-only.
+    task_rooms: List[List[int]]
+    task_dosen: List[List[int]]
+    task_sks: np.ndarray  # (T,)
+
+    @cached_property
+    def over_cap_table(self) -> List[List[bool]]:
+        # [kelas][ruangan] -> S1 violated; nested lists for fast scalar lookups
+        return (self.kelas_size[:, None] > self.ruang_cap[None, :]).tolist()
+
+    @cached_property
+    def pref_table(self) -> List[List[bool]]:
+        # [dosen][slot] -> S2 violated
+        return self.pref_violation.tolist()
+
+    @property
+    def n_tasks(self) -> int:
+        return len(self.task_kelas)
+
+    @property
+    def n_dosen(self) -> int:
+        return len(self.dosen_ids)
+
+    @property
+    def n_kelas(self) -> int:
+        return len(self.kelas_ids)
+
+    @property
+    def n_ruangan(self) -> int:
+        return len(self.ruangan_ids)
+
+    @property
+    def n_slot(self) -> int:
+        return len(self.slot_ids)
+
+
+def _positions(ids: List[int]) -> Tuple[np.ndarray, Dict[int, int]]:
+    return np.asarray(ids, dtype=np.int64), {i: p for p, i in enumerate(ids)}
+
+
+def compile_problem(data: DataScheduling) -> CompiledProblem:
+    dosen_ids, dosen_pos = _positions([d.id for d in data.dosen])
+    matkul_ids, matkul_pos = _positions([m.id for m in data.matkul])
+    kelas_ids, kelas_pos = _positions([k.id for k in data.kelas])
+    ruangan_ids, ruangan_pos = _positions([r.id for r in data.ruangan])
+    slot_ids, slot_pos = _positions([s.id for s in data.slot_waktu])
+
+    # Same rule as evaluate_individual: a lecturer with no preference for that
+    # day accepts any slot, otherwise the slot range must be listed.
+    pref_violation = np.zeros((len(data.dosen), len(data.slot_waktu)), dtype=bool)
+    for di, d in enumerate(data.dosen):
+        if not d.kesediaan:
+            continue
+        for si, s in enumerate(data.slot_waktu):
+            prefer = d.kesediaan.get(s.hari, [])
+            if prefer and f"{s.mulai}-{s.selesai}" not in prefer:
+                pref_violation[di, si] = True
+
+    all_rooms = list(range(len(data.ruangan)))
+    matkul_rooms = [[ri for ri, r in enumerate(data.ruangan) if r.jenis == m.jenis_ruangan] for m in data.matkul]
+    qualified: List[List[int]] = [[] for _ in data.matkul]
+    for di, d in enumerate(data.dosen):
+        for mid in d.keahlian_matkul_ids or []:
+            lst = qualified[matkul_pos[mid]] if mid in matkul_pos else None
+            if lst is not None and (not lst or lst[-1] != di):
+                lst.append(di)
+    all_dosen = list(range(len(data.dosen)))
+    matkul_dosen = [lst or all_dosen for lst in qualified]
+
+    task_kelas = [kelas_pos[km.id_kelas] for km in data.kelas_matkul]
+    task_matkul = [matkul_pos[km.id_matkul] for km in data.kelas_matkul]
+    rooms_by_key: Dict[Tuple[int, int], List[int]] = {}
+    # One list object per distinct room set, whichever keys produce it
+    rooms_by_content: Dict[Tuple[int, ...], List[int]] = {}
+    task_rooms: List[List[int]] = []
+    for k, m in zip(task_kelas, task_matkul):
+        size = data.kelas[k].jumlah_mahasiswa
+        key = (m, size)
+        if key not in rooms_by_key:
+            rooms = (
+                [r for r in matkul_rooms[m] if data.ruangan[r].kapasitas >= size]
+                or matkul_rooms[m]
+                or all_rooms
+            )
+            rooms_by_key[key] = rooms_by_content.setdefault(tuple(rooms), rooms)
+        task_rooms.append(rooms_by_key[key])
+
+    return CompiledProblem(
+        dosen_ids=dosen_ids,
+        matkul_ids=matkul_ids,
+        kelas_ids=kelas_ids,
+        ruangan_ids=ruangan_ids,
+        slot_ids=slot_ids,
+        dosen_pos=dosen_pos,
+        matkul_pos=matkul_pos,
+        kelas_pos=kelas_pos,
+        ruangan_pos=ruangan_pos,
+        slot_pos=slot_pos,
+        task_kelas=np.asarray(task_kelas, dtype=np.int64),
+        task_matkul=np.asarray(task_matkul, dtype=np.int64),
+        kelas_size=np.asarray([k.jumlah_mahasiswa for k in data.kelas], dtype=np.int64),
+        ruang_cap=np.asarray([r.kapasitas for r in data.ruangan], dtype=np.int64),
+        pref_violation=pref_violation,
+        dosen_batas_sks=np.asarray([d.batas_sks for d in data.dosen], dtype=np.int64),
+        matkul_rooms=matkul_rooms,
+        matkul_dosen=matkul_dosen,
+        task_rooms=task_rooms,
+        task_dosen=[matkul_dosen[m] for m in task_matkul],
+        task_sks=np.asarray([data.matkul[m].sks for m in task_matkul], dtype=np.int64),
+    )
+
+
+def encode_population(problem: CompiledProblem, population: List[List[Assignment]]) -> np.ndarray:
+    # Assignment lists (task order) -> (N, T, GENOME_WIDTH) genome array
+    genomes = np.empty((len(population), problem.n_tasks, GENOME_WIDTH), dtype=GENOME_DTYPE)
+    rp, dp, sp = problem.ruangan_pos, problem.dosen_pos, problem.slot_pos
+    for i, ind in enumerate(population):
+        genomes[i] = [(sp[a.id_slot], rp[a.id_ruangan], dp[a.id_dosen]) for a in ind]
+    return genomes
+
+
+def decode_genome(problem: CompiledProblem, genome: np.ndarray) -> List[Assignment]:
+    kelas = problem.kelas_ids[problem.task_kelas].tolist()
+    matkul = problem.matkul_ids[problem.task_matkul].tolist()
+    slot = problem.slot_ids[genome[:, GENOME_SLOT]].tolist()
+    ruang = problem.ruangan_ids[genome[:, GENOME_RUANGAN]].tolist()
+    dosen = problem.dosen_ids[genome[:, GENOME_DOSEN]].tolist()
+    return [
+        Assignment(id_kelas=k, id_matkul=m, id_dosen=d, id_ruangan=r, id_slot=s)
+        for k, m, d, r, s in zip(kelas, matkul, dosen, ruang, slot)
+    ]
+
+
+def count_conflicts(slot: np.ndarray, entity: np.ndarray, n_slot: int, n_entity: int) -> np.ndarray:
+    # Sum over (slot, entity) cells of max(count - 1, 0), per row
+    n, t = slot.shape
+    if t == 0:
+        return np.zeros(n, dtype=np.int64)
+    keys = slot.astype(np.int64) * n_entity + entity
+    cells = n_slot * n_entity
+    if n * cells <= _BINCOUNT_MAX_CELLS:
+        offsets = (np.arange(n, dtype=np.int64) * cells)[:, None]
+        counts = np.bincount((keys + offsets).ravel(), minlength=n * cells).reshape(n, cells)
+        return t - np.count_nonzero(counts, axis=1)
+    keys = np.sort(keys, axis=1)
+    return np.count_nonzero(keys[:, 1:] == keys[:, :-1], axis=1)
+
+
+def evaluate_population(
+    problem: CompiledProblem,
+    population: np.ndarray,
+    w_soft_capacity: int = 1,
+    w_soft_pref: int = 1,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # population: (N, T, GENOME_WIDTH) genomes -> (hard, soft, fitness), each (N,)
+    slot = population[:, :, GENOME_SLOT]
+    ruang = population[:, :, GENOME_RUANGAN]
+    dosen = population[:, :, GENOME_DOSEN]
+    kelas = np.broadcast_to(problem.task_kelas, slot.shape)
+
+    hard = (
+        count_conflicts(slot, ruang, problem.n_slot, problem.n_ruangan)  # C1
+        + count_conflicts(slot, dosen, problem.n_slot, problem.n_dosen)  # C2
+        + count_conflicts(slot, kelas, problem.n_slot, problem.n_kelas)  # C3
+    )
+    over_capacity = problem.kelas_size[kelas] > problem.ruang_cap[ruang]  # S1
+    pref_miss = problem.pref_violation[dosen, slot]  # S2
+    soft = w_soft_capacity * over_capacity.sum(axis=1) + w_soft_pref * pref_miss.sum(axis=1)
+
+    fitness = 1000 - 100 * hard - 10 * soft
+    return hard, soft, fitness
+
+
+def violating_genes(problem: CompiledProblem, genome: np.ndarray) -> np.ndarray:
+    # (T, GENOME_WIDTH) genome -> same-shaped mask of the genes whose change
+    # can remove a violation their task is in: slot for C1/C2/C3/S2, room
+    # for C1/S1, lecturer for C2/S2
+    slot = genome[:, GENOME_SLOT].astype(np.int64)
+    ruang = genome[:, GENOME_RUANGAN]
+    dosen = genome[:, GENOME_DOSEN]
+
+    def clashing(entity: np.ndarray, n_entity: int) -> np.ndarray:
+        keys = slot * n_entity + entity
+        return np.bincount(keys)[keys] > 1
+
+    room_clash = clashing(ruang, problem.n_ruangan)  # C1
+    dosen_clash = clashing(dosen, problem.n_dosen)  # C2
+    kelas_clash = clashing(problem.task_kelas, problem.n_kelas)  # C3
+    over_capacity = problem.kelas_size[problem.task_kelas] > problem.ruang_cap[ruang]  # S1
+    pref_miss = problem.pref_violation[dosen, slot]  # S2
+    mask = np.empty(genome.shape, dtype=bool)
+    mask[:, GENOME_SLOT] = room_clash | dosen_clash | kelas_clash | pref_miss
+    mask[:, GENOME_RUANGAN] = room_clash | over_capacity
+    mask[:, GENOME_DOSEN] = dosen_clash | pref_miss
+    return mask
+
+
+class FitnessCache:
+    """Per-run memo of (hard, fitness) keyed by genome content.
+
+    Elites, children left unchanged by crossover and mutation, and the
+    duplicates tournament selection breeds are looked up instead of being
+    re-scored; only the remaining genomes go through evaluate_population.
+    Keys are the 64-bit hash of the genome bytes (a collision over 1e5
+    genomes has odds around 1e-9).
+    """
+
+    def __init__(self, problem: CompiledProblem, limit: int = FITNESS_CACHE_LIMIT):
+        self.problem = problem
+        self.limit = limit
+        self.hits = 0
+        self.misses = 0  # genomes actually scored
+        self._memo: Dict[int, Tuple[int, int]] = {}
+
+    def evaluate(self, population: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # (N, T, GENOME_WIDTH) -> (hard, fitness), each (N,)
+        n = len(population)
+        hard = np.empty(n, dtype=np.int64)
+        fitness = np.empty(n, dtype=np.int64)
+        memo = self._memo
+        keys = [hash(g.tobytes()) for g in population]
+        first: Dict[int, int] = {}  # key -> row scored for it in this batch
+        repeats: List[int] = []
+        for i, key in enumerate(keys):
+            found = memo.get(key)
+            if found is not None:
+                hard[i], fitness[i] = found
+            elif key in first:
+                repeats.append(i)
+            else:
+                first[key] = i
+        if first:
+            rows = list(first.values())
+            h, _, f = evaluate_population(self.problem, population[rows])
+            hard[rows] = h
+            fitness[rows] = f
+            if len(memo) + len(rows) > self.limit:
+                memo.clear()
+            memo.update(zip((keys[i] for i in rows), zip(h.tolist(), f.tolist())))
+        for i in repeats:
+            j = first[keys[i]]
+            hard[i], fitness[i] = hard[j], fitness[j]
+        self.misses += len(first)
+        self.hits += n - len(first)
+        return hard, fitness
+
+    def store(self, genome: np.ndarray, hard: int, fitness: int) -> None:
+        # Remember a genome changed after scoring (e.g. repaired)
+        if len(self._memo) >= self.limit:
+            self._memo.clear()
+        self._memo[hash(genome.tobytes())] = (hard, fitness)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+import heapq
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .compiled import CompiledProblem, GENOME_DTYPE, GENOME_WIDTH
+from .rng import np_random, py_random
+
+
+def _inverse(lists: List[List[int]], n: int) -> List[List[int]]:
+    # entity -> tasks that list it as a candidate
+    out: List[List[int]] = [[] for _ in range(n)]
+    for t, lst in enumerate(lists):
+        for e in lst:
+            out[e].append(t)
+    return out
+
+
+def _distinct(lists: List[List[int]]) -> Tuple[List[List[int]], List[int]]:
+    # Distinct list objects (candidate lists are shared) and each one's index per task
+    index: Dict[int, int] = {}
+    out: List[List[int]] = []
+    per_task = []
+    for lst in lists:
+        i = index.get(id(lst))
+        if i is None:
+            i = index[id(lst)] = len(out)
+            out.append(lst)
+        per_task.append(i)
+    return out, per_task
+
+
+def initialize_population_csp(problem: CompiledProblem, pop_size: int, deadline: Optional[float] = None) -> np.ndarray:
+    # Constructive initializer: most-constrained task first (smallest number
+    # of free (slot, room, lecturer) combinations), with forward checking of
+    # the remaining domains after every assignment and random tie-breaking so
+    # individuals differ. Tasks whose domain is wiped out get a random value.
+    #
+    # Free rooms / lecturers are counted per slot and distinct candidate list
+    # (tasks share lists, and an entity sits in few of them), so forward
+    # checking costs a few counter updates instead of a pass over every task
+    # that could use the room or lecturer. Tasks come from a lazy min-heap:
+    # keys only ever shrink, so a popped key is an upper bound, recomputed
+    # exactly in O(slots) and pushed back when another task may be tighter.
+    # Tasks of the same kelas are re-keyed eagerly.
+    rnd, nrnd = py_random(), np_random()
+    n_tasks = problem.n_tasks
+    n_slot, n_ruangan, n_dosen, n_kelas = problem.n_slot, problem.n_ruangan, problem.n_dosen, problem.n_kelas
+    task_kelas = problem.task_kelas.tolist()
+    task_sks = problem.task_sks.tolist()
+    batas_sks = problem.dosen_batas_sks.tolist()
+    ruang_cap = problem.ruang_cap.tolist()
+    pref = problem.pref_table
+    task_rooms = problem.task_rooms
+    task_dosen = problem.task_dosen
+    room_lists, task_rl = _distinct(task_rooms)
+    dosen_lists, task_dl = _distinct(task_dosen)
+    lists_of_room = _inverse(room_lists, n_ruangan)
+    lists_of_dosen = _inverse(dosen_lists, n_dosen)
+    kelas_tasks = _inverse([[k] for k in task_kelas], n_kelas)
+    # Candidate rooms smallest first: the first free ones are the best fit
+    rooms_by_cap = [sorted(lst, key=ruang_cap.__getitem__) for lst in room_lists]
+    slot_range = range(n_slot)
+    slots = list(slot_range)
+
+    population = np.empty((pop_size, n_tasks, GENOME_WIDTH), dtype=GENOME_DTYPE)
+    for i in range(pop_size):
+        if i and deadline is not None and time.time() >= deadline:
+            # Out of time: the individuals built so far
+            return population[:i]
+        room_used = bytearray(n_slot * n_ruangan)
+        dosen_used = bytearray(n_slot * n_dosen)
+        kelas_used = bytearray(n_slot * n_kelas)
+        dosen_load = [0] * n_dosen
+        # free rooms / lecturers per distinct candidate list and slot
+        free_rooms = [[len(lst)] * n_slot for lst in room_lists]
+        free_dosen = [[len(lst)] * n_slot for lst in dosen_lists]
+        assigned = bytearray(n_tasks)
+
+        def domain(t: int) -> int:
+            fr, fd, k = free_rooms[task_rl[t]], free_dosen[task_dl[t]], task_kelas[t]
+            return sum(fr[s] * fd[s] for s in slot_range if not kelas_used[s * n_kelas + k])
+
+        # (domain size, random tie-break, task)
+        tie = nrnd.random(n_tasks).tolist()
+        heap = [(n_slot * len(task_rooms[t]) * len(task_dosen[t]), tie[t], t) for t in range(n_tasks)]
+        heapq.heapify(heap)
+        while heap:
+            key, tb, t = heapq.heappop(heap)
+            if assigned[t]:
+                continue
+            dom = domain(t)
+            if dom < key and heap and (dom, tb) > heap[0][:2]:
+                heapq.heappush(heap, (dom, tb, t))
+                continue
+            k = task_kelas[t]
+            sks = task_sks[t]
+            fr, fd = free_rooms[task_rl[t]], free_dosen[task_dl[t]]
+            choice = None
+            if dom:
+                rnd.shuffle(slots)
+                fallback = None
+                for s in slots:
+                    if kelas_used[s * n_kelas + k] or not fr[s] or not fd[s]:
+                        continue
+                    lecturers = [d for d in task_dosen[t] if not dosen_used[s * n_dosen + d]]
+                    within = [d for d in lecturers if dosen_load[d] + sks <= batas_sks[d]] or lecturers
+                    happy = [d for d in within if not pref[d][s]]
+                    if happy:
+                        choice = (s, rnd.choice(happy))
+                        break
+                    if fallback is None:
+                        fallback = (s, rnd.choice(within))
+                choice = choice or fallback
+            if choice is not None:
+                s, d = choice
+                # best fit: smallest free candidate room, random among equals
+                base = s * n_ruangan
+                rooms: List[int] = []
+                for r in rooms_by_cap[task_rl[t]]:
+                    if not room_used[base + r]:
+                        if rooms and ruang_cap[r] > ruang_cap[rooms[0]]:
+                            break
+                        rooms.append(r)
+                r = rnd.choice(rooms)
+            else:
+                s = rnd.choice(slots)
+                r = rnd.choice(task_rooms[t])
+                d = rnd.choice(task_dosen[t])
+
+            assigned[t] = 1
+            dosen_load[d] += sks
+            population[i, t] = (s, r, d)
+
+            # Forward checking: take the cells out of every candidate list
+            if not room_used[s * n_ruangan + r]:
+                room_used[s * n_ruangan + r] = 1
+                for li in lists_of_room[r]:
+                    free_rooms[li][s] -= 1
+            if not dosen_used[s * n_dosen + d]:
+                dosen_used[s * n_dosen + d] = 1
+                for li in lists_of_dosen[d]:
+                    free_dosen[li][s] -= 1
+            if not kelas_used[s * n_kelas + k]:
+                kelas_used[s * n_kelas + k] = 1
+                for u in kelas_tasks[k]:
+                    if not assigned[u]:
+                        heapq.heappush(heap, (domain(u), tie[u], u))
+    return population
@@ -1,67 +1,242 @@
 from __future__ import annotations
 import os
 import json
-from typing import List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
-from supabase import create_client, Client
 
+from .cache import data_fingerprint
+from .compiled import CompiledProblem, compile_problem
 from .models import (
     Dosen, Matkul, Kelas, KelasMatkul, Ruangan, SlotWaktu, DataScheduling
 )
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+# "supabase" (default) or "file": read DATA_FILE instead, for offline runs
+DATA_SOURCE = os.getenv("DATA_SOURCE", "supabase")
+DATA_FILE = os.getenv("DATA_FILE", str(Path(__file__).resolve().parents[1] / "db" / "seed.json"))
+# Rows per request; keep <= the PostgREST max-rows setting (1000 by default)
+DB_PAGE_SIZE = int(os.getenv("DB_PAGE_SIZE", "1000"))
+# Seconds a snapshot is trusted without asking the DB; after that only the
+# cheap change markers are fetched. 0 re-checks on every request.
+DATA_CACHE_TTL = float(os.getenv("DATA_CACHE_TTL", "300"))
+
+TABLES = ("dosen", "matkul", "kelas", "kelas_matkul", "ruangan", "slot_waktu")
+
+# (table, row count, max id) per table. Catches inserts and deletes; in-place
+# edits are picked up when the TTL expires or via invalidate_snapshot().
+Markers = Tuple[Tuple[str, int, int], ...]
+
+_client: Optional[Client] = None
+_client_lock = threading.Lock()
 
 
 def get_client() -> Client:
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        raise RuntimeError("SUPABASE_URL or KEY not set. Create backend/.env from .env.example")
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
-
-
-def fetch_all_data() -> DataScheduling:
-    sb = get_client()
-
-    def sel(table: str, select: str = "*"):
-        res = sb.table(table).select(select).execute()
-        return res.data or []
-
-    dosen_rows = sel("dosen", "id,nama,batas_sks,kesediaan,keahlian_matkul_ids")
-    dosen: List[Dosen] = []
-    for row in dosen_rows:
-        kesediaan = row.get("kesediaan")
-        if isinstance(kesediaan, str):
-            try:
-                kesediaan = json.loads(kesediaan)
-            except Exception:
-                kesediaan = {}
-        dosen.append(Dosen(
-            id=row["id"],
-            nama=row["nama"],
-            batas_sks=row.get("batas_sks", 12),
-            kesediaan=kesediaan or {},
-            keahlian_matkul_ids=row.get("keahlian_matkul_ids") or [],
-        ))
-
-    matkul = [Matkul(**row) for row in sel("matkul", "id,nama,sks,jenis_ruangan")]  # type: ignore[arg-type]
-    kelas = [Kelas(**row) for row in sel("kelas", "id,nama,jumlah_mahasiswa")]  # type: ignore[arg-type]
-    kelas_matkul = [KelasMatkul(**row) for row in sel("kelas_matkul", "id,id_kelas,id_matkul")]  # type: ignore[arg-type]
-    ruangan = [Ruangan(**row) for row in sel("ruangan", "id,nama,jenis,kapasitas")]  # type: ignore[arg-type]
-    slot_rows = sel("slot_waktu", "id,hari,waktu_mulai,waktu_selesai")
-    slot_waktu = [
-        SlotWaktu(
-            id=row["id"], hari=row["hari"], mulai=row["waktu_mulai"], selesai=row["waktu_selesai"]
-        )
-        for row in slot_rows
-    ]
-
-    return DataScheduling(
-        dosen=dosen,
-        matkul=matkul,
-        kelas=kelas,
-        kelas_matkul=kelas_matkul,
-        ruangan=ruangan,
-        slot_waktu=slot_waktu,
+    # One long-lived client per process (created at app startup, or lazily)
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if not SUPABASE_URL or not SUPABASE_KEY:
+                    raise RuntimeError("SUPABASE_URL or KEY not set. Create backend/.env from .env.example")
+                # Imported here so DATA_SOURCE=file runs without the package
+                from supabase import create_client
+                _client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _client
+
+
+class SupabaseSource:
+    def read(self) -> "SupabaseSource":
+        # Tables are fetched per rows() call
+        return self
+
+    def rows(self, table: str, select: str = "*") -> Iterator[Dict[str, Any]]:
+        # Range-paginated read; an unpaginated select stops at max-rows
+        sb = get_client()
+        start = 0
+        while True:
+            res = sb.table(table).select(select).order("id").range(start, start + DB_PAGE_SIZE - 1).execute()
+            page = res.data or []
+            yield from page
+            if len(page) < DB_PAGE_SIZE:
+                return
+            start += DB_PAGE_SIZE
+
+    def markers(self) -> Markers:
+        sb = get_client()
+
+        def marker(table: str) -> Tuple[str, int, int]:
+            res = sb.table(table).select("id", count="exact").order("id", desc=True).limit(1).execute()
+            return (table, res.count or 0, res.data[0]["id"] if res.data else 0)
+
+        with ThreadPoolExecutor(max_workers=len(TABLES)) as pool:
+            return tuple(pool.map(marker, TABLES))
+
+
+class FileSource:
+    # JSON file shaped like the DB: {"<table>": [row, ...]} with DB column
+    # names (see scripts/seed_to_json.py)
+    def __init__(self, path: str = DATA_FILE, tables: Optional[Dict[str, List[Dict[str, Any]]]] = None):
+        self.path = Path(path)
+        self._tables = tables
+
+    def read(self) -> "FileSource":
+        # The file parsed once, for reading every table of one load
+        return FileSource(str(self.path), self._load())
+
+    def _load(self) -> Dict[str, List[Dict[str, Any]]]:
+        if self._tables is not None:
+            return self._tables
+        with self.path.open(encoding="utf-8") as f:
+            return json.load(f)
+
+    def rows(self, table: str, select: str = "*") -> Iterator[Dict[str, Any]]:
+        rows = self._load().get(table, [])
+        if select == "*":
+            yield from rows
+            return
+        columns = select.split(",")
+        for row in rows:
+            yield {c: row.get(c) for c in columns}
+
+    def markers(self) -> Markers:
+        # Any edit to the file changes its mtime/size
+        st = self.path.stat()
+        return (("file", st.st_mtime_ns, st.st_size),)
+
+
+def get_source():
+    if DATA_SOURCE == "file":
+        return FileSource()
+    if DATA_SOURCE != "supabase":
+        raise RuntimeError(f"Unknown DATA_SOURCE {DATA_SOURCE!r} (expected 'supabase' or 'file')")
+    return SupabaseSource()
+
+
+def init_source() -> None:
+    # Called at app startup: build the long-lived client when configured
+    if DATA_SOURCE == "supabase" and SUPABASE_URL and SUPABASE_KEY:
+        get_client()
+
+
+def _dosen(row: Dict[str, Any]) -> Dosen:
+    kesediaan = row.get("kesediaan")
+    if isinstance(kesediaan, str):
+        try:
+            kesediaan = json.loads(kesediaan)
+        except Exception:
+            kesediaan = {}
+    return Dosen(
+        id=row["id"],
+        nama=row["nama"],
+        batas_sks=row.get("batas_sks", 12),
+        kesediaan=kesediaan or {},
+        keahlian_matkul_ids=row.get("keahlian_matkul_ids") or [],
     )
+
+
+def _slot(row: Dict[str, Any]) -> SlotWaktu:
+    return SlotWaktu(id=row["id"], hari=row["hari"], mulai=row["waktu_mulai"], selesai=row["waktu_selesai"])
+
+
+# table -> (columns, row constructor)
+_LOADERS: Dict[str, Tuple[str, Callable[[Dict[str, Any]], Any]]] = {
+    "dosen": ("id,nama,batas_sks,kesediaan,keahlian_matkul_ids", _dosen),
+    "matkul": ("id,nama,sks,jenis_ruangan", lambda row: Matkul(**row)),
+    "kelas": ("id,nama,jumlah_mahasiswa", lambda row: Kelas(**row)),
+    "kelas_matkul": ("id,id_kelas,id_matkul", lambda row: KelasMatkul(**row)),
+    "ruangan": ("id,nama,jenis,kapasitas", lambda row: Ruangan(**row)),
+    "slot_waktu": ("id,hari,waktu_mulai,waktu_selesai", _slot),
+}
+
+
+def fetch_all_data(source=None) -> DataScheduling:
+    source = (source or get_source()).read()
+
+    def load(table: str) -> List[Any]:
+        columns, make = _LOADERS[table]
+        return [make(row) for row in source.rows(table, columns)]
+
+    # The six tables are independent: read them concurrently
+    with ThreadPoolExecutor(max_workers=len(TABLES)) as pool:
+        loaded = dict(zip(TABLES, pool.map(load, TABLES)))
+    return DataScheduling(**loaded)
+
+
+def fetch_markers(source=None) -> Markers:
+    return (source or get_source()).markers()
+
+
+@dataclass
+class Snapshot:
+    data: DataScheduling
+    markers: Markers
+    fetched_at: float
+    checked_at: float
+
+    @cached_property
+    def fingerprint(self) -> str:
+        # Content hash, keys the result cache
+        return data_fingerprint(self.data)
+
+    @cached_property
+    def problem(self) -> CompiledProblem:
+        # Compiled index structures, built once per snapshot
+        return compile_problem(self.data)
+
+
+_snapshot: Optional[Snapshot] = None
+# Guards _snapshot and _invalidations; held only to compare and swap, never
+# across a database round-trip
+_snapshot_lock = threading.Lock()
+# Serializes reloads, so a data change is read once however many requests see it
+_reload_lock = threading.Lock()
+_invalidations = 0
+
+
+def get_snapshot(force: bool = False) -> Snapshot:
+    global _snapshot
+    snap = _snapshot
+    if snap is not None and not force:
+        now = time.time()
+        if now - snap.checked_at < DATA_CACHE_TTL:
+            return snap
+        # Other requests keep using the snapshot during the check
+        markers = fetch_markers()
+        with _snapshot_lock:
+            if _snapshot is snap and markers == snap.markers:
+                snap.checked_at = now
+                return snap
+    with _reload_lock:
+        with _snapshot_lock:
+            current, invalidations = _snapshot, _invalidations
+        if current is not None and current is not snap and not force:
+            # Reloaded by another request meanwhile
+            return current
+        now = time.time()
+        source = get_source()
+        markers = fetch_markers(source)
+        fresh = Snapshot(data=fetch_all_data(source), markers=markers, fetched_at=now, checked_at=now)
+        with _snapshot_lock:
+            # Not kept when invalidated while it was being read
+            if _invalidations == invalidations:
+                _snapshot = fresh
+        return fresh
+
+
+def invalidate_snapshot() -> None:
+    global _snapshot, _invalidations
+    with _snapshot_lock:
+        _snapshot = None
+        _invalidations += 1
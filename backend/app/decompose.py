@@ -0,0 +1,207 @@
+from __future__ import annotations
+import os
+import queue
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+from .compiled import CompiledProblem, compile_problem
+from .ga import PERFECT_FITNESS, STOP_PERFECT, evaluate_individual
+from .islands import MP_CONTEXT, PROGRESS_POLL_S
+from .metrics import NO_TIMER, PhaseTimer
+from .models import Assignment, DataScheduling, OperatorStats, RunStats
+from .rng import seeded
+from .schemas import GAParams
+
+load_dotenv()
+
+# Worker processes per decomposed run (default: one per CPU); components are
+# packed into at most this many subproblems, all solved at once
+DECOMPOSE_WORKERS = int(os.getenv("DECOMPOSE_WORKERS", "0")) or (os.cpu_count() or 1)
+
+
+class PartCancelled(Exception):
+    pass
+
+
+def task_components(problem: CompiledProblem) -> List[List[int]]:
+    # Tasks interact only through a shared kelas, candidate lecturer or
+    # candidate room (slots are free for everyone, soft constraints are per
+    # lecturer/room). Union-find over kelas, lecturer and room nodes gives
+    # independent groups of tasks, largest first, each in task order.
+    n_kelas, n_dosen = problem.n_kelas, problem.n_dosen
+    parent = list(range(n_kelas + n_dosen + problem.n_ruangan))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(a: int, b: int) -> None:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[ra] = rb
+
+    # Candidate lists are shared objects (per matkul / per room key): link
+    # the members of each distinct list once, then each task to one member
+    linked = set()
+    for t, k in enumerate(problem.task_kelas.tolist()):
+        for cands, offset in ((problem.task_dosen[t], n_kelas), (problem.task_rooms[t], n_kelas + n_dosen)):
+            if not cands:
+                continue
+            if id(cands) not in linked:
+                linked.add(id(cands))
+                for c in cands[1:]:
+                    union(offset + cands[0], offset + c)
+            union(k, offset + cands[0])
+
+    groups: Dict[int, List[int]] = {}
+    for t, k in enumerate(problem.task_kelas.tolist()):
+        groups.setdefault(find(k), []).append(t)
+    return sorted(groups.values(), key=lambda g: (-len(g), g[0]))
+
+
+def pack(components: List[List[int]], parts: int) -> List[List[int]]:
+    # Longest-processing-time packing into at most `parts` subproblems of
+    # balanced size; components stay whole, tasks in order
+    if len(components) <= parts:
+        return components
+    bins: List[List[int]] = [[] for _ in range(parts)]
+    for comp in components:
+        min(bins, key=len).extend(comp)
+    return sorted((sorted(b) for b in bins if b), key=lambda b: (-len(b), b[0]))
+
+
+def subproblem(data: DataScheduling, problem: CompiledProblem, tasks: List[int]) -> DataScheduling:
+    # The tasks with their kelas, matkul, candidate lecturers and rooms, and all slots
+    kelas = sorted({int(problem.task_kelas[t]) for t in tasks})
+    matkul = sorted({int(problem.task_matkul[t]) for t in tasks})
+    dosen = sorted({d for t in tasks for d in problem.task_dosen[t]})
+    ruangan = sorted({r for t in tasks for r in problem.task_rooms[t]})
+    return DataScheduling(
+        dosen=[data.dosen[i] for i in dosen],
+        matkul=[data.matkul[i] for i in matkul],
+        kelas=[data.kelas[i] for i in kelas],
+        kelas_matkul=[data.kelas_matkul[t] for t in tasks],
+        ruangan=[data.ruangan[i] for i in ruangan],
+        slot_waktu=data.slot_waktu,
+    )
+
+
+def _solve_part(runner: Callable, params: GAParams, data: DataScheduling, index: int, events, cancel):
+    # Worker: run one subproblem, streaming progress as (index, generation,
+    # best fitness, best hard) and aborting once `cancel` is set
+    def progress(generation: int, best_fitness: float, best_hard: int) -> None:
+        if cancel.is_set():
+            raise PartCancelled()
+        events.put((index, generation, best_fitness, best_hard))
+
+    with seeded(params.seed, index):
+        best_individual, _, history, stats = runner(params, data, progress)
+    return best_individual, history, stats
+
+
+def _merge(values: List[Tuple[float, int]]) -> Tuple[float, int]:
+    # Fitness and hard violations of the whole schedule from its parts:
+    # the violations add up, so the fitness deficits do too
+    fitness = PERFECT_FITNESS - sum(PERFECT_FITNESS - f for f, _ in values)
+    return fitness, sum(h for _, h in values)
+
+
+def run_decomposed(
+    params: GAParams,
+    data: DataScheduling,
+    runner: Callable,
+    progress: Optional[Callable[[int, float, int], None]] = None,
+    problem: Optional[CompiledProblem] = None,
+    timer: PhaseTimer = NO_TIMER,
+):
+    # Split the tasks into independent components (task_components) and run
+    # `runner` (service.run_engine) on each in a process pool, then merge the
+    # schedules. Same return shape as run_ga; the history and progress are
+    # those of the merged schedule, reported per generation once every part
+    # got there. Each part gets the full params (population, generations,
+    # time limit) but no islands. With one component the whole problem goes
+    # to `runner` directly, as it does with DECOMPOSE_WORKERS=1.
+    with timer.phase("decompose"):
+        problem = problem or compile_problem(data)
+        parts = pack(task_components(problem), DECOMPOSE_WORKERS)
+    if len(parts) <= 1:
+        return runner(params, data, progress, problem, timer=timer)
+    with timer.phase("decompose"):
+        subs = [subproblem(data, problem, tasks) for tasks in parts]
+    part_params = params.model_copy(update={"islands": 1, "decompose": False, "profile": False})
+
+    # Per part, (best fitness, best hard) per generation reported so far
+    reported: List[List[Tuple[float, int]]] = [[] for _ in parts]
+    finished = [False] * len(parts)
+    emitted = 0
+
+    def drain(events) -> None:
+        while True:
+            try:
+                i, _, fit, hard = events.get_nowait()
+            except queue.Empty:
+                return
+            reported[i].append((fit, hard))
+
+    def emit(final: bool) -> None:
+        # Merged progress for every generation all parts have reached
+        nonlocal emitted
+        running = [len(h) for h, done in zip(reported, finished) if not done]
+        last = max(len(h) for h in reported) if final or not running else min(running)
+        while emitted < last:
+            progress(emitted, *_merge([h[min(emitted, len(h) - 1)] for h in reported if h]))  # type: ignore[misc]
+            emitted += 1
+
+    with timer.phase("subproblems"), MP_CONTEXT.Manager() as manager, \
+            ProcessPoolExecutor(max_workers=len(parts), mp_context=MP_CONTEXT) as pool:
+        events, cancel = manager.Queue(), manager.Event()
+        futures = [
+            pool.submit(_solve_part, runner, part_params, sub, i, events, cancel)
+            for i, sub in enumerate(subs)
+        ]
+        index = {f: i for i, f in enumerate(futures)}
+        try:
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=PROGRESS_POLL_S, return_when=FIRST_COMPLETED)
+                drain(events)
+                for f in done:
+                    finished[index[f]] = True
+                if progress is not None:
+                    emit(final=False)
+            results = [f.result() for f in futures]
+            if progress is not None:
+                emit(final=True)
+        except BaseException:
+            # Cancelled through `progress`, or a part failed: stop the others
+            cancel.set()
+            raise
+
+    with timer.phase("merge"):
+        merged: List[Optional[Assignment]] = [None] * problem.n_tasks
+        for tasks, (best_individual, _, _) in zip(parts, results):
+            for t, a in zip(tasks, best_individual):
+                merged[t] = a
+        best_individual = merged  # type: ignore[assignment]
+        best_eval = evaluate_individual(data, best_individual)
+        histories = [h for _, h, _ in results]
+        length = max(len(h) for h in histories)
+        history = [_merge([(h[min(g, len(h) - 1)], 0) for h in histories])[0] for g in range(length)]
+        stats = [s for _, _, s in results]
+        longest = max(stats, key=lambda s: s.generations)
+        stop_reason = STOP_PERFECT if all(s.stop_reason == STOP_PERFECT for s in stats) else longest.stop_reason
+        operators: Dict[str, OperatorStats] = {}
+        for s in stats:
+            for op, o in s.operators.items():
+                operators.setdefault(op, OperatorStats()).add(o)
+    return best_individual, best_eval, history, RunStats(
+        generations=longest.generations,
+        stop_reason=stop_reason,
+        evaluations=sum(s.evaluations for s in stats),
+        evaluation_cache_hits=sum(s.evaluation_cache_hits for s in stats),
+        subproblems=len(parts),
+        operators=operators,
+    )
@@ -0,0 +1,195 @@
+from __future__ import annotations
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Iterator, List, Optional
+from xml.sax.saxutils import escape
+
+from .schemas import AssignmentReadableOut
+
+# Streaming schedule exports (CSV, XLSX, iCalendar) of readable assignments.
+# Each writer yields the file in chunks of about EXPORT_CHUNK_ROWS rows, so
+# only one chunk is in memory at a time whatever the schedule size.
+EXPORT_CHUNK_ROWS = 500
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "ics": ("text/calendar; charset=utf-8", "ics"),
+}
+
+HEADER = ["Kelas", "Matkul", "Dosen", "Ruangan", "Hari", "Mulai", "Selesai"]
+HARI = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+
+# Characters XML 1.0 does not allow, even escaped
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def select(rows: List[AssignmentReadableOut], by: Optional[str] = None, entity_id: Optional[int] = None) -> List[AssignmentReadableOut]:
+    # Rows of one dosen/kelas/ruangan (`by` + `entity_id`), or all rows
+    # grouped by `by`; each group in slot order
+    if by is None:
+        return rows
+    key = f"id_{by}"
+    if entity_id is not None:
+        rows = [r for r in rows if getattr(r, key) == entity_id]
+    return sorted(rows, key=lambda r: (getattr(r, by), getattr(r, key), r.id_slot))
+
+
+def _split_slot(slot: str):
+    # "Senin 07:00-09:00" -> ("Senin", "07:00", "09:00")
+    hari, _, jam = slot.partition(" ")
+    mulai, _, selesai = jam.partition("-")
+    return hari, mulai, selesai
+
+
+def _fields(r: AssignmentReadableOut) -> List[str]:
+    return [r.kelas, r.matkul, r.dosen, r.ruangan, *_split_slot(r.slot)]
+
+
+def _chunks(rows: List[AssignmentReadableOut]) -> Iterator[List[AssignmentReadableOut]]:
+    for i in range(0, len(rows), EXPORT_CHUNK_ROWS):
+        yield rows[i:i + EXPORT_CHUNK_ROWS]
+
+
+def csv_stream(rows: List[AssignmentReadableOut]) -> Iterator[bytes]:
+    # UTF-8 with BOM so spreadsheet apps detect the encoding
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write("\ufeff")
+    writer.writerow(HEADER)
+    for chunk in _chunks(rows):
+        writer.writerows(_fields(r) for r in chunk)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+class _Sink:
+    # Write-only, unseekable file for ZipFile: buffers what it is given
+    # until drained, so the archive can be streamed as it is written
+    def __init__(self):
+        self.parts: List[bytes] = []
+
+    def write(self, b) -> int:
+        self.parts.append(bytes(b))
+        return len(b)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        out = b"".join(self.parts)
+        self.parts.clear()
+        return out
+
+
+_XLSX_STATIC = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Jadwal" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_row(values: Iterable[str]) -> str:
+    cells = "".join(f'<c t="inlineStr"><is><t>{escape(_XML_ILLEGAL.sub("", v))}</t></is></c>' for v in values)
+    return f"<row>{cells}</row>"
+
+
+def xlsx_stream(rows: List[AssignmentReadableOut]) -> Iterator[bytes]:
+    # Minimal single-sheet workbook (inline strings, no styles), written
+    # straight into a streamed zip; no spreadsheet library needed
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:  # type: ignore[arg-type]
+        for name, xml in _XLSX_STATIC.items():
+            zf.writestr(name, xml)
+        yield sink.drain()
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(HEADER).encode("utf-8"))
+            for chunk in _chunks(rows):
+                sheet.write("".join(_xlsx_row(_fields(r)) for r in chunk).encode("utf-8"))
+                yield sink.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+def _ics_text(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _ics_line(line: str) -> str:
+    # Fold at 75 octets (RFC 5545 3.1), never inside a UTF-8 sequence
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(raw):
+        end = min(start + limit, len(raw))
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(raw[start:end].decode("utf-8"))
+        start, limit = end, 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def ics_stream(rows: List[AssignmentReadableOut], start: date, weeks: int) -> Iterator[bytes]:
+    # One weekly event per assignment for `weeks` weeks, the first on the
+    # slot's day in the week of `start`, or later. Times are floating (local
+    # campus time).
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    head = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Jadwal Kuliah GA+CSP//ID", "CALSCALE:GREGORIAN"]
+    yield "".join(_ics_line(x) for x in head).encode("utf-8")
+    for chunk in _chunks(rows):
+        out = []
+        for r in chunk:
+            hari, mulai, selesai = _split_slot(r.slot)
+            if hari not in HARI:
+                continue
+            day = start + timedelta(days=(HARI.index(hari) - start.weekday()) % 7)
+            ymd = day.strftime("%Y%m%d")
+            out += [
+                "BEGIN:VEVENT",
+                f"UID:{r.id_kelas}-{r.id_matkul}-{r.id_slot}-{r.id_ruangan}@jadwal-kuliah",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART:{ymd}T{mulai.replace(':', '')}00",
+                f"DTEND:{ymd}T{selesai.replace(':', '')}00",
+                f"RRULE:FREQ=WEEKLY;COUNT={weeks}",
+                f"SUMMARY:{_ics_text(f'{r.matkul} ({r.kelas})')}",
+                f"LOCATION:{_ics_text(r.ruangan)}",
+                f"DESCRIPTION:{_ics_text(f'Dosen: {r.dosen}')}",
+                "END:VEVENT",
+            ]
+        yield "".join(_ics_line(x) for x in out).encode("utf-8")
+    yield _ics_line("END:VCALENDAR").encode("utf-8")
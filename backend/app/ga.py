@@ -1,110 +1,153 @@
 from __future__ import annotations
-import random
-from typing import List, Tuple, Dict
-
-from .models import Assignment, DataScheduling, Evaluasi
-
-
-def build_tasks(data: DataScheduling) -> List[Tuple[int, int]]:
-    # Each task is (id_kelas, id_matkul) from kelas_matkul
-    return [(km.id_kelas, km.id_matkul) for km in data.kelas_matkul]
-
-
-def feasible_domain(data: DataScheduling) -> Dict[str, Dict[int, List[int]]]:
-    # Precompute feasible domains for rooms and lecturers per task
-    idx = data.index_by_id()
-    matkul_by_id = idx["matkul"]
-
-    # Rooms per matkul
-    rooms_for_matkul: Dict[int, List[int]] = {}
-    kelas_by_id = {k.id: k for k in data.kelas}
-    for m in data.matkul:
-        # room filter by type only; capacity will be validated per assignment using kelas size
-        rooms_for_matkul[m.id] = [r.id for r in data.ruangan if r.jenis == m.jenis_ruangan]
-
-    # Lecturer by matkul skill
-    dosen_for_matkul: Dict[int, List[int]] = {}
-    for m in data.matkul:
-        allowed = [d.id for d in data.dosen if m.id in (d.keahlian_matkul_ids or [])]
-        dosen_for_matkul[m.id] = allowed if allowed else [d.id for d in data.dosen]
-
-    # All slots allowed initially
-    slots_for_all = [s.id for s in data.slot_waktu]
-
-    return {
-        "rooms_for_matkul": rooms_for_matkul,
-        "dosen_for_matkul": dosen_for_matkul,
-        "slots": {0: slots_for_all},  # dummy key to reuse quickly
-    }
-
-
-def initialize_population(data: DataScheduling, pop_size: int) -> List[List[Assignment]]:
-    tasks = build_tasks(data)
-    domain = feasible_domain(data)
-
-    population: List[List[Assignment]] = []
-    for _ in range(pop_size):
-        individual: List[Assignment] = []
-        used_room_slot: Dict[Tuple[int, int], bool] = {}
-        used_dosen_slot: Dict[Tuple[int, int], bool] = {}
-        used_kelas_slot: Dict[Tuple[int, int], bool] = {}
-        dosen_load_sks: Dict[int, int] = {}
-        for (id_kelas, id_matkul) in tasks:
-            kelas = next(k for k in data.kelas if k.id == id_kelas)
-            mat = next(m for m in data.matkul if m.id == id_matkul)
+import copy
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple, Dict
+
+import numpy as np
+
+from .compiled import (
+    CompiledProblem, FitnessCache, GENOME_DOSEN, GENOME_DTYPE, GENOME_RUANGAN, GENOME_SLOT, GENOME_WIDTH,
+    compile_problem, decode_genome, violating_genes,
+)
+from .adaptive import BY_CROSSOVER, BY_MUTATION, CROSSOVER_ONE_POINT, CROSSOVER_UNIFORM, OperatorControl
+from .checkpoint import GAState
+from .csp import initialize_population_csp
+from .incremental import ScheduleState
+from .matching import RoomMatcher
+from .metrics import NO_TIMER, PhaseTimer
+from .rng import np_random, py_random
+from .warmstart import WarmStart
+from .models import Assignment, DataScheduling, Evaluasi, RunStats
+
+PERFECT_FITNESS = 1000
+
+STOP_MAX_GENERATIONS = "max_generations"
+STOP_PERFECT = "perfect"
+STOP_STALL = "stall"
+STOP_TIME_LIMIT = "time_limit"
+
+
+@dataclass
+class StopCriteria:
+    time_limit_s: Optional[float] = None  # wall-clock budget of the whole run, initialization included
+    stall_generations: Optional[int] = None  # stop after this many generations without improvement
+    stop_on_perfect: bool = False  # stop once the best reaches PERFECT_FITNESS
+
+    def __post_init__(self):
+        self.started = time.monotonic()
+
+    def check(self, best_history: List[float]) -> Optional[str]:
+        # best_history is best-so-far, hence non-decreasing
+        if self.stop_on_perfect and best_history[-1] >= PERFECT_FITNESS:
+            return STOP_PERFECT
+        n = self.stall_generations
+        if n and len(best_history) > n and best_history[-1] <= best_history[-1 - n]:
+            return STOP_STALL
+        if self.time_limit_s is not None and time.monotonic() - self.started >= self.time_limit_s:
+            return STOP_TIME_LIMIT
+        return None
+
+    def deadline(self) -> Optional[float]:
+        # time.time() at which the time limit runs out (None without one);
+        # wall clock, so worker processes can check it too
+        if self.time_limit_s is None:
+            return None
+        return time.time() + self.time_limit_s - (time.monotonic() - self.started)
+
+
+INIT_CSP = "csp"
+INIT_GREEDY = "greedy"
+
+# Room decoders: rooms as free genes, or derived from the slots by matching
+ROOMS_GENE = "gene"
+ROOMS_MATCHING = "matching"
+
+
+def initialize_population(
+    data: DataScheduling,
+    pop_size: int,
+    problem: Optional[CompiledProblem] = None,
+    strategy: str = INIT_CSP,
+    deadline: Optional[float] = None,
+) -> np.ndarray:
+    # Returns a (pop_size, T, GENOME_WIDTH) genome array. "csp" is the
+    # most-constrained-first initializer with forward checking (csp.py);
+    # "greedy" assigns tasks in kelas_matkul order. Past `deadline` (a
+    # time.time() value) no further individual is started: the population
+    # is cut short, keeping at least one.
+    problem = problem or compile_problem(data)
+    if strategy == INIT_CSP:
+        return initialize_population_csp(problem, pop_size, deadline)
+    n_slot, n_ruangan, n_dosen, n_kelas = problem.n_slot, problem.n_ruangan, problem.n_dosen, problem.n_kelas
+    task_kelas = problem.task_kelas.tolist()
+    task_sks = problem.task_sks.tolist()
+    batas_sks = problem.dosen_batas_sks.tolist()
+    slots = list(range(n_slot))
+    rnd = py_random()
+
+    population = np.empty((pop_size, problem.n_tasks, GENOME_WIDTH), dtype=GENOME_DTYPE)
+    for i in range(pop_size):
+        if i and deadline is not None and time.time() >= deadline:
+            return population[:i]
+        # Occupied (slot, entity) cells, encoded as slot * n_entity + entity
+        used_room_slot = set()
+        used_dosen_slot = set()
+        used_kelas_slot = set()
+        dosen_load_sks = [0] * n_dosen
+        for t, k in enumerate(task_kelas):
+            sks = task_sks[t]
             # candidate rooms: correct type and capacity >= class size
-            room_candidates = [r.id for r in data.ruangan if r.jenis == mat.jenis_ruangan and r.kapasitas >= kelas.jumlah_mahasiswa]
-            if not room_candidates:
-                room_candidates = domain["rooms_for_matkul"][id_matkul] or [r.id for r in data.ruangan]
+            room_candidates = problem.task_rooms[t][:]
             # prefer lecturers whose load would remain within batas_sks
-            raw_dosen_candidates = domain["dosen_for_matkul"][id_matkul] or [d.id for d in data.dosen]
-            feasible_dosen = [did for did in raw_dosen_candidates if (dosen_load_sks.get(did, 0) + mat.sks) <= next(d for d in data.dosen if d.id==did).batas_sks]
-            dosen_candidates = feasible_dosen or raw_dosen_candidates
-            slot_candidates = domain["slots"][0][:]
+            raw_dosen_candidates = problem.task_dosen[t]
+            dosen_candidates = [d for d in raw_dosen_candidates if dosen_load_sks[d] + sks <= batas_sks[d]] or raw_dosen_candidates[:]
+            slot_candidates = slots[:]
 
             # try to find non-conflicting assignment
-            random.shuffle(slot_candidates)
-            random.shuffle(room_candidates)
-            random.shuffle(dosen_candidates)
+            rnd.shuffle(slot_candidates)
+            rnd.shuffle(room_candidates)
+            rnd.shuffle(dosen_candidates)
             chosen = None
             for s in slot_candidates:
                 # avoid class conflict first
-                if used_kelas_slot.get((s, id_kelas)):
+                if s * n_kelas + k in used_kelas_slot:
                     continue
                 # pick a room not used at this slot
-                room = next((rid for rid in room_candidates if not used_room_slot.get((s, rid))), None)
+                room = next((r for r in room_candidates if s * n_ruangan + r not in used_room_slot), None)
                 if room is None:
                     continue
                 # pick a dosen not used at this slot
-                dos = next((did for did in dosen_candidates if not used_dosen_slot.get((s, did))), None)
+                dos = next((d for d in dosen_candidates if s * n_dosen + d not in used_dosen_slot), None)
                 if dos is None:
                     continue
                 chosen = (s, room, dos)
                 break
             if chosen is None:
                 # fallback: random
-                s = random.choice(domain["slots"][0])
-                room = random.choice(room_candidates)
-                dos = random.choice(dosen_candidates)
+                s = rnd.choice(slots)
+                room = rnd.choice(room_candidates)
+                dos = rnd.choice(dosen_candidates)
             else:
                 s, room, dos = chosen
 
-            used_kelas_slot[(s, id_kelas)] = True
-            used_room_slot[(s, room)] = True
-            used_dosen_slot[(s, dos)] = True
-            dosen_load_sks[dos] = dosen_load_sks.get(dos, 0) + mat.sks
-            individual.append(Assignment(
-                id_kelas=id_kelas,
-                id_matkul=id_matkul,
-                id_dosen=dos,
-                id_ruangan=room,
-                id_slot=s,
-            ))
-        population.append(individual)
+            used_kelas_slot.add(s * n_kelas + k)
+            used_room_slot.add(s * n_ruangan + room)
+            used_dosen_slot.add(s * n_dosen + dos)
+            dosen_load_sks[dos] += sks
+            population[i, t] = (s, room, dos)
     return population
 
 
-def evaluate_individual(data: DataScheduling, individual: List[Assignment], w_soft_capacity: int = 1, w_soft_pref: int = 1) -> Evaluasi:
+def evaluate_individual(
+    data: DataScheduling,
+    individual: List[Assignment],
+    w_soft_capacity: int = 1,
+    w_soft_pref: int = 1,
+    detail: bool = True,
+) -> Evaluasi:
+    # detail=False is the counts-only mode: no violation strings are built
+    # and the detail lists of the returned Evaluasi are empty.
     idx = data.index_by_id()
     slot_conf_room: Dict[Tuple[int, int], int] = {}
     slot_conf_dosen: Dict[Tuple[int, int], int] = {}
@@ -126,25 +169,27 @@ def evaluate_individual(data: DataScheduling, individual: List[Assignment], w_so
         slot_conf_kelas[key_kelas] = slot_conf_kelas.get(key_kelas, 0) + 1
 
     # Hard constraints
-    idx_by = data.index_by_id()
     for (slot_id, ruang_id), count in slot_conf_room.items():
         if count > 1:
             pelanggaran_keras += count - 1
-            slot = idx_by["slot"][slot_id]
-            ruang = idx_by["ruangan"][ruang_id]
-            detail_keras.append(f"C1: Konflik ruangan {ruang.nama} pada {slot.hari} {slot.mulai}-{slot.selesai} (x{count})")
+            if detail:
+                slot = idx["slot"][slot_id]
+                ruang = idx["ruangan"][ruang_id]
+                detail_keras.append(f"C1: Konflik ruangan {ruang.nama} pada {slot.hari} {slot.mulai}-{slot.selesai} (x{count})")
     for (slot_id, dosen_id), count in slot_conf_dosen.items():
         if count > 1:
             pelanggaran_keras += count - 1
-            slot = idx_by["slot"][slot_id]
-            dosen = idx_by["dosen"][dosen_id]
-            detail_keras.append(f"C2: Konflik dosen {dosen.nama} pada {slot.hari} {slot.mulai}-{slot.selesai} (x{count})")
+            if detail:
+                slot = idx["slot"][slot_id]
+                dosen = idx["dosen"][dosen_id]
+                detail_keras.append(f"C2: Konflik dosen {dosen.nama} pada {slot.hari} {slot.mulai}-{slot.selesai} (x{count})")
     for (slot_id, kelas_id), count in slot_conf_kelas.items():
         if count > 1:
             pelanggaran_keras += count - 1
-            slot = idx_by["slot"][slot_id]
-            kelas = idx_by["kelas"][kelas_id]
-            detail_keras.append(f"C3: Konflik kelas {kelas.nama} pada {slot.hari} {slot.mulai}-{slot.selesai} (x{count})")
+            if detail:
+                slot = idx["slot"][slot_id]
+                kelas = idx["kelas"][kelas_id]
+                detail_keras.append(f"C3: Konflik kelas {kelas.nama} pada {slot.hari} {slot.mulai}-{slot.selesai} (x{count})")
 
     # Soft constraints
     for a in individual:
@@ -152,61 +197,225 @@ def evaluate_individual(data: DataScheduling, individual: List[Assignment], w_so
         ruang = idx["ruangan"][a.id_ruangan]
         if kelas.jumlah_mahasiswa > ruang.kapasitas:
             pelanggaran_lunak += w_soft_capacity
-            detail_lunak.append(f"S1: Kapasitas kurang kelas {kelas.nama} ({kelas.jumlah_mahasiswa}) di ruang {ruang.nama} (kap {ruang.kapasitas})")
+            if detail:
+                detail_lunak.append(f"S1: Kapasitas kurang kelas {kelas.nama} ({kelas.jumlah_mahasiswa}) di ruang {ruang.nama} (kap {ruang.kapasitas})")
         # Dosen preference
         dosen = idx["dosen"][a.id_dosen]
         slot = idx["slot"][a.id_slot]
         prefer = dosen.kesediaan.get(slot.hari, []) if dosen.kesediaan else []
+        if not prefer:
+            continue
         time_range = f"{slot.mulai}-{slot.selesai}"
-        if prefer and (time_range not in prefer):
+        if time_range not in prefer:
             pelanggaran_lunak += w_soft_pref
-            detail_lunak.append(f"S2: Preferensi tidak cocok dosen {dosen.nama} pada {slot.hari} {time_range}")
+            if detail:
+                detail_lunak.append(f"S2: Preferensi tidak cocok dosen {dosen.nama} pada {slot.hari} {time_range}")
 
     fitness = 1000 - (100 * pelanggaran_keras) - (10 * pelanggaran_lunak)
+    # Readable lists carry the same messages; share them instead of copying
     return Evaluasi(
         pelanggaran_keras=pelanggaran_keras,
         pelanggaran_lunak=pelanggaran_lunak,
         detail_keras=detail_keras,
         detail_lunak=detail_lunak,
-        detail_keras_readable=detail_keras[:],
-        detail_lunak_readable=detail_lunak[:],
+        detail_keras_readable=detail_keras,
+        detail_lunak_readable=detail_lunak,
         fitness=fitness,
     )
 
 
-def tournament_selection(population: List[List[Assignment]], fitnesses: List[float], k: int) -> List[Assignment]:
-    candidates = random.sample(list(enumerate(population)), k=min(k, len(population)))
-    best_idx = max(candidates, key=lambda t: fitnesses[t[0]])[0]
-    return population[best_idx]
+def tournament_index(fitnesses: List[float], k: int) -> int:
+    candidates = py_random().sample(range(len(fitnesses)), k=min(k, len(fitnesses)))
+    return max(candidates, key=lambda i: fitnesses[i])
 
 
-def one_point_crossover(parent1: List[Assignment], parent2: List[Assignment]) -> Tuple[List[Assignment], List[Assignment]]:
+def one_point_crossover(parent1: np.ndarray, parent2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     if len(parent1) <= 1:
-        return parent1[:], parent2[:]
-    point = random.randint(1, len(parent1) - 1)
-    child1 = [Assignment(**vars(g)) for g in (parent1[:point] + parent2[point:])]
-    child2 = [Assignment(**vars(g)) for g in (parent2[:point] + parent1[point:])]
+        return parent1.copy(), parent2.copy()
+    point = py_random().randint(1, len(parent1) - 1)
+    child1 = np.concatenate((parent1[:point], parent2[point:]))
+    child2 = np.concatenate((parent2[:point], parent1[point:]))
     return child1, child2
 
 
-def mutate(individual: List[Assignment], data: DataScheduling, mutation_rate: float) -> None:
+def uniform_crossover(parent1: np.ndarray, parent2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Each task's whole (slot, room, lecturer) row comes from either parent,
+    # so a task never mixes genes of two placements
+    take = (np_random().random(len(parent1)) < 0.5)[:, None]
+    return np.where(take, parent1, parent2), np.where(take, parent2, parent1)
+
+
+CROSSOVERS = {CROSSOVER_ONE_POINT: one_point_crossover, CROSSOVER_UNIFORM: uniform_crossover}
+
+# Targeted mutation: weight of a task in a violation against a clean one
+TARGET_WEIGHT = 10
+
+
+def mutate(
+    genome: np.ndarray,
+    mutation_rate: float,
+    problem: CompiledProblem,
+    mutate_rooms: bool = True,
+    tasks: Optional[List[int]] = None,
+    targets: Optional[np.ndarray] = None,
+) -> int:
+    # mutate_rooms=False leaves rooms alone (they come from a room decoder);
+    # `tasks` restricts mutation to those tasks. With `targets`
+    # (compiled.violating_genes of the genome) tasks in a violation are
+    # TARGET_WEIGHT times as likely to mutate as the others, the expected
+    # number of mutations staying mutation_rate per task, and only the genes
+    # that can fix their violations are changed. Returns tasks mutated.
     if mutation_rate <= 0:
-        return
-    slot_ids = [s.id for s in data.slot_waktu]
-    for gene in individual:
-        if random.random() < mutation_rate:
-            choice = random.choice(["slot", "ruang", "dosen"])
-            if choice == "slot":
-                gene.id_slot = random.choice(slot_ids)
-            elif choice == "ruang":
-                # pick room that matches matkul type and capacity if possible
-                matkul = next(m for m in data.matkul if m.id == gene.id_matkul)
-                kelas = next(k for k in data.kelas if k.id == gene.id_kelas)
-                rooms = [r.id for r in data.ruangan if r.jenis == matkul.jenis_ruangan and r.kapasitas >= kelas.jumlah_mahasiswa] or [r.id for r in data.ruangan if r.jenis == matkul.jenis_ruangan] or [r.id for r in data.ruangan]
-                gene.id_ruangan = random.choice(rooms)
+        return 0
+    rnd, nrnd = py_random(), np_random()
+    genes = ["slot", "ruang", "dosen"] if mutate_rooms else ["slot", "dosen"]
+    columns = {"slot": GENOME_SLOT, "ruang": GENOME_RUANGAN, "dosen": GENOME_DOSEN}
+    pool = np.arange(len(genome)) if tasks is None else np.asarray(tasks, dtype=np.int64)
+    if targets is None:
+        rate = mutation_rate
+    else:
+        targets = targets[:, [columns[g] for g in genes]]
+        weight = 1 + (TARGET_WEIGHT - 1) * targets[pool].any(axis=1)
+        rate = np.minimum(1.0, mutation_rate * len(pool) * weight / max(weight.sum(), 1))
+    picked = pool[np.flatnonzero(nrnd.random(len(pool)) < rate)].tolist()
+    fixes = targets[picked].tolist() if targets is not None else None
+    for n, t in enumerate(picked):
+        options = genes
+        if fixes is not None and any(fixes[n]):
+            options = [g for g, bad in zip(genes, fixes[n]) if bad]
+        choice = rnd.choice(options)
+        if choice == "slot":
+            s = rnd.randrange(problem.n_slot)
+            genome[t, GENOME_SLOT] = s
+        elif choice == "ruang":
+            # room that matches matkul type and capacity if possible
+            r = rnd.choice(problem.task_rooms[t])
+            genome[t, GENOME_RUANGAN] = r
+        else:
+            d = rnd.choice(problem.task_dosen[t])
+            genome[t, GENOME_DOSEN] = d
+    return len(picked)
+
+
+def repair(state: ScheduleState, budget: int) -> int:
+    # Conflict-directed repair: move genes involved in C1/C2/C3 conflicts to
+    # a free (slot, room, lecturer) cell found via the occupancy counters.
+    # Each move removes at least one hard violation. Returns moves made.
+    rnd = py_random()
+    moves = 0
+    slots = list(range(state.problem.n_slot))
+    conflicted = state.conflicting_tasks()
+    rnd.shuffle(conflicted)
+    for t in conflicted:
+        if moves >= budget:
+            break
+        if not state.is_conflicting(t):
+            # already resolved by an earlier move
+            continue
+        rnd.shuffle(slots)
+        move = state.find_free(t, slots)
+        if move is not None:
+            state.apply_move(t, *move)
+            moves += 1
+    return moves
+
+
+def repair_population(
+    population: np.ndarray,
+    hards: np.ndarray,
+    fitnesses: np.ndarray,
+    problem: CompiledProblem,
+    budget: int,
+    cache: Optional[FitnessCache] = None,
+) -> int:
+    # Spend up to `budget` repair moves on individuals with hard violations,
+    # fittest first. Genomes, hards and fitnesses are updated in place, and
+    # repaired genomes are added to `cache`.
+    moves = 0
+    for i in np.argsort(-fitnesses, kind="stable").tolist():
+        if moves >= budget:
+            break
+        if hards[i] == 0:
+            continue
+        state = ScheduleState(problem, population[i])
+        used = repair(state, budget - moves)
+        if used:
+            moves += used
+            population[i] = state.genome()
+            hards[i] = state.hard
+            fitnesses[i] = state.fitness
+            if cache is not None:
+                cache.store(population[i], state.hard, state.fitness)
+    return moves
+
+
+def next_generation(
+    population: np.ndarray,
+    fitnesses: np.ndarray,
+    problem: CompiledProblem,
+    mutation_rate: float,
+    tournament_size: int,
+    elitism_count: int,
+    matcher: Optional[RoomMatcher] = None,
+    mutable: Optional[List[int]] = None,
+    timer: PhaseTimer = NO_TIMER,
+    control: Optional[OperatorControl] = None,
+) -> np.ndarray:
+    # With a matcher, offspring rooms are re-derived from their slots;
+    # `mutable` restricts mutation to those tasks. `control` supplies the
+    # crossover operator and rate, targeted mutation and the (adapted)
+    # mutation rate, and gets the origin of every child; without it every
+    # pair is crossed one-point and mutated at mutation_rate.
+    population_size = len(population)
+    new_pop = np.empty_like(population)
+    # Elitism: carry over top-k (stable, so ties keep population order)
+    elite_indices = np.argsort(-fitnesses, kind="stable")[:elitism_count]
+    new_pop[:elitism_count] = population[elite_indices]
+    crossover, crossover_rate, targeted = one_point_crossover, 1.0, False
+    if control is not None:
+        control.begin(population_size)
+        control.parent_fitness[:elitism_count] = fitnesses[elite_indices]  # type: ignore[index]
+        crossover, crossover_rate, targeted = CROSSOVERS[control.crossover], control.crossover_rate, control.targeted
+        mutation_rate = control.mutation_rate
+    rnd = py_random()
+    fit_list = fitnesses.tolist()
+    i = elitism_count
+    while i < population_size:
+        with timer.phase("selection"):
+            i1 = tournament_index(fit_list, tournament_size)
+            i2 = tournament_index(fit_list, tournament_size)
+        # The draw is skipped at rate 1 so default runs keep their random stream
+        crossed = crossover_rate >= 1 or rnd.random() < crossover_rate
+        with timer.phase("crossover"):
+            if crossed:
+                c1, c2 = crossover(population[i1], population[i2])
             else:
-                allowed = [d.id for d in data.dosen if gene.id_matkul in (d.keahlian_matkul_ids or [])] or [d.id for d in data.dosen]
-                gene.id_dosen = random.choice(allowed)
+                c1, c2 = population[i1].copy(), population[i2].copy()
+        with timer.phase("mutation"):
+            m1 = mutate(
+                c1, mutation_rate, problem, mutate_rooms=matcher is None, tasks=mutable,
+                targets=violating_genes(problem, c1) if targeted else None,
+            )
+            m2 = mutate(
+                c2, mutation_rate, problem, mutate_rooms=matcher is None, tasks=mutable,
+                targets=violating_genes(problem, c2) if targeted else None,
+            )
+        if matcher is not None:
+            with timer.phase("room_decoder"):
+                matcher.assign(c1)
+                matcher.assign(c2)
+        new_pop[i] = c1
+        if i + 1 < population_size:
+            new_pop[i + 1] = c2
+        if control is not None:
+            # A crossed child is measured against its better parent
+            both = max(fit_list[i1], fit_list[i2])
+            for j, parent, mutated in ((i, i1, m1), (i + 1, i2, m2)):
+                if j < population_size:
+                    control.origin[j] = (BY_CROSSOVER if crossed else 0) | (BY_MUTATION if mutated else 0)  # type: ignore[index]
+                    control.parent_fitness[j] = both if crossed else fit_list[parent]  # type: ignore[index]
+        i += 2
+    return new_pop
 
 
 def run_ga(
@@ -215,38 +424,170 @@ def run_ga(
     population_size: int = 60,
     mutation_rate: float = 0.2,
     tournament_size: int = 3,
+    progress: Optional[Callable[[int, float, int], None]] = None,
+    stop: Optional[StopCriteria] = None,
+    problem: Optional[CompiledProblem] = None,
+    repair_budget: int = 100,
+    init_strategy: str = INIT_CSP,
+    room_decoder: str = ROOMS_GENE,
+    start: Optional[WarmStart] = None,
+    timer: PhaseTimer = NO_TIMER,
+    checkpoint: Optional[Callable[[GAState], None]] = None,
+    checkpoint_every: int = 0,
+    resume: Optional[GAState] = None,
+    crossover: str = CROSSOVER_ONE_POINT,
+    crossover_rate: float = 1.0,
+    targeted_mutation: bool = False,
+    adaptive_rates: bool = False,
 ):
+    # progress(generation, best_fitness, best_hard) is called after the initial
+    # population and after every generation; an exception raised from it
+    # aborts the run (used for job cancellation). `stop` may end the run
+    # before max_generations; RunStats reports why and after how many.
+    # repair_budget caps the conflict-repair moves per generation (0 = off).
+    # room_decoder=ROOMS_MATCHING derives rooms from the slots (RoomMatcher).
+    # With `start`, the population is seeded from a prior schedule, mutation
+    # only touches its affected tasks and the fitness driving the search (and
+    # the history) is lowered by start.penalty per anchored task moved.
+    # `timer` accumulates the seconds spent per phase (see app.metrics).
+    # checkpoint(GAState) is called every `checkpoint_every` generations and
+    # once at the end; `resume` continues from such a state (same data and
+    # parameters apart from the stop criteria, no `start`) exactly as the
+    # interrupted run would have, the time limit counting from the resume.
+    # crossover/crossover_rate pick the recombination, targeted_mutation
+    # aims mutation at violating genes and adaptive_rates lets the rates
+    # follow diversity and stagnation (see OperatorControl); RunStats
+    # credits each operator with the improvements it took part in.
     # Initialize
-    population = initialize_population(data, population_size)
+    with timer.phase("init"):
+        problem = problem or compile_problem(data)
+        if resume is not None:
+            population = np.array(resume.population)
+        elif start is not None:
+            population = start.population(problem, population_size)
+        else:
+            population = initialize_population(
+                data, population_size, problem, init_strategy, deadline=stop.deadline() if stop is not None else None,
+            )
+    matcher = RoomMatcher(problem) if room_decoder == ROOMS_MATCHING else None
+    if matcher is not None and resume is None:
+        with timer.phase("room_decoder"):
+            matcher.assign_population(population)
+
+    # Raw (hard, fitness) per genome content: unchanged and duplicate
+    # individuals are not re-scored
+    cache = FitnessCache(problem)
 
     def eval_pop(pop):
-        evals = [evaluate_individual(data, ind) for ind in pop]
-        return [e.fitness for e in evals], evals
-
-    fitnesses, evals = eval_pop(population)
-    best = max(zip(population, evals), key=lambda x: x[1].fitness)
-    best_history: List[float] = [best[1].fitness]
+        # Counts-only batched scoring; violation strings are built once at the end
+        with timer.phase("evaluate"):
+            hard, fit = cache.evaluate(pop)
+            if start is not None:
+                fit = fit - start.penalty * start.moved(pop)
+        return hard, fit
+
+    def repair_pop(pop, hards, fitnesses):
+        with timer.phase("repair"):
+            moves = repair_population(pop, hards, fitnesses, problem, repair_budget, cache)
+        if moves and start is not None:
+            # repair stores raw fitness; re-apply the moved-task penalty
+            return eval_pop(pop)
+        return hards, fitnesses
+
+    mutable = start.free_tasks if start is not None else None
+    control = OperatorControl(
+        mutation_rate, crossover_rate, crossover, targeted_mutation, adaptive_rates,
+        stats=copy.deepcopy(resume.operators) if resume is not None and resume.operators else None,
+    )
+    # Evaluation counts of the run before `resume`
+    prior_evaluations, prior_hits = (resume.evaluations, resume.evaluation_cache_hits) if resume is not None else (0, 0)
+    if resume is not None:
+        hards, fitnesses = np.array(resume.hards), np.array(resume.fitnesses)
+        best_genome = np.array(resume.best_genome)
+        best_fitness, best_hard = resume.best_fitness, resume.best_hard
+        best_history: List[float] = resume.best_history.tolist()
+        gen = resume.generation
+        py_random().setstate(resume.rng[0])
+        np_random().bit_generator.state = resume.rng[1]
+    else:
+        hards, fitnesses = eval_pop(population)
+        if repair_budget:
+            hards, fitnesses = repair_pop(population, hards, fitnesses)
+        best_idx = int(np.argmax(fitnesses))
+        best_genome = population[best_idx].copy()
+        best_fitness = int(fitnesses[best_idx])
+        best_hard = int(hards[best_idx])
+        best_history = [best_fitness]
+        gen = 0
+    if progress is not None:
+        progress(gen, best_fitness, best_hard)
+
+    saved = gen if resume is not None else -1
+
+    def save() -> None:
+        nonlocal saved
+        with timer.phase("checkpoint"):
+            checkpoint(GAState(  # type: ignore[misc]
+                generation=gen,
+                population=population,
+                fitnesses=fitnesses,
+                hards=hards,
+                best_genome=best_genome,
+                best_fitness=best_fitness,
+                best_hard=best_hard,
+                best_history=np.asarray(best_history),
+                rng=(py_random().getstate(), np_random().bit_generator.state),
+                evaluations=prior_evaluations + cache.misses,
+                evaluation_cache_hits=prior_hits + cache.hits,
+                operators=copy.deepcopy(control.stats),
+            ))
+        saved = gen
 
+    if checkpoint is not None and saved < 0:
+        save()
     elitism_count = max(1, population_size // 10)
-    for _ in range(max_generations):
-        new_pop: List[List[Assignment]] = []
-        # Elitism: carry over top-k
-        elite_indices = sorted(range(len(population)), key=lambda i: fitnesses[i], reverse=True)[:elitism_count]
-        for ei in elite_indices:
-            new_pop.append([Assignment(**vars(g)) for g in population[ei]])
-        while len(new_pop) < population_size:
-            p1 = tournament_selection(population, fitnesses, tournament_size)
-            p2 = tournament_selection(population, fitnesses, tournament_size)
-            c1, c2 = one_point_crossover(p1, p2)
-            mutate(c1, data, mutation_rate)
-            mutate(c2, data, mutation_rate)
-            new_pop.extend([c1, c2])
-        population = new_pop[:population_size]
-        fitnesses, evals = eval_pop(population)
-        cand_best = max(zip(population, evals), key=lambda x: x[1].fitness)
-        if cand_best[1].fitness > best[1].fitness:
-            best = cand_best
-        best_history.append(best[1].fitness)
-
-    best_individual, best_eval = best
-    return best_individual, best_eval, best_history
+    if len(population) < population_size:
+        # The time limit ran out during initialization
+        stop_reason: Optional[str] = STOP_TIME_LIMIT
+    else:
+        stop_reason = stop.check(best_history) if stop else None
+    while stop_reason is None and gen < max_generations:
+        gen += 1
+        control.adapt(population, best_genome, best_history)
+        population = next_generation(
+            population, fitnesses, problem, mutation_rate, tournament_size, elitism_count, matcher, mutable, timer,
+            control,
+        )
+        hards, fitnesses = eval_pop(population)
+        control.credit_offspring(fitnesses, best_fitness)
+        if repair_budget:
+            before = fitnesses.copy()
+            hards, fitnesses = repair_pop(population, hards, fitnesses)
+            control.credit_repair(before, fitnesses, best_fitness)
+        cand_idx = int(np.argmax(fitnesses))
+        if fitnesses[cand_idx] > best_fitness:
+            best_genome = population[cand_idx].copy()
+            best_fitness = int(fitnesses[cand_idx])
+            best_hard = int(hards[cand_idx])
+        best_history.append(best_fitness)
+        if progress is not None:
+            progress(gen, best_fitness, best_hard)
+        if checkpoint is not None and checkpoint_every and gen % checkpoint_every == 0:
+            save()
+        if stop is not None:
+            stop_reason = stop.check(best_history)
+    if checkpoint is not None and saved != gen:
+        save()
+
+    # Decode and explain only the schedule that is returned
+    with timer.phase("decode"):
+        best_individual = decode_genome(problem, best_genome)
+        best_eval = evaluate_individual(data, best_individual)
+    return best_individual, best_eval, best_history, RunStats(
+        generations=gen,
+        stop_reason=stop_reason or STOP_MAX_GENERATIONS,
+        evaluations=prior_evaluations + cache.misses,
+        evaluation_cache_hits=prior_hits + cache.hits,
+        operators=control.stats,
+        rates=control.rates() if adaptive_rates else None,
+    )
@@ -0,0 +1,173 @@
+from __future__ import annotations
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .compiled import CompiledProblem, GENOME_DOSEN, GENOME_DTYPE, GENOME_RUANGAN, GENOME_SLOT, GENOME_WIDTH
+
+
+class ScheduleState:
+    """Occupancy counters and running violation totals of one individual.
+
+    Works on dense indices (see compiled.py). `move_delta` and `apply_move`
+    touch at most six counter cells, so re-scoring after a single gene change
+    is O(1) instead of a full O(T) evaluation.
+    """
+
+    def __init__(
+        self,
+        problem: CompiledProblem,
+        genome: np.ndarray,
+        w_soft_capacity: int = 1,
+        w_soft_pref: int = 1,
+    ):
+        self.problem = problem
+        self.w_soft_capacity = w_soft_capacity
+        self.w_soft_pref = w_soft_pref
+        self.n_ruangan = problem.n_ruangan
+        self.n_dosen = problem.n_dosen
+        self.n_kelas = problem.n_kelas
+        # Plain lists: scalar indexing is much cheaper than on ndarrays
+        self._over_cap = problem.over_cap_table
+        self._pref = problem.pref_table
+        self.kelas: List[int] = problem.task_kelas.tolist()
+        self.load(genome)
+
+    def load(self, genome: np.ndarray) -> None:
+        # (Re)build counters and totals from a (T, GENOME_WIDTH) genome
+        self.slot: List[int] = genome[:, GENOME_SLOT].tolist()
+        self.ruang: List[int] = genome[:, GENOME_RUANGAN].tolist()
+        self.dosen: List[int] = genome[:, GENOME_DOSEN].tolist()
+        n_slot = self.problem.n_slot
+        self.room_occ = [0] * (n_slot * self.n_ruangan)
+        self.dosen_occ = [0] * (n_slot * self.n_dosen)
+        self.kelas_occ = [0] * (n_slot * self.n_kelas)
+        self.hard = 0
+        self.soft = 0
+        for t in range(len(self.slot)):
+            self._add(t)
+
+    @property
+    def fitness(self) -> int:
+        return 1000 - 100 * self.hard - 10 * self.soft
+
+    def _soft_of(self, k: int, r: int, d: int, s: int) -> int:
+        return self.w_soft_capacity * self._over_cap[k][r] + self.w_soft_pref * self._pref[d][s]
+
+    def _add(self, t: int) -> None:
+        k, d, r, s = self.kelas[t], self.dosen[t], self.ruang[t], self.slot[t]
+        for occ, cell in (
+            (self.room_occ, s * self.n_ruangan + r),
+            (self.dosen_occ, s * self.n_dosen + d),
+            (self.kelas_occ, s * self.n_kelas + k),
+        ):
+            if occ[cell]:
+                self.hard += 1
+            occ[cell] += 1
+        self.soft += self._soft_of(k, r, d, s)
+
+    def _remove(self, t: int) -> None:
+        k, d, r, s = self.kelas[t], self.dosen[t], self.ruang[t], self.slot[t]
+        for occ, cell in (
+            (self.room_occ, s * self.n_ruangan + r),
+            (self.dosen_occ, s * self.n_dosen + d),
+            (self.kelas_occ, s * self.n_kelas + k),
+        ):
+            occ[cell] -= 1
+            if occ[cell]:
+                self.hard -= 1
+        self.soft -= self._soft_of(k, r, d, s)
+
+    @staticmethod
+    def _cell_delta(occ: List[int], old: int, new: int) -> int:
+        if old == new:
+            return 0
+        return (1 if occ[new] else 0) - (1 if occ[old] > 1 else 0)
+
+    def move_delta(
+        self,
+        t: int,
+        slot: Optional[int] = None,
+        ruang: Optional[int] = None,
+        dosen: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        # (delta_hard, delta_soft) of re-assigning task t, without applying it
+        k, od, orr, os = self.kelas[t], self.dosen[t], self.ruang[t], self.slot[t]
+        s = os if slot is None else slot
+        r = orr if ruang is None else ruang
+        d = od if dosen is None else dosen
+        dh = (
+            self._cell_delta(self.room_occ, os * self.n_ruangan + orr, s * self.n_ruangan + r)
+            + self._cell_delta(self.dosen_occ, os * self.n_dosen + od, s * self.n_dosen + d)
+            + self._cell_delta(self.kelas_occ, os * self.n_kelas + k, s * self.n_kelas + k)
+        )
+        ds = self._soft_of(k, r, d, s) - self._soft_of(k, orr, od, os)
+        return dh, ds
+
+    def move_fitness_delta(
+        self,
+        t: int,
+        slot: Optional[int] = None,
+        ruang: Optional[int] = None,
+        dosen: Optional[int] = None,
+    ) -> int:
+        dh, ds = self.move_delta(t, slot, ruang, dosen)
+        return -100 * dh - 10 * ds
+
+    def apply_move(
+        self,
+        t: int,
+        slot: Optional[int] = None,
+        ruang: Optional[int] = None,
+        dosen: Optional[int] = None,
+    ) -> None:
+        self._remove(t)
+        if slot is not None:
+            self.slot[t] = slot
+        if ruang is not None:
+            self.ruang[t] = ruang
+        if dosen is not None:
+            self.dosen[t] = dosen
+        self._add(t)
+
+    def is_conflicting(self, t: int) -> bool:
+        # Task t sits in an over-occupied room, lecturer or class cell
+        s = self.slot[t]
+        return (
+            self.room_occ[s * self.n_ruangan + self.ruang[t]] > 1
+            or self.dosen_occ[s * self.n_dosen + self.dosen[t]] > 1
+            or self.kelas_occ[s * self.n_kelas + self.kelas[t]] > 1
+        )
+
+    def conflicting_tasks(self) -> List[int]:
+        return [t for t in range(len(self.slot)) if self.is_conflicting(t)]
+
+    def find_free(self, t: int, slots: List[int]) -> Optional[Tuple[int, int, int]]:
+        # First (slot, room, lecturer) in `slots` order where task t would meet
+        # no other task: class free, a candidate room free, a candidate
+        # lecturer free (preferring one whose kesediaan fits the slot).
+        k = self.kelas[t]
+        own_s, own_r, own_d = self.slot[t], self.ruang[t], self.dosen[t]
+        rooms = self.problem.task_rooms[t]
+        lecturers = self.problem.task_dosen[t]
+        for s in slots:
+            if self.kelas_occ[s * self.n_kelas + k] - (s == own_s) > 0:
+                continue
+            base = s * self.n_ruangan
+            room = next((r for r in rooms if self.room_occ[base + r] - (s == own_s and r == own_r) == 0), None)
+            if room is None:
+                continue
+            base = s * self.n_dosen
+            free = [d for d in lecturers if self.dosen_occ[base + d] - (s == own_s and d == own_d) == 0]
+            if not free:
+                continue
+            dos = next((d for d in free if not self._pref[d][s]), free[0])
+            return s, room, dos
+        return None
+
+    def genome(self) -> np.ndarray:
+        out = np.empty((len(self.slot), GENOME_WIDTH), dtype=GENOME_DTYPE)
+        out[:, GENOME_SLOT] = self.slot
+        out[:, GENOME_RUANGAN] = self.ruang
+        out[:, GENOME_DOSEN] = self.dosen
+        return out
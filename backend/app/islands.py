@@ -0,0 +1,297 @@
+from __future__ import annotations
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from .adaptive import CROSSOVER_ONE_POINT, OperatorControl
+from .compiled import CompiledProblem, FitnessCache, compile_problem, decode_genome
+from .ga import (
+    INIT_CSP, ROOMS_GENE, ROOMS_MATCHING, STOP_MAX_GENERATIONS, STOP_TIME_LIMIT, StopCriteria, evaluate_individual, initialize_population, next_generation,
+    repair_population,
+)
+from .matching import RoomMatcher
+from .metrics import NO_TIMER, PhaseTimer
+from .models import DataScheduling, RunStats
+from .rng import seeded
+
+# Start method of the worker pools (islands, decompose, sweep). The server
+# forks from a multithreaded process (request and job threads, data
+# readers), and a forked child can inherit a lock another thread held;
+# workers get their data through initializers and arguments instead. The
+# fork server preloads the engine modules, so workers start quickly.
+MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+if MP_CONTEXT.get_start_method() == "forkserver":
+    MP_CONTEXT.set_forkserver_preload(["app.service"])
+
+# Seconds between progress polls of running workers (islands, decompose)
+PROGRESS_POLL_S = 0.1
+
+# Static problem data of a worker process, with the run's progress queue and
+# cancel flag, set once by _init_worker
+_WORKER: Optional[Tuple[DataScheduling, CompiledProblem]] = None
+_EVENTS = None
+_CANCEL = None
+# Room decoder of a worker process, built on first use (keeps its memo)
+_MATCHER: Optional[RoomMatcher] = None
+# Fitness memo of a worker process, shared by the islands it runs
+_FITNESS: Optional[FitnessCache] = None
+
+
+def _init_worker(data: DataScheduling, problem: CompiledProblem, events, cancel) -> None:
+    global _WORKER, _MATCHER, _FITNESS, _EVENTS, _CANCEL
+    _WORKER = (data, problem)
+    _EVENTS, _CANCEL = events, cancel
+    _MATCHER = None
+    _FITNESS = FitnessCache(problem)
+
+
+def _run_epoch(
+    population: Optional[np.ndarray],
+    fitnesses: Optional[np.ndarray],
+    immigrants: Optional[np.ndarray],
+    generations: int,
+    population_size: int,
+    mutation_rate: float,
+    tournament_size: int,
+    repair_budget: int,
+    init_strategy: str,
+    room_decoder: str,
+    seed: Optional[int],
+    island: int,
+    epoch: int,
+    operators: Tuple[str, float, bool] = (CROSSOVER_ONE_POINT, 1.0, False),
+    deadline: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray, List[Tuple[int, int]], Tuple[int, int]]:
+    # Evolve one island for `generations` generations inside a worker, or
+    # create it when `population` is None. Returns the population, its
+    # fitnesses, (best fitness, its hard violations) per generation,
+    # preceded by the initial best when the island was just created, and the
+    # (scored, cache hits) counts of the epoch. Each entry is also sent to
+    # the run's progress queue as it is made. Creation (keeping at least one
+    # individual) and the epoch end early at `deadline` (a time.time() value:
+    # workers share the wall clock, and an epoch may wait for a free worker);
+    # the epoch also ends once the run is cancelled. Random draws
+    # come from a stream of its own per (seed, island, epoch), whichever
+    # worker process runs the epoch.
+    cache = _FITNESS
+    scored, hits = cache.misses, cache.hits  # type: ignore[union-attr]
+
+    def report(best: Tuple[int, int]) -> None:
+        _EVENTS.put((epoch, island) + best)  # type: ignore[union-attr]
+
+    with seeded(seed, island, epoch):
+        population, fitnesses, history = _evolve(
+            population, fitnesses, immigrants, generations, population_size, mutation_rate, tournament_size,
+            repair_budget, init_strategy, room_decoder, cache, operators, deadline, report,  # type: ignore[arg-type]
+        )
+    return population, fitnesses, history, (cache.misses - scored, cache.hits - hits)  # type: ignore[union-attr]
+
+
+def _evolve(
+    population: Optional[np.ndarray],
+    fitnesses: Optional[np.ndarray],
+    immigrants: Optional[np.ndarray],
+    generations: int,
+    population_size: int,
+    mutation_rate: float,
+    tournament_size: int,
+    repair_budget: int,
+    init_strategy: str,
+    room_decoder: str,
+    cache: FitnessCache,
+    operators: Tuple[str, float, bool],
+    deadline: Optional[float],
+    report: Callable[[Tuple[int, int]], None],
+) -> Tuple[np.ndarray, np.ndarray, List[Tuple[int, int]]]:
+    # operators: (crossover, crossover_rate, targeted_mutation); the rates
+    # are not adapted on islands
+    global _MATCHER
+    data, problem = _WORKER  # type: ignore[misc]
+    history: List[Tuple[int, int]] = []
+    if room_decoder == ROOMS_MATCHING and _MATCHER is None:
+        _MATCHER = RoomMatcher(problem)
+    matcher = _MATCHER if room_decoder == ROOMS_MATCHING else None
+
+    def best_of(hard: np.ndarray, fit: np.ndarray) -> Tuple[int, int]:
+        i = int(np.argmax(fit))
+        return int(fit[i]), int(hard[i])
+
+    if population is None:
+        population = initialize_population(data, population_size, problem, init_strategy, deadline=deadline)
+        if matcher is not None:
+            matcher.assign_population(population)
+        hard, fitnesses = cache.evaluate(population)
+        if repair_budget:
+            repair_population(population, hard, fitnesses, problem, repair_budget, cache)
+        history.append(best_of(hard, fitnesses))
+        report(history[-1])
+    if immigrants is not None and len(immigrants):
+        # Migrants replace the worst individuals
+        worst = np.argsort(fitnesses, kind="stable")[:len(immigrants)]
+        population[worst] = immigrants
+        fitnesses[worst] = cache.evaluate(immigrants)[1]
+
+    elitism_count = max(1, population_size // 10)
+    crossover, crossover_rate, targeted = operators
+    control = OperatorControl(mutation_rate, crossover_rate, crossover, targeted)
+    for _ in range(generations):
+        if _CANCEL.is_set() or (deadline is not None and time.time() >= deadline):  # type: ignore[union-attr]
+            break
+        population = next_generation(
+            population, fitnesses, problem, mutation_rate, tournament_size, elitism_count, matcher,
+            control=control,
+        )
+        hard, fitnesses = cache.evaluate(population)
+        if repair_budget:
+            repair_population(population, hard, fitnesses, problem, repair_budget, cache)
+        history.append(best_of(hard, fitnesses))
+        report(history[-1])
+    return population, fitnesses, history  # type: ignore[return-value]
+
+
+def run_islands(
+    data: DataScheduling,
+    max_generations: int = 200,
+    population_size: int = 60,
+    mutation_rate: float = 0.2,
+    tournament_size: int = 3,
+    islands: int = 4,
+    migration_interval: int = 20,
+    progress: Optional[Callable[[int, float, int], None]] = None,
+    stop: Optional[StopCriteria] = None,
+    problem: Optional[CompiledProblem] = None,
+    repair_budget: int = 100,
+    init_strategy: str = INIT_CSP,
+    room_decoder: str = ROOMS_GENE,
+    seed: Optional[int] = None,
+    timer: PhaseTimer = NO_TIMER,
+    crossover: str = CROSSOVER_ONE_POINT,
+    crossover_rate: float = 1.0,
+    targeted_mutation: bool = False,
+):
+    # Island-model GA: `islands` populations of `population_size` each evolve
+    # in a process pool and send their best individuals to the next island
+    # (ring topology) every `migration_interval` generations. The static
+    # problem data reaches each worker once, through the pool initializer;
+    # only the compact genome arrays travel per epoch. Same return shape as
+    # run_ga, the history being the best fitness over all islands. The
+    # islands are created in an epoch of their own, so `stop` sees the
+    # initial best as run_ga does; after that it is checked at epoch
+    # boundaries, while the time limit and cancellation (an exception from
+    # `progress`) also end a running epoch between generations. progress is
+    # reported per generation as soon as every island got there.
+    # Worker phases are not timed: `timer` gets the wall time of the epochs
+    # (all islands in parallel), of migration and of decoding. With a
+    # `seed` the run is reproducible (when no time limit cuts it short).
+    problem = problem or compile_problem(data)
+    migrants = max(1, population_size // 20)
+    workers = max(1, min(islands, os.cpu_count() or 1))
+
+    populations: List[Optional[np.ndarray]] = [None] * islands
+    fitnesses: List[Optional[np.ndarray]] = [None] * islands
+    immigrants: List[Optional[np.ndarray]] = [None] * islands
+    best_history: List[float] = []
+    best_hard = 0
+    stop_reason: Optional[str] = None
+    # Per island, (best fitness, best hard) per generation of the running
+    # epoch and as of the previous epochs; how many generations of the
+    # running epoch are in best_history
+    reported: List[List[Tuple[int, int]]] = []
+    last: List[Tuple[int, int]] = []
+    merged = 0
+
+    def merge(final: bool) -> None:
+        # Best over all islands of every generation they all reached; at the
+        # end of the epoch an island cut short by the deadline counts with
+        # its last best for the generations it did not run
+        nonlocal best_hard, merged
+        lengths = [len(h) for h in reported]
+        for g in range(merged, max(lengths) if final else min(lengths)):
+            fit, hard = max(h[g] if g < len(h) else h[-1] if h else last[i] for i, h in enumerate(reported))
+            if not best_history or fit > best_history[-1]:
+                best_hard = hard
+                best_history.append(fit)
+            else:
+                best_history.append(best_history[-1])
+            merged += 1
+            if progress is not None:
+                progress(len(best_history) - 1, best_history[-1], best_hard)
+
+    events, cancel = MP_CONTEXT.Queue(), MP_CONTEXT.Event()
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=MP_CONTEXT, initializer=_init_worker, initargs=(data, problem, events, cancel),
+    ) as pool:
+        done = 0
+        epoch = 0
+        scored = hits = 0
+        while not best_history or (stop_reason is None and done < max_generations):
+            # Epoch 0 only creates the islands
+            generations = min(migration_interval, max_generations - done) if epoch else 0
+            reported, merged = [[] for _ in range(islands)], 0
+            deadline = stop.deadline() if stop is not None else None
+            with timer.phase("epoch"):
+                futures = [
+                    pool.submit(
+                        _run_epoch, populations[i], fitnesses[i], immigrants[i], generations,
+                        population_size, mutation_rate, tournament_size, repair_budget, init_strategy,
+                        room_decoder, seed, i, epoch, (crossover, crossover_rate, targeted_mutation),
+                        deadline,
+                    )
+                    for i in range(islands)
+                ]
+                try:
+                    pending = set(futures)
+                    while pending:
+                        _, pending = wait(pending, timeout=PROGRESS_POLL_S, return_when=FIRST_COMPLETED)
+                        while True:
+                            try:
+                                e, i, fit, hard = events.get_nowait()
+                            except queue.Empty:
+                                break
+                            if e == epoch:
+                                reported[i].append((fit, hard))
+                        merge(final=False)
+                    results = [f.result() for f in futures]
+                    reported = [r[2] for r in results]
+                    merge(final=True)
+                except BaseException:
+                    # Cancelled through `progress`, or an island failed: stop the others
+                    cancel.set()
+                    raise
+            last = [h[-1] if h else last[i] for i, h in enumerate(reported)]
+            populations = [r[0] for r in results]
+            fitnesses = [r[1] for r in results]
+            scored += sum(r[3][0] for r in results)
+            hits += sum(r[3][1] for r in results)
+            done = len(best_history) - 1
+            epoch += 1
+            if stop is not None:
+                stop_reason = stop.check(best_history)
+            if stop_reason is None and (
+                any(len(h) < generations for h in reported) or any(len(p) < population_size for p in populations)
+            ):
+                # An island hit the deadline it was given (possibly while being created)
+                stop_reason = STOP_TIME_LIMIT
+            # Ring migration: island i receives the best of island i-1
+            if islands > 1 and generations:
+                with timer.phase("migration"):
+                    for i in range(islands):
+                        src = (i - 1) % islands
+                        top = np.argsort(-fitnesses[src], kind="stable")[:migrants]  # type: ignore[operator]
+                        immigrants[i] = populations[src][top].copy()  # type: ignore[index]
+
+    best_island = max(range(islands), key=lambda i: fitnesses[i].max())  # type: ignore[union-attr]
+    best_genome = populations[best_island][int(np.argmax(fitnesses[best_island]))]  # type: ignore[index]
+    with timer.phase("decode"):
+        best_individual = decode_genome(problem, best_genome)
+        best_eval = evaluate_individual(data, best_individual)
+    return best_individual, best_eval, best_history, RunStats(
+        generations=done, stop_reason=stop_reason or STOP_MAX_GENERATIONS, evaluations=scored, evaluation_cache_hits=hits,
+    )
@@ -0,0 +1,147 @@
+from __future__ import annotations
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+from dotenv import load_dotenv
+
+from .checkpoint import Checkpoint
+from .metrics import record_queue_wait
+from .schemas import GAParams, GenerateResponse
+
+load_dotenv()
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", "16"))  # queued + running
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", "100"))  # finished jobs kept in memory
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobConflict(Exception):
+    # Another active job writes the same checkpoint
+    pass
+
+
+@dataclass
+class Job:
+    id: str
+    params: GAParams
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # (generation, best_fitness, best_pelanggaran_keras) per generation
+    events: List[Tuple[int, float, int]] = field(default_factory=list)
+    result: Optional[GenerateResponse] = None
+    error: Optional[str] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    future: Optional[Future] = None
+    # Run id checkpoints go to (params.checkpoint_every), and the checkpoint
+    # this job continues, if it is a resume
+    checkpoint_id: Optional[str] = None
+    resume: Optional[Checkpoint] = None
+
+    def progress(self, generation: int, best_fitness: float, best_hard: int) -> None:
+        # Passed to the engine; raising here aborts the run between generations
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+        self.events.append((generation, best_fitness, best_hard))
+
+
+# runner(job) -> GenerateResponse; reports through job.progress
+Runner = Callable[["Job"], GenerateResponse]
+
+
+class JobManager:
+    def __init__(self, runner: Runner, workers: int = JOB_WORKERS, queue_limit: int = JOB_QUEUE_LIMIT, retention: int = JOB_RETENTION):
+        self.runner = runner
+        self.queue_limit = queue_limit
+        self.retention = retention
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ga-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _active(self) -> int:
+        return sum(1 for j in self._jobs.values() if j.status not in FINISHED)
+
+    def _prune(self) -> None:
+        finished = [jid for jid, j in self._jobs.items() if j.status in FINISHED]
+        for jid in finished[:max(0, len(finished) - self.retention)]:
+            del self._jobs[jid]
+
+    def submit(self, params: GAParams, resume: Optional[Checkpoint] = None) -> Job:
+        # A new run checkpoints under its job id, a resumed one under the
+        # checkpoint's run id
+        with self._lock:
+            if self._active() >= self.queue_limit:
+                raise JobQueueFull()
+            if resume is not None and self.running_checkpoint(resume.run_id):
+                raise JobConflict()
+            self._prune()
+            job = Job(id=uuid.uuid4().hex, params=params, resume=resume)
+            if resume is not None:
+                job.checkpoint_id = resume.run_id
+            elif params.checkpoint_every:
+                job.checkpoint_id = job.id
+            self._jobs[job.id] = job
+            job.future = self._pool.submit(self._run, job)
+        return job
+
+    def running_checkpoint(self, run_id: str) -> bool:
+        return any(j.checkpoint_id == run_id and j.status not in FINISHED for j in self._jobs.values())
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None or job.status in FINISHED:
+            return job
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            # Never started
+            job.status = CANCELLED
+            job.finished_at = time.time()
+        return job
+
+    def _run(self, job: Job) -> None:
+        if job.cancel_event.is_set():
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        record_queue_wait(job.started_at - job.created_at)
+        try:
+            job.result = self.runner(job)
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def shutdown(self) -> None:
+        for job in self._jobs.values():
+            job.cancel_event.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
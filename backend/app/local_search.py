@@ -0,0 +1,216 @@
+from __future__ import annotations
+import math
+import random
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .compiled import CompiledProblem, compile_problem, decode_genome
+from .ga import INIT_CSP, STOP_MAX_GENERATIONS, StopCriteria, evaluate_individual, initialize_population
+from .incremental import ScheduleState
+from .metrics import NO_TIMER, PhaseTimer
+from .rng import py_random
+from .models import DataScheduling, RunStats
+from .warmstart import WarmStart
+
+# Simulated annealing temperatures (fitness units: one hard violation = 100)
+SA_T_START = 200.0
+SA_T_END = 1.0
+
+# Tabu search: candidate moves sampled per step, tenure of a reverted value
+TABU_SAMPLE = 30
+TABU_MIN_TENURE = 7
+
+# Warm start: share of moves drawn from the affected tasks
+WARM_POOL_BIAS = 0.9
+
+# (task, slot, ruang, dosen); only one of the three is not None
+Move = Tuple[int, Optional[int], Optional[int], Optional[int]]
+
+
+def _random_move(rnd: random.Random, state: ScheduleState, n_tasks: int, n_slot: int, pool: Optional[List[int]] = None) -> Move:
+    # Change one gene of a random task, preferring conflicting tasks; with a
+    # pool (affected tasks of a warm start) mostly one of those
+    problem = state.problem
+    if pool and rnd.random() < WARM_POOL_BIAS:
+        t = rnd.choice(pool)
+    else:
+        t = rnd.randrange(n_tasks)
+        if not state.is_conflicting(t):
+            t = rnd.randrange(n_tasks)
+    kind = rnd.randrange(3)
+    if kind == 0:
+        return t, rnd.randrange(n_slot), None, None
+    if kind == 1:
+        return t, None, rnd.choice(problem.task_rooms[t]), None
+    return t, None, None, rnd.choice(problem.task_dosen[t])
+
+
+def _start_state(data: DataScheduling, problem: CompiledProblem, init_strategy: str, start: Optional[WarmStart]) -> ScheduleState:
+    if start is not None:
+        return ScheduleState(problem, start.genome)
+    genome = initialize_population(data, 1, problem, init_strategy)[0]
+    return ScheduleState(problem, genome)
+
+
+def _delta(state: ScheduleState, start: Optional[WarmStart], t: int, s: Optional[int], r: Optional[int], d: Optional[int]) -> int:
+    # Fitness change of a move, including the warm-start moved-task penalty
+    delta = state.move_fitness_delta(t, s, r, d)
+    if start is not None:
+        delta -= start.move_penalty(state, t, s, r, d)
+    return delta
+
+
+def _finish(
+    data: DataScheduling, problem: CompiledProblem, best_genome: np.ndarray, history: List[float], gen: int,
+    stop_reason: Optional[str], timer: PhaseTimer,
+):
+    with timer.phase("decode"):
+        best_individual = decode_genome(problem, best_genome)
+        best_eval = evaluate_individual(data, best_individual)
+    return best_individual, best_eval, history, RunStats(generations=gen, stop_reason=stop_reason or STOP_MAX_GENERATIONS)
+
+
+def run_sa(
+    data: DataScheduling,
+    max_generations: int = 200,
+    moves_per_generation: int = 1000,
+    progress: Optional[Callable[[int, float, int], None]] = None,
+    stop: Optional[StopCriteria] = None,
+    problem: Optional[CompiledProblem] = None,
+    init_strategy: str = INIT_CSP,
+    start: Optional[WarmStart] = None,
+    timer: PhaseTimer = NO_TIMER,
+):
+    # Simulated annealing on a single schedule. A "generation" is a block of
+    # moves_per_generation moves, so history, progress and stop criteria
+    # behave as in run_ga. Moves are scored with ScheduleState deltas; the
+    # temperature cools geometrically from SA_T_START to SA_T_END over the
+    # whole max_generations budget. With `start`, the walk begins at the warm
+    # genome and the score includes the moved-task penalty (see run_ga).
+    # Moves are not timed one by one: `timer` gets init, the whole search
+    # loop and decoding.
+    with timer.phase("init"):
+        problem = problem or compile_problem(data)
+        state = _start_state(data, problem, init_strategy, start)
+    n_tasks, n_slot = problem.n_tasks, problem.n_slot
+    pool = start.free_tasks if start is not None else None
+    rnd = py_random()
+    score = state.fitness
+    best_genome = state.genome()
+    best_fitness, best_hard = score, state.hard
+    history: List[float] = [best_fitness]
+    if progress is not None:
+        progress(0, best_fitness, best_hard)
+
+    temp = SA_T_START
+    cooling = (SA_T_END / SA_T_START) ** (1.0 / max(1, max_generations * moves_per_generation))
+    stop_reason = stop.check(history) if stop else None
+    gen = 0
+    searched = time.perf_counter()
+    while stop_reason is None and gen < max_generations and n_tasks:
+        gen += 1
+        improved = False
+        for _ in range(moves_per_generation):
+            t, s, r, d = _random_move(rnd, state, n_tasks, n_slot, pool)
+            delta = _delta(state, start, t, s, r, d)
+            if delta >= 0 or rnd.random() < math.exp(delta / temp):
+                state.apply_move(t, s, r, d)
+                score += delta
+                if delta > 0 and score > best_fitness:
+                    # Improvements are bounded (fitness <= 1000): copying is cheap
+                    best_genome = state.genome()
+                    best_fitness, best_hard = score, state.hard
+                    improved = True
+            temp *= cooling
+        if not improved and score < best_fitness:
+            # Keep the walk near good regions: restart the block from the best
+            state.load(best_genome)
+            score = best_fitness
+        history.append(best_fitness)
+        if progress is not None:
+            progress(gen, best_fitness, best_hard)
+        if stop is not None:
+            stop_reason = stop.check(history)
+    timer.add("search", time.perf_counter() - searched)
+    return _finish(data, problem, best_genome, history, gen, stop_reason, timer)
+
+
+def run_tabu(
+    data: DataScheduling,
+    max_generations: int = 200,
+    moves_per_generation: int = 1000,
+    progress: Optional[Callable[[int, float, int], None]] = None,
+    stop: Optional[StopCriteria] = None,
+    problem: Optional[CompiledProblem] = None,
+    init_strategy: str = INIT_CSP,
+    start: Optional[WarmStart] = None,
+    timer: PhaseTimer = NO_TIMER,
+):
+    # Tabu search on a single schedule. Each step samples TABU_SAMPLE random
+    # moves and applies the best one that is not tabu; a move is tabu when
+    # it gives a task back a value it held within the last `tenure` steps,
+    # unless it beats the best fitness so far (aspiration). A "generation"
+    # is moves_per_generation sampled moves, as in run_sa (also for `start`).
+    with timer.phase("init"):
+        problem = problem or compile_problem(data)
+        state = _start_state(data, problem, init_strategy, start)
+    n_tasks, n_slot = problem.n_tasks, problem.n_slot
+    pool = start.free_tasks if start is not None else None
+    rnd = py_random()
+    tenure = max(TABU_MIN_TENURE, n_tasks // 10)
+    steps_per_generation = max(1, moves_per_generation // TABU_SAMPLE)
+    # (task, gene kind, value) -> step until which that assignment is tabu
+    tabu: Dict[Tuple[int, int, int], int] = {}
+    score = state.fitness
+    best_genome = state.genome()
+    best_fitness, best_hard = score, state.hard
+    history: List[float] = [best_fitness]
+    if progress is not None:
+        progress(0, best_fitness, best_hard)
+
+    step = 0
+    stop_reason = stop.check(history) if stop else None
+    gen = 0
+    searched = time.perf_counter()
+    while stop_reason is None and gen < max_generations and n_tasks:
+        gen += 1
+        for _ in range(steps_per_generation):
+            step += 1
+            chosen: Optional[Move] = None
+            chosen_delta = -math.inf
+            for _ in range(TABU_SAMPLE):
+                move = _random_move(rnd, state, n_tasks, n_slot, pool)
+                t, s, r, d = move
+                delta = _delta(state, start, t, s, r, d)
+                if delta <= chosen_delta:
+                    continue
+                kind, value = (0, s) if s is not None else (1, r) if r is not None else (2, d)
+                if tabu.get((t, kind, value), 0) >= step and score + delta <= best_fitness:
+                    continue
+                chosen, chosen_delta = move, delta
+            if chosen is None:
+                continue
+            t, s, r, d = chosen
+            # Forbid moving the gene straight back to its current value
+            if s is not None:
+                tabu[(t, 0, state.slot[t])] = step + tenure
+            elif r is not None:
+                tabu[(t, 1, state.ruang[t])] = step + tenure
+            else:
+                tabu[(t, 2, state.dosen[t])] = step + tenure
+            state.apply_move(t, s, r, d)
+            score += chosen_delta
+            if score > best_fitness:
+                best_genome = state.genome()
+                best_fitness, best_hard = score, state.hard
+        if len(tabu) > 8 * tenure * TABU_SAMPLE:
+            tabu = {k: v for k, v in tabu.items() if v >= step}
+        history.append(best_fitness)
+        if progress is not None:
+            progress(gen, best_fitness, best_hard)
+        if stop is not None:
+            stop_reason = stop.check(history)
+    timer.add("search", time.perf_counter() - searched)
+    return _finish(data, problem, best_genome, history, gen, stop_reason, timer)
@@ -1,18 +1,63 @@
 from __future__ import annotations
+import asyncio
+import json
 import os
-from typing import List
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Iterator, List, Literal, Optional, Union
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel
 from dotenv import load_dotenv
 
-from .db import fetch_all_data
-from .ga import run_ga
-from .models import Assignment
-from .schemas import GAParams, AssignmentOut, AssignmentReadableOut, EvaluateOut, GenerateResponse, PRESETS
+from .checkpoint import CHECKPOINTS, CheckpointError, checkpointable
+from .db import get_snapshot, init_source, invalidate_snapshot
+from .export import FORMATS, csv_stream, ics_stream, select, xlsx_stream
+from .jobs import FINISHED, Job, JobConflict, JobManager, JobQueueFull
+from .metrics import REGISTRY, new_timer
+from .schemas import (
+    AssignmentReadableOut, CheckpointOut, CompactGenerateResponse, ExportRequest, GAParams, GenerateResponse, JobProgressOut,
+    JobStatusOut, PRESETS, RescheduleRequest, RescheduleResponse, ResumeRequest, SweepRequest, SweepResponse,
+)
+from .service import compact, readable, reschedule, resume_run, solve_cached
+from .sweep import SWEEP_MAX_RUNS, run_sweep, sweep_params
 
 load_dotenv()
 
-app = FastAPI(title="Jadwal Kuliah GA+CSP API")
+SSE_POLL_SECONDS = 0.25
+
+# "full": GenerateResponse; "compact": CompactGenerateResponse (ids + one name table)
+ResponseFormat = Literal["full", "compact"]
+ExportFormat = Literal["csv", "xlsx", "ics"]
+ExportBy = Optional[Literal["dosen", "kelas", "ruangan"]]
+
+
+def run_job(job: Job) -> GenerateResponse:
+    timer = new_timer(job.params.profile)
+    try:
+        with timer.phase("fetch"):
+            snap = get_snapshot()
+    except Exception as e:
+        raise RuntimeError(f"DB error: {e}")
+    if job.resume is not None:
+        return resume_run(job.resume, job.params, snap.data, snap.fingerprint, job.progress, problem=snap.problem, timer=timer)
+    return solve_cached(
+        job.params, snap.data, snap.fingerprint, job.progress, problem=snap.problem, timer=timer, run_id=job.checkpoint_id,
+    )
+
+
+jobs = JobManager(run_job)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_source()
+    yield
+    jobs.shutdown()
+
+
+app = FastAPI(title="Jadwal Kuliah GA+CSP API", lifespan=lifespan)
 
 # CORS
 origins = os.getenv("CORS_ORIGINS", "http://localhost:5173").split(",")
@@ -25,6 +70,16 @@ app.add_middleware(
 )
 
 
+def _json(model: BaseModel) -> Response:
+    # Serialized by pydantic-core in one pass; returning the model would make
+    # FastAPI validate it again and encode it through jsonable_encoder
+    return Response(model.model_dump_json(), media_type="application/json")
+
+
+def _result(resp: GenerateResponse, format: ResponseFormat) -> Response:
+    return _json(compact(resp) if format == "compact" else resp)
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
@@ -35,84 +90,296 @@ def presets():
     return [p.model_dump() for p in PRESETS]
 
 
-@app.post("/generate", response_model=GenerateResponse)
-def generate(params: GAParams):
+def _check_checkpointing(params: GAParams) -> None:
+    if not params.checkpoint_every:
+        return
+    if not CHECKPOINTS.enabled:
+        raise HTTPException(status_code=422, detail="Checkpoint tidak aktif (CHECKPOINT_DIR belum diatur)")
+    if not checkpointable(params):
+        raise HTTPException(status_code=422, detail="Checkpoint hanya untuk engine ga tanpa island/decompose")
+
+
+def _check_adaptive(params: GAParams) -> None:
+    # Island runs use fixed operator rates
+    if params.adaptive_rates and params.engine == "ga" and params.islands > 1:
+        raise HTTPException(status_code=422, detail="adaptive_rates hanya untuk GA tanpa island")
+
+
+@app.post("/generate", response_model=Union[GenerateResponse, CompactGenerateResponse])
+def generate(params: GAParams, format: ResponseFormat = "full"):
+    _check_checkpointing(params)
+    _check_adaptive(params)
+    timer = new_timer(params.profile)
     try:
-        data = fetch_all_data()
+        with timer.phase("fetch"):
+            snap = get_snapshot()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DB error: {e}")
 
-    best_individual, best_eval, history = run_ga(
-        data=data,
-        max_generations=params.max_generations,
-        population_size=params.population_size,
-        mutation_rate=params.mutation_rate,
-        tournament_size=params.tournament_size,
-    )
+    return _result(solve_cached(params, snap.data, snap.fingerprint, problem=snap.problem, timer=timer), format)
 
-    hasil: List[AssignmentOut] = [AssignmentOut(**vars(a)) for a in best_individual]
-    idx = data.index_by_id()
-    hasil_readable: List[AssignmentReadableOut] = []
-    for a in best_individual:
-        kelas = idx["kelas"][a.id_kelas]
-        matkul = idx["matkul"][a.id_matkul]
-        dosen = idx["dosen"][a.id_dosen]
-        ruangan = idx["ruangan"][a.id_ruangan]
-        slot = idx["slot"][a.id_slot]
-        hasil_readable.append(AssignmentReadableOut(
-            id_kelas=kelas.id,
-            kelas=kelas.nama,
-            id_matkul=matkul.id,
-            matkul=matkul.nama,
-            id_dosen=dosen.id,
-            dosen=dosen.nama,
-            id_ruangan=ruangan.id,
-            ruangan=ruangan.nama,
-            id_slot=slot.id,
-            slot=f"{slot.hari} {slot.mulai}-{slot.selesai}",
-        ))
-    evaluasi = EvaluateOut(
-        fitness=best_eval.fitness,
-        pelanggaran_keras=best_eval.pelanggaran_keras,
-        pelanggaran_lunak=best_eval.pelanggaran_lunak,
-        detail_keras=best_eval.detail_keras,
-        detail_lunak=best_eval.detail_lunak,
-        detail_keras_readable=best_eval.detail_keras,
-        detail_lunak_readable=best_eval.detail_lunak,
-    )
 
-    summary = (
-        f"Fitness terbaik: {best_eval.fitness}. "
-        f"Pelanggaran keras: {best_eval.pelanggaran_keras}, lunak: {best_eval.pelanggaran_lunak}. "
-        f"Parameter: G={params.max_generations}, N={params.population_size}, p_m={params.mutation_rate}, k={params.tournament_size}."
-    )
+@app.post("/reschedule", response_model=RescheduleResponse)
+def reschedule_schedule(req: RescheduleRequest):
+    # Re-plan from a previous `hasil` against the current data
+    timer = new_timer(req.params.profile)
+    try:
+        with timer.phase("fetch"):
+            snap = get_snapshot()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DB error: {e}")
 
-    fitness_explanation = (
-        "Fitness lebih tinggi lebih baik. Dihitung sebagai 1000 - 100×(pelanggaran keras) - 10×(pelanggaran lunak). "
-        "Pelanggaran keras: konflik ruangan/dosen/kelas pada slot yang sama. "
-        "Pelanggaran lunak: kapasitas ruang kurang dan ketidaksesuaian preferensi waktu dosen."
+    return _json(reschedule(req, snap.data, problem=snap.problem, timer=timer))
+
+
+def _start_sweep(req: SweepRequest):
+    runs = sweep_params(req)
+    if len(runs) > SWEEP_MAX_RUNS:
+        raise HTTPException(status_code=422, detail=f"Terlalu banyak run ({len(runs)}), maksimum {SWEEP_MAX_RUNS}")
+    if any(p.checkpoint_every for p in runs):
+        # Sweep runs live in worker processes and are not resumable
+        raise HTTPException(status_code=422, detail="checkpoint_every tidak berlaku untuk sweep")
+    for params in runs:
+        _check_adaptive(params)
+    try:
+        snap = get_snapshot()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DB error: {e}")
+    return run_sweep(runs, snap.data, snap.fingerprint, problem=snap.problem)
+
+
+@app.post("/sweep", response_model=SweepResponse)
+def sweep(req: SweepRequest):
+    # Compare parameter sets (default: all presets) on one data snapshot;
+    # runs go in parallel, the response ranks them and includes the best
+    *_, resp = _start_sweep(req)
+    return _json(resp)
+
+
+@app.post("/sweep/stream")
+def sweep_stream(req: SweepRequest):
+    # Same as /sweep as Server-Sent Events: a "run" event per finished run
+    # (completion order), then "done" with the SweepResponse, or "failed".
+    results = _start_sweep(req)
+
+    def stream():
+        try:
+            for item in results:
+                if isinstance(item, SweepResponse):
+                    yield f"event: done\ndata: {item.model_dump_json()}\n\n"
+                else:
+                    yield f"event: run\ndata: {item.model_dump_json()}\n\n"
+        except Exception as e:
+            yield f"event: failed\ndata: {json.dumps({'error': str(e)})}\n\n"
+        finally:
+            # Client gone (or done): cancel the runs still going
+            results.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    expected_total = len(data.kelas_matkul)
-    generated_total = len(hasil)
-    schedule_count_ok = (generated_total == expected_total)
-    schedule_count_message = (
-        f"Total jadwal seharusnya {expected_total}, tergenerate {generated_total}. "
-        + ("Sesuai." if schedule_count_ok else "Tidak sesuai, periksa integritas data/algoritma.")
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # Prometheus text exposition: run/generation/evaluation counters and
+    # run, phase and job queue-wait histograms since process start
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/data/invalidate")
+def invalidate_data():
+    # Drop the cached data snapshot; the next run re-reads every table
+    invalidate_snapshot()
+    return {"status": "ok"}
+
+
+def _job_status(job: Job) -> JobStatusOut:
+    last = job.events[-1] if job.events else None
+    return JobStatusOut(
+        job_id=job.id,
+        status=job.status,
+        max_generations=job.params.max_generations,
+        progress=JobProgressOut(generation=last[0], best_fitness=last[1], pelanggaran_keras=last[2]) if last else None,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        checkpoint_id=job.checkpoint_id,
     )
 
-    return GenerateResponse(
-        params=params,
-        hasil=hasil,
-        hasil_readable=hasil_readable,
-        evaluasi=evaluasi,
-        summary=summary,
-        fitness_history=history,
-        fitness_explanation=fitness_explanation,
-        expected_total=expected_total,
-        generated_total=generated_total,
-        schedule_count_ok=schedule_count_ok,
-        schedule_count_message=schedule_count_message,
+
+def _get_job(job_id: str) -> Job:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan")
+    return job
+
+
+@app.post("/jobs", response_model=JobStatusOut, status_code=202)
+def submit_job(params: GAParams):
+    _check_checkpointing(params)
+    _check_adaptive(params)
+    try:
+        job = jobs.submit(params)
+    except JobQueueFull:
+        raise HTTPException(status_code=429, detail="Antrian job penuh, coba lagi nanti")
+    return _job_status(job)
+
+
+@app.get("/checkpoints", response_model=List[CheckpointOut])
+def list_checkpoints():
+    # Latest snapshot per checkpointed run, most recent first; runs that were
+    # interrupted (restart, deploy) stay here and can be resumed
+    return [CheckpointOut(**{k: m[k] for k in CheckpointOut.model_fields}) for m in CHECKPOINTS.list()]
+
+
+@app.post("/checkpoints/{run_id}/resume", response_model=JobStatusOut, status_code=202)
+def resume_checkpoint(run_id: str, req: ResumeRequest):
+    # Continue a run from its latest checkpoint as a new job, optionally with
+    # more generations or other stop criteria
+    try:
+        checkpoint = CHECKPOINTS.load(run_id)
+    except CheckpointError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    try:
+        fingerprint = get_snapshot().fingerprint
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DB error: {e}")
+    if checkpoint.fingerprint != fingerprint:
+        raise HTTPException(status_code=409, detail="Data berubah sejak checkpoint dibuat; jalankan ulang dari awal")
+    # null clears the time limit / stall criterion; the other fields need a value
+    overrides = {k: v for k, v in req.model_dump(exclude_unset=True).items() if v is not None or k in ("time_limit_s", "stall_generations")}
+    params = checkpoint.params.model_copy(update=overrides)
+    try:
+        job = jobs.submit(params, resume=checkpoint)
+    except JobQueueFull:
+        raise HTTPException(status_code=429, detail="Antrian job penuh, coba lagi nanti")
+    except JobConflict:
+        raise HTTPException(status_code=409, detail="Run ini sedang berjalan")
+    return _job_status(job)
+
+
+@app.delete("/checkpoints/{run_id}")
+def delete_checkpoint(run_id: str):
+    try:
+        CHECKPOINTS.delete(run_id)
+    except CheckpointError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"status": "ok"}
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatusOut)
+def job_status(job_id: str):
+    return _job_status(_get_job(job_id))
+
+
+def _finished_result(job_id: str) -> GenerateResponse:
+    job = _get_job(job_id)
+    if job.result is None:
+        raise HTTPException(status_code=409, detail=f"Job belum selesai (status: {job.status})")
+    return job.result
+
+
+@app.get("/jobs/{job_id}/result", response_model=Union[GenerateResponse, CompactGenerateResponse])
+def job_result(job_id: str, format: ResponseFormat = "full"):
+    return _result(_finished_result(job_id), format)
+
+
+def _check_export(by: Optional[str], entity_id: Optional[int]) -> None:
+    if entity_id is not None and by is None:
+        raise HTTPException(status_code=422, detail="Parameter id butuh by (dosen/kelas/ruangan)")
+
+
+def _export(
+    rows: List[AssignmentReadableOut], format: str, by: Optional[str], entity_id: Optional[int], mulai: Optional[date], minggu: int,
+) -> StreamingResponse:
+    rows = select(rows, by, entity_id)
+    if format == "csv":
+        body: Iterator[bytes] = csv_stream(rows)
+    elif format == "xlsx":
+        body = xlsx_stream(rows)
+    else:
+        body = ics_stream(rows, mulai or date.today(), minggu)
+    media_type, ext = FORMATS[format]
+    name = "jadwal" + (f"_{by}" if by else "") + (f"_{entity_id}" if entity_id is not None else "")
+    return StreamingResponse(body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{name}.{ext}"'})
+
+
+@app.get("/jobs/{job_id}/export")
+def export_job(
+    job_id: str,
+    format: ExportFormat = "csv",
+    by: ExportBy = None,
+    id: Optional[int] = None,
+    mulai: Optional[date] = None,
+    minggu: int = Query(16, ge=1, le=52),
+):
+    # Streamed file of a finished job's schedule: all of it, grouped `by`
+    # dosen/kelas/ruangan, or one entity's (`by` + `id`). iCal: weekly
+    # events from the week of `mulai` (default today) for `minggu` weeks.
+    _check_export(by, id)
+    return _export(_finished_result(job_id).hasil_readable, format, by, id, mulai, minggu)
+
+
+@app.post("/export")
+def export_schedule(
+    req: ExportRequest,
+    format: ExportFormat = "csv",
+    by: ExportBy = None,
+    id: Optional[int] = None,
+    mulai: Optional[date] = None,
+    minggu: int = Query(16, ge=1, le=52),
+):
+    # Same as /jobs/{job_id}/export for a schedule sent by the client
+    # (e.g. a /generate result), named from the current data
+    _check_export(by, id)
+    try:
+        snap = get_snapshot()
+        rows = readable(req.hasil, snap.data)
+    except KeyError as e:
+        raise HTTPException(status_code=422, detail=f"Id tidak dikenal di data saat ini: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DB error: {e}")
+    return _export(rows, format, by, id, mulai, minggu)
+
+
+@app.post("/jobs/{job_id}/cancel", response_model=JobStatusOut)
+def cancel_job(job_id: str):
+    _get_job(job_id)
+    return _job_status(jobs.cancel(job_id))  # type: ignore[arg-type]
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    # Server-Sent Events: one "progress" event per generation, then a final
+    # event named after the terminal status (done/failed/cancelled).
+    job = _get_job(job_id)
+
+    async def stream():
+        sent = 0
+        while True:
+            finished = job.status in FINISHED
+            events = job.events
+            while sent < len(events):
+                gen, fit, hard = events[sent]
+                sent += 1
+                payload = {"generation": gen, "best_fitness": fit, "pelanggaran_keras": hard}
+                yield f"event: progress\ndata: {json.dumps(payload)}\n\n"
+            if finished:
+                payload = {"job_id": job.id, "status": job.status, "error": job.error}
+                yield f"event: {job.status}\ndata: {json.dumps(payload)}\n\n"
+                return
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(SSE_POLL_SECONDS)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
@@ -0,0 +1,85 @@
+from __future__ import annotations
+from typing import Dict
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from .compiled import CompiledProblem, GENOME_RUANGAN, GENOME_SLOT
+
+# Bound on memoized per-slot assignments kept by one RoomMatcher
+_CACHE_LIMIT = 100_000
+
+
+def room_cost_table(problem: CompiledProblem) -> np.ndarray:
+    # (T, R) cost of putting task t in room r, ordered lexicographically:
+    # wrong room type >> over capacity (S1) >> capacity shortfall in seats.
+    n_tasks = problem.n_tasks
+    size = problem.kelas_size[problem.task_kelas]
+    shortfall = np.maximum(size[:, None] - problem.ruang_cap[None, :], 0)
+    cost = (shortfall > 0) + shortfall / (int(problem.kelas_size.sum()) + 1)
+    wrong_type = np.ones((len(problem.matkul_rooms), problem.n_ruangan), dtype=bool)
+    for m, rooms in enumerate(problem.matkul_rooms):
+        wrong_type[m, rooms or slice(None)] = False
+    return cost + (n_tasks + 1) * wrong_type[problem.task_matkul]
+
+
+class RoomMatcher:
+    """Room decoder: rooms follow from the slot genes.
+
+    Tasks sharing a slot are matched to distinct rooms by min-cost assignment
+    over `room_cost_table` (scipy's linear_sum_assignment), so C1 never
+    occurs while a slot has enough rooms and S1 is minimal for the chosen
+    slots. Tasks with equal cost rows are interchangeable, so optima are
+    memoized per slot content, the sorted row classes of its tasks: a slot
+    no mutation or crossover touched is not solved again.
+    """
+
+    def __init__(self, problem: CompiledProblem):
+        self.problem = problem
+        cost = room_cost_table(problem)
+        classes: Dict[bytes, int] = {}
+        self.task_class = np.array([classes.setdefault(row.tobytes(), len(classes)) for row in cost], dtype=np.int32)
+        first = {c: t for t, c in reversed(list(enumerate(self.task_class.tolist())))}
+        self.cost = cost[[first[c] for c in range(len(classes))]]  # (C, R)
+        self.best_room = self.cost.argmin(axis=1)
+        self._n_rooms = problem.n_ruangan
+        # Cost of a padding column, i.e. a task left without its own room
+        self._no_room = float((problem.n_tasks + 1) ** 2)
+        self._cache: Dict[bytes, np.ndarray] = {}
+
+    def _match(self, classes: np.ndarray) -> np.ndarray:
+        # classes: sorted row classes of the tasks in one slot -> room per entry
+        key = classes.tobytes()
+        rooms = self._cache.get(key)
+        if rooms is not None:
+            return rooms
+        cost = self.cost[classes]
+        extra = len(classes) - self._n_rooms
+        if extra > 0:
+            # More tasks than rooms: padding columns cost more than any room
+            cost = np.hstack((cost, np.full((len(classes), extra), self._no_room)))
+        _, cols = linear_sum_assignment(cost)
+        # Tasks on a padding column share their cheapest room (a C1 conflict)
+        rooms = np.where(cols < self._n_rooms, cols, self.best_room[classes])
+        if len(self._cache) >= _CACHE_LIMIT:
+            self._cache.clear()
+        self._cache[key] = rooms
+        return rooms
+
+    def assign(self, genome: np.ndarray) -> None:
+        # Overwrite the room column of a (T, GENOME_WIDTH) genome in place
+        slots = genome[:, GENOME_SLOT]
+        order = np.lexsort((self.task_class, slots))
+        classes = self.task_class[order]
+        bounds = np.flatnonzero(np.diff(slots[order])) + 1
+        rooms = np.empty(len(order), dtype=genome.dtype)
+        for a, b in zip([0, *bounds.tolist()], [*bounds.tolist(), len(order)]):
+            if b - a == 1:
+                rooms[a] = self.best_room[classes[a]]
+            else:
+                rooms[a:b] = self._match(classes[a:b])
+        genome[order, GENOME_RUANGAN] = rooms
+
+    def assign_population(self, population: np.ndarray) -> None:
+        for genome in population:
+            self.assign(genome)
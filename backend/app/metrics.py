@@ -0,0 +1,155 @@
+from __future__ import annotations
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Time GA phases on every run, not only when GAParams.profile is set
+PROFILE_PHASES = os.getenv("PROFILE_PHASES", "0").lower() in ("1", "true", "yes")
+
+# Seconds; shared by every histogram below
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class _Phase:
+    __slots__ = ("timer", "name", "started")
+
+    def __init__(self, timer: "PhaseTimer", name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, time.perf_counter() - self.started)
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NO_PHASE = _NoPhase()
+
+
+class PhaseTimer:
+    """Seconds spent per named phase of one request.
+
+    `with timer.phase("evaluate"): ...` accumulates into totals. A disabled
+    timer hands out one shared no-op context, so instrumented code costs a
+    method call per phase when profiling is off.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.totals: Dict[str, float] = {}
+
+    def phase(self, name: str):
+        return _Phase(self, name) if self.enabled else _NO_PHASE
+
+    def add(self, name: str, seconds: float) -> None:
+        if self.enabled:
+            self.totals[name] = self.totals.get(name, 0.0) + seconds
+
+
+NO_TIMER = PhaseTimer(enabled=False)
+
+
+def new_timer(profile: bool) -> PhaseTimer:
+    return PhaseTimer() if profile or PROFILE_PHASES else NO_TIMER
+
+
+class _Registry:
+    # Minimal Prometheus text-format registry: labelled counters and
+    # histograms, guarded by one lock (updates happen once per run).
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}  # name -> (type, help)
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        # (name, labels) -> (bucket counts, sum, count)
+        self._hists: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Tuple[List[int], float, int]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            counts, total, n = self._hists.get(key) or ([0] * len(BUCKETS), 0.0, 0)
+            i = bisect_left(BUCKETS, value)
+            if i < len(BUCKETS):
+                counts[i] += 1
+            self._hists[key] = (counts, total + value, n + 1)
+
+    def render(self) -> str:
+        def fmt(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+            items = list(labels) + ([extra] if extra else [])
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+        lines: List[str] = []
+        with self._lock:
+            for name, (kind, help_text) in self._help.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "counter":
+                    for (n, labels), value in sorted(self._counters.items()):
+                        if n == name:
+                            lines.append(f"{name}{fmt(labels)} {value:g}")
+                    continue
+                for (n, labels), (counts, total, count) in sorted(self._hists.items()):
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, c in zip(BUCKETS, counts):
+                        cumulative += c
+                        lines.append(f"{name}_bucket{fmt(labels, ('le', f'{bound:g}'))} {cumulative}")
+                    lines.append(f"{name}_bucket{fmt(labels, ('le', '+Inf'))} {count}")
+                    lines.append(f"{name}_sum{fmt(labels)} {total:g}")
+                    lines.append(f"{name}_count{fmt(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = _Registry()
+REGISTRY.describe("jadwal_runs_total", "counter", "Completed scheduling runs")
+REGISTRY.describe("jadwal_generations_total", "counter", "Generations (or local-search blocks) run")
+REGISTRY.describe("jadwal_evaluations_total", "counter", "Schedules scored (individuals; moves for sa/tabu)")
+REGISTRY.describe("jadwal_evaluation_cache_hits_total", "counter", "Evaluations answered by the per-run fitness cache")
+REGISTRY.describe("jadwal_run_seconds", "histogram", "Wall time of a scheduling run")
+REGISTRY.describe("jadwal_phase_seconds", "histogram", "Time per phase of a profiled run")
+REGISTRY.describe("jadwal_job_queue_wait_seconds", "histogram", "Time a job waited before starting")
+REGISTRY.describe("jadwal_result_cache_total", "counter", "Result cache lookups of seeded runs")
+
+
+def record_run(engine: str, generations: int, evaluations: int, cache_hits: int, seconds: float, timer: PhaseTimer) -> None:
+    REGISTRY.inc("jadwal_runs_total", engine=engine)
+    REGISTRY.inc("jadwal_generations_total", generations, engine=engine)
+    REGISTRY.inc("jadwal_evaluations_total", evaluations, engine=engine)
+    REGISTRY.inc("jadwal_evaluation_cache_hits_total", cache_hits, engine=engine)
+    REGISTRY.observe("jadwal_run_seconds", seconds, engine=engine)
+    for phase, secs in timer.totals.items():
+        REGISTRY.observe("jadwal_phase_seconds", secs, phase=phase)
+
+
+def record_queue_wait(seconds: float) -> None:
+    REGISTRY.observe("jadwal_job_queue_wait_seconds", seconds)
+
+
+def record_cache(hit: bool) -> None:
+    REGISTRY.inc("jadwal_result_cache_total", result="hit" if hit else "miss")
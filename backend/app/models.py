@@ -1,5 +1,5 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Tuple, Optional
 
 
@@ -71,6 +71,33 @@ class Evaluasi:
     fitness: float
 
 
+@dataclass
+class OperatorStats:
+    applied: int = 0  # children the operator produced (repair: individuals it changed)
+    improved: int = 0  # of those, fitter than their better parent (repair: than before repair)
+    gain: int = 0  # fitness gained by the improved ones over that reference
+    new_best: int = 0  # generations whose new best-so-far it took part in (see OperatorControl)
+
+    def add(self, other: OperatorStats) -> None:
+        self.applied += other.applied
+        self.improved += other.improved
+        self.gain += other.gain
+        self.new_best += other.new_best
+
+
+@dataclass
+class RunStats:
+    generations: int  # generations actually executed
+    stop_reason: str  # max_generations | perfect | stall | time_limit
+    evaluations: int = 0  # individuals scored from scratch (population engines)
+    evaluation_cache_hits: int = 0  # individuals whose fitness came from the FitnessCache
+    subproblems: int = 1  # independent parts solved separately (decompose)
+    # Credit per GA operator (crossover, mutation, repair), see OperatorStats
+    operators: Dict[str, OperatorStats] = field(default_factory=dict)
+    # Mutation/crossover rates of the last generation (adaptive_rates)
+    rates: Optional[Dict[str, float]] = None
+
+
 @dataclass
 class DataScheduling:
     dosen: List[Dosen]
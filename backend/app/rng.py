@@ -0,0 +1,43 @@
+from __future__ import annotations
+import random
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import numpy as np
+
+# Per-thread generators of the run in progress. Engines draw from
+# py_random() / np_random() instead of the global `random` / `np.random`
+# state, so concurrent jobs (threads) and island workers (processes) never
+# share a stream, and a run under seeded(seed) repeats exactly.
+_local = threading.local()
+
+
+def py_random() -> random.Random:
+    rnd = getattr(_local, "py", None)
+    if rnd is None:
+        rnd = _local.py = random.Random()
+    return rnd
+
+
+def np_random() -> np.random.Generator:
+    rnd = getattr(_local, "np", None)
+    if rnd is None:
+        rnd = _local.np = np.random.default_rng()
+    return rnd
+
+
+@contextmanager
+def seeded(seed: Optional[int], *stream: int) -> Iterator[None]:
+    # Install fresh generators for the current thread for the duration of
+    # the block. seed=None draws OS entropy; `stream` derives independent
+    # sequences from one seed (e.g. island and epoch).
+    seq = np.random.SeedSequence() if seed is None else np.random.SeedSequence([seed, *stream])
+    py_seq, np_seq = seq.spawn(2)
+    previous = getattr(_local, "py", None), getattr(_local, "np", None)
+    _local.py = random.Random(int.from_bytes(py_seq.generate_state(4).tobytes(), "little"))
+    _local.np = np.random.default_rng(np_seq)
+    try:
+        yield
+    finally:
+        _local.py, _local.np = previous
@@ -1,13 +1,54 @@
 from __future__ import annotations
-from typing import List, Optional
+from typing import Annotated, Dict, List, Literal, Optional, Tuple
 from pydantic import BaseModel, Field
 
 
 class GAParams(BaseModel):
+    # Search engine: population GA, or single-solution simulated annealing /
+    # tabu search (one "generation" = moves_per_generation moves)
+    engine: Literal["ga", "sa", "tabu"] = "ga"
+    moves_per_generation: int = Field(1000, ge=1, le=1000000)
     max_generations: int = Field(200, ge=1, le=5000)
     population_size: int = Field(60, ge=2, le=5000)
     mutation_rate: float = Field(0.2, ge=0.0, le=1.0)
     tournament_size: int = Field(3, ge=2, le=50)
+    # Recombination: one-point over the task list, or uniform per task (each
+    # task's slot/room/lecturer from either parent); pairs not crossed
+    # (1 - crossover_rate) go on as copies of their parents
+    crossover: Literal["one_point", "uniform"] = "one_point"
+    crossover_rate: float = Field(1.0, ge=0.0, le=1.0)
+    # Mutate mostly the genes of tasks in C1/C2/C3/S1/S2 violations, and only
+    # the genes that can fix them
+    targeted_mutation: bool = False
+    # Adapt the mutation and crossover rates each generation to population
+    # diversity and stagnation (single-population GA)
+    adaptive_rates: bool = False
+    # Island model: >1 evolves that many populations of population_size in
+    # parallel processes, migrating the best individuals every migration_interval
+    islands: int = Field(1, ge=1, le=64)
+    migration_interval: int = Field(20, ge=1, le=5000)
+    # Initial population: CSP (most-constrained first + forward checking) or greedy
+    init_strategy: Literal["csp", "greedy"] = "csp"
+    # Solve independent groups of tasks (no shared kelas, candidate lecturer
+    # or room) as separate subproblems in parallel processes
+    decompose: bool = False
+    # Rooms: free genes, or per-slot min-cost matching of tasks to rooms
+    room_decoder: Literal["gene", "matching"] = "gene"
+    # Conflict-repair moves per generation (0 disables the repair stage)
+    repair_budget: int = Field(100, ge=0, le=100000)
+    # Stop criteria (besides max_generations). time_limit_s covers the whole
+    # run: initialization stops early too, keeping at least one individual
+    time_limit_s: Optional[float] = Field(None, gt=0, le=3600)
+    stall_generations: Optional[int] = Field(None, ge=1, le=5000)
+    stop_on_perfect: bool = True
+    # Per-run RNG seed: the same seed, data and parameters give the same
+    # schedule (unless time_limit_s cuts the run short); seeded results are cached
+    seed: Optional[int] = Field(None, ge=0, le=2**32 - 1)
+    # Return the seconds spent per phase in GenerateResponse.timings
+    profile: bool = False
+    # Snapshot the GA state to CHECKPOINT_DIR every N generations (and at the
+    # end), so the run can be resumed or continued; GA without islands/decompose
+    checkpoint_every: Optional[int] = Field(None, ge=1, le=5000)
 
 
 class AssignmentOut(BaseModel):
@@ -41,11 +82,16 @@ class EvaluateOut(BaseModel):
     detail_lunak_readable: List[str] | None = None
 
 
-class GenerateResponse(BaseModel):
+class OperatorStatsOut(BaseModel):
+    applied: int  # children produced (repair: individuals changed)
+    improved: int  # of those, fitter than their better parent (repair: than before)
+    gain: int  # fitness gained by the improved ones
+    new_best: int  # generations whose new best-so-far it took part in
+
+
+class RunOut(BaseModel):
+    # Fields shared by the full and the compact response
     params: GAParams
-    hasil: List[AssignmentOut]
-    hasil_readable: List[AssignmentReadableOut]
-    evaluasi: EvaluateOut
     summary: str
     fitness_history: List[float]
     fitness_explanation: str
@@ -53,6 +99,135 @@ class GenerateResponse(BaseModel):
     generated_total: int
     schedule_count_ok: bool
     schedule_count_message: str
+    generations_run: int
+    stop_reason: str  # max_generations | perfect | stall | time_limit
+    # Individuals scored from scratch / answered by the per-run fitness cache
+    # (population engines; 0 for sa/tabu)
+    evaluations: int = 0
+    evaluation_cache_hits: int = 0
+    subproblems: int = 1  # independent subproblems solved (params.decompose)
+    # Per GA operator (crossover, mutation, repair), what it contributed;
+    # empty for sa/tabu and island runs
+    operators: Dict[str, OperatorStatsOut] = Field(default_factory=dict)
+    # Mutation/crossover rates of the last generation (params.adaptive_rates)
+    operator_rates: Optional[Dict[str, float]] = None
+    # Seconds per phase (fetch, init, evaluate, selection, ...) when params.profile
+    timings: Optional[Dict[str, float]] = None
+    # Served from the result cache (same seed, data and parameters as an earlier run)
+    cached: bool = False
+    # Run id of the checkpoints written (params.checkpoint_every), for /checkpoints/{id}/resume
+    checkpoint_id: Optional[str] = None
+
+
+class GenerateResponse(RunOut):
+    hasil: List[AssignmentOut]
+    hasil_readable: List[AssignmentReadableOut]
+    evaluasi: EvaluateOut
+
+
+# Column order of CompactGenerateResponse.hasil rows
+COMPACT_COLUMNS = ["id_kelas", "id_matkul", "id_dosen", "id_ruangan", "id_slot"]
+
+
+class CompactEvaluateOut(BaseModel):
+    fitness: float
+    pelanggaran_keras: int
+    pelanggaran_lunak: int
+    detail_keras: List[str]
+    detail_lunak: List[str]
+
+
+class CompactGenerateResponse(RunOut):
+    # GenerateResponse without repetition (format=compact): one id row per
+    # assignment in `kolom` order, every name once in `nama`
+    # ({"kelas" | "matkul" | "dosen" | "ruangan" | "slot": {id: name}}),
+    # violation lists once
+    kolom: List[str] = Field(default_factory=lambda: list(COMPACT_COLUMNS))
+    hasil: List[Tuple[int, int, int, int, int]]
+    nama: Dict[str, Dict[int, str]]
+    evaluasi: CompactEvaluateOut
+
+
+class ExportRequest(BaseModel):
+    # Schedule to export (GenerateResponse.hasil); names come from the current data
+    hasil: List[AssignmentOut]
+
+
+class RescheduleRequest(BaseModel):
+    params: GAParams = Field(default_factory=GAParams)
+    # Previous schedule (GenerateResponse.hasil) to re-plan from
+    previous: List[AssignmentOut]
+    # Fitness cost per still-valid assignment that gets moved: above a soft
+    # violation (10), below a hard one (100)
+    move_penalty: int = Field(20, ge=0, le=1000)
+
+
+class RescheduleResponse(GenerateResponse):
+    kept_total: int  # prior assignments still valid, used as anchors
+    affected_total: int  # new tasks and tasks whose prior assignment became invalid
+    moved_total: int  # anchors that ended up with a different assignment
+
+
+class JobProgressOut(BaseModel):
+    generation: int
+    best_fitness: float
+    pelanggaran_keras: int
+
+
+class JobStatusOut(BaseModel):
+    job_id: str
+    status: str  # queued | running | done | failed | cancelled
+    max_generations: int
+    progress: Optional[JobProgressOut] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    checkpoint_id: Optional[str] = None  # checkpoints of this job's run, if any
+
+
+class CheckpointOut(BaseModel):
+    run_id: str
+    generation: int  # generations done at the snapshot
+    best_fitness: float
+    best_hard: int
+    saved_at: float
+    params: GAParams
+
+
+class ResumeRequest(BaseModel):
+    # Overrides for the checkpointed run's stop criteria; omitted fields keep
+    # their value. A larger max_generations continues a finished run.
+    max_generations: Optional[int] = Field(None, ge=1, le=5000)
+    time_limit_s: Optional[float] = Field(None, gt=0, le=3600)
+    stall_generations: Optional[int] = Field(None, ge=1, le=5000)
+    stop_on_perfect: Optional[bool] = None
+
+
+class SweepRequest(BaseModel):
+    # Parameter sets to compare; default: every preset (G, N, p_m, k) applied to `base`
+    params: Optional[List[GAParams]] = Field(None, min_length=1)
+    base: GAParams = Field(default_factory=GAParams)
+    # Run every parameter set once per seed (replaces its own seed)
+    seeds: Optional[List[Annotated[int, Field(ge=0, le=2**32 - 1)]]] = Field(None, min_length=1)
+
+
+class SweepRunOut(BaseModel):
+    index: int  # position in the expanded run list (parameter set x seed)
+    params: GAParams
+    fitness: float
+    pelanggaran_keras: int
+    pelanggaran_lunak: int
+    generations_run: int
+    stop_reason: str
+    seconds: float  # wall time of the run (0 when served from the result cache)
+    cached: bool = False
+
+
+class SweepResponse(BaseModel):
+    # Best first: fitness, then fewer hard violations, then faster
+    runs: List[SweepRunOut]
+    best: GenerateResponse
 
 
 class Preset(BaseModel):
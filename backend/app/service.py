@@ -0,0 +1,392 @@
+from __future__ import annotations
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+from .ga import StopCriteria, run_ga
+from .islands import run_islands
+from .local_search import run_sa, run_tabu
+from .compiled import CompiledProblem, compile_problem, encode_population
+from .decompose import run_decomposed
+from .cache import RESULT_CACHE, result_key
+from .checkpoint import CHECKPOINTS, Checkpoint, CheckpointError, GAState, checkpointable
+from .metrics import NO_TIMER, PhaseTimer, new_timer, record_cache, record_run
+from .models import Assignment, DataScheduling
+from .rng import seeded
+from .schemas import (
+    GAParams, AssignmentOut, AssignmentReadableOut, CompactEvaluateOut, CompactGenerateResponse, EvaluateOut, GenerateResponse,
+    OperatorStatsOut, RescheduleRequest, RescheduleResponse, RunOut,
+)
+from .warmstart import WarmStart, build_warm_start
+
+# progress(generation, best_fitness, best_pelanggaran_keras), called once per generation
+ProgressFn = Callable[[int, float, int], None]
+
+
+# Single-solution engines; "ga" (islands or not) is handled in solve
+ENGINES = {"sa": run_sa, "tabu": run_tabu}
+ENGINE_TEXT = {"sa": "simulated annealing", "tabu": "tabu search"}
+CROSSOVER_TEXT = {"one_point": "satu titik", "uniform": "uniform per tugas"}
+OPERATOR_TEXT = {"crossover": "crossover", "mutation": "mutasi", "repair": "repair"}
+
+STOP_REASON_TEXT = {
+    "max_generations": "batas generasi tercapai",
+    "perfect": "fitness sempurna tercapai",
+    "stall": "tidak ada perbaikan",
+    "time_limit": "batas waktu habis",
+}
+
+
+def run_engine(
+    params: GAParams,
+    data: DataScheduling,
+    progress: Optional[ProgressFn] = None,
+    problem: Optional[CompiledProblem] = None,
+    start: Optional[WarmStart] = None,
+    timer: PhaseTimer = NO_TIMER,
+    checkpoint: Optional[Callable[[GAState], None]] = None,
+    resume: Optional[GAState] = None,
+):
+    # One run of the engine `params` selects; returns (best assignments,
+    # Evaluasi, fitness history, RunStats). `start` re-plans from a prior
+    # schedule (see reschedule); island runs do not support it and fall back
+    # to a single population. `checkpoint` / `resume` reach the
+    # single-population GA only (checkpoint.checkpointable).
+    stop = StopCriteria(
+        time_limit_s=params.time_limit_s,
+        stall_generations=params.stall_generations,
+        stop_on_perfect=params.stop_on_perfect,
+    )
+    if params.engine in ENGINES:
+        return ENGINES[params.engine](
+            data=data,
+            max_generations=params.max_generations,
+            moves_per_generation=params.moves_per_generation,
+            progress=progress,
+            stop=stop,
+            problem=problem,
+            init_strategy=params.init_strategy,
+            start=start,
+            timer=timer,
+        )
+    elif params.islands > 1 and start is None:
+        return run_islands(
+            data=data,
+            max_generations=params.max_generations,
+            population_size=params.population_size,
+            mutation_rate=params.mutation_rate,
+            tournament_size=params.tournament_size,
+            islands=params.islands,
+            migration_interval=params.migration_interval,
+            progress=progress,
+            stop=stop,
+            problem=problem,
+            repair_budget=params.repair_budget,
+            init_strategy=params.init_strategy,
+            room_decoder=params.room_decoder,
+            seed=params.seed,
+            timer=timer,
+            crossover=params.crossover,
+            crossover_rate=params.crossover_rate,
+            targeted_mutation=params.targeted_mutation,
+        )
+    else:
+        return run_ga(
+            data=data,
+            max_generations=params.max_generations,
+            population_size=params.population_size,
+            mutation_rate=params.mutation_rate,
+            tournament_size=params.tournament_size,
+            progress=progress,
+            stop=stop,
+            problem=problem,
+            repair_budget=params.repair_budget,
+            init_strategy=params.init_strategy,
+            room_decoder=params.room_decoder,
+            start=start,
+            timer=timer,
+            checkpoint=checkpoint,
+            checkpoint_every=params.checkpoint_every or 0,
+            resume=resume,
+            crossover=params.crossover,
+            crossover_rate=params.crossover_rate,
+            targeted_mutation=params.targeted_mutation,
+            adaptive_rates=params.adaptive_rates,
+        )
+
+
+def readable(assignments: Sequence[Union[Assignment, AssignmentOut]], data: DataScheduling) -> List[AssignmentReadableOut]:
+    # Assignments with the names of their kelas, matkul, dosen, ruangan and slot
+    idx = data.index_by_id()
+    out: List[AssignmentReadableOut] = []
+    for a in assignments:
+        kelas = idx["kelas"][a.id_kelas]
+        matkul = idx["matkul"][a.id_matkul]
+        dosen = idx["dosen"][a.id_dosen]
+        ruangan = idx["ruangan"][a.id_ruangan]
+        slot = idx["slot"][a.id_slot]
+        out.append(AssignmentReadableOut(
+            id_kelas=kelas.id,
+            kelas=kelas.nama,
+            id_matkul=matkul.id,
+            matkul=matkul.nama,
+            id_dosen=dosen.id,
+            dosen=dosen.nama,
+            id_ruangan=ruangan.id,
+            ruangan=ruangan.nama,
+            id_slot=slot.id,
+            slot=f"{slot.hari} {slot.mulai}-{slot.selesai}",
+        ))
+    return out
+
+
+def compact(resp: GenerateResponse) -> CompactGenerateResponse:
+    # format=compact view of a response: id rows plus one name per entity
+    nama: Dict[str, Dict[int, str]] = {"kelas": {}, "matkul": {}, "dosen": {}, "ruangan": {}, "slot": {}}
+    kelas, matkul, dosen, ruangan, slot = (nama[k] for k in ("kelas", "matkul", "dosen", "ruangan", "slot"))
+    rows = []
+    for h in resp.hasil_readable:
+        rows.append((h.id_kelas, h.id_matkul, h.id_dosen, h.id_ruangan, h.id_slot))
+        kelas[h.id_kelas] = h.kelas
+        matkul[h.id_matkul] = h.matkul
+        dosen[h.id_dosen] = h.dosen
+        ruangan[h.id_ruangan] = h.ruangan
+        slot[h.id_slot] = h.slot
+    ev = resp.evaluasi
+    return CompactGenerateResponse(
+        **{k: getattr(resp, k) for k in RunOut.model_fields},
+        hasil=rows,
+        nama=nama,
+        evaluasi=CompactEvaluateOut(
+            fitness=ev.fitness,
+            pelanggaran_keras=ev.pelanggaran_keras,
+            pelanggaran_lunak=ev.pelanggaran_lunak,
+            detail_keras=ev.detail_keras,
+            detail_lunak=ev.detail_lunak,
+        ),
+    )
+
+
+def solve(
+    params: GAParams,
+    data: DataScheduling,
+    progress: Optional[ProgressFn] = None,
+    problem: Optional[CompiledProblem] = None,
+    start: Optional[WarmStart] = None,
+    timer: Optional[PhaseTimer] = None,
+    checkpoint: Optional[Callable[[GAState], None]] = None,
+    resume: Optional[GAState] = None,
+) -> GenerateResponse:
+    # run_engine, or run_decomposed when params.decompose (not with `start`),
+    # and the GenerateResponse around its result. Pass `timer` to include
+    # phases timed by the caller (e.g. the data fetch).
+    timer = timer or new_timer(params.profile)
+    started = time.perf_counter()
+    # A per-run generator: seeded runs repeat, concurrent runs never share state
+    with seeded(params.seed):
+        if params.decompose and start is None:
+            best_individual, best_eval, history, stats = run_decomposed(params, data, run_engine, progress, problem, timer)
+        else:
+            best_individual, best_eval, history, stats = run_engine(
+                params, data, progress, problem, start, timer, checkpoint, resume,
+            )
+    building = time.perf_counter()
+
+    hasil: List[AssignmentOut] = [AssignmentOut(**vars(a)) for a in best_individual]
+    hasil_readable = readable(best_individual, data)
+    evaluasi = EvaluateOut(
+        fitness=best_eval.fitness,
+        pelanggaran_keras=best_eval.pelanggaran_keras,
+        pelanggaran_lunak=best_eval.pelanggaran_lunak,
+        detail_keras=best_eval.detail_keras,
+        detail_lunak=best_eval.detail_lunak,
+        detail_keras_readable=best_eval.detail_keras,
+        detail_lunak_readable=best_eval.detail_lunak,
+    )
+
+    # Islands run fixed operator rates; /reschedule falls back to one population
+    adaptive = params.adaptive_rates and (params.islands == 1 or start is not None)
+    summary = (
+        f"Fitness terbaik: {best_eval.fitness}. "
+        f"Pelanggaran keras: {best_eval.pelanggaran_keras}, lunak: {best_eval.pelanggaran_lunak}. "
+        + (
+            f"Mesin: {ENGINE_TEXT[params.engine]}, G={params.max_generations}, {params.moves_per_generation} langkah/generasi."
+            if params.engine in ENGINES else
+            f"Parameter: G={params.max_generations}, N={params.population_size}, p_m={params.mutation_rate}, k={params.tournament_size}."
+            + (f" Island: {params.islands} (migrasi tiap {params.migration_interval} generasi)." if params.islands > 1 and start is None else "")
+            + (
+                f" Crossover: {CROSSOVER_TEXT[params.crossover]}, p_c={params.crossover_rate}"
+                + (", mutasi terarah ke pelanggaran" if params.targeted_mutation else "")
+                + (", laju adaptif" if adaptive else "")
+                + "."
+                if params.crossover != "one_point" or params.crossover_rate < 1 or params.targeted_mutation or adaptive
+                else ""
+            )
+        )
+        + f" Berhenti setelah {stats.generations} generasi: {STOP_REASON_TEXT.get(stats.stop_reason, stats.stop_reason)}."
+    )
+    if stats.subproblems > 1:
+        summary += f" Dekomposisi: {stats.subproblems} subproblem independen diselesaikan paralel."
+    looked_up = stats.evaluations + stats.evaluation_cache_hits
+    if looked_up:
+        summary += (
+            f" Evaluasi fitness: {stats.evaluations} dihitung, {stats.evaluation_cache_hits} dari cache"
+            f" ({100 * stats.evaluation_cache_hits / looked_up:.0f}%)."
+        )
+    if any(o.applied for o in stats.operators.values()):
+        summary += " Kontribusi operator (anak membaik/diterapkan, terbaik baru): " + "; ".join(
+            f"{OPERATOR_TEXT[op]} {o.improved}/{o.applied}, {o.new_best}" for op, o in stats.operators.items()
+        ) + "."
+    if stats.rates:
+        summary += f" Laju generasi terakhir: p_m={stats.rates['mutation']:.3f}, p_c={stats.rates['crossover']:.3f}."
+
+    fitness_explanation = (
+        "Fitness lebih tinggi lebih baik. Dihitung sebagai 1000 - 100×(pelanggaran keras) - 10×(pelanggaran lunak). "
+        "Pelanggaran keras: konflik ruangan/dosen/kelas pada slot yang sama. "
+        "Pelanggaran lunak: kapasitas ruang kurang dan ketidaksesuaian preferensi waktu dosen."
+    )
+
+    expected_total = len(data.kelas_matkul)
+    generated_total = len(hasil)
+    schedule_count_ok = (generated_total == expected_total)
+    schedule_count_message = (
+        f"Total jadwal seharusnya {expected_total}, tergenerate {generated_total}. "
+        + ("Sesuai." if schedule_count_ok else "Tidak sesuai, periksa integritas data/algoritma.")
+    )
+
+    resp = GenerateResponse(
+        params=params,
+        hasil=hasil,
+        hasil_readable=hasil_readable,
+        evaluasi=evaluasi,
+        summary=summary,
+        fitness_history=history,
+        fitness_explanation=fitness_explanation,
+        expected_total=expected_total,
+        generated_total=generated_total,
+        schedule_count_ok=schedule_count_ok,
+        schedule_count_message=schedule_count_message,
+        generations_run=stats.generations,
+        stop_reason=stats.stop_reason,
+        evaluations=stats.evaluations,
+        evaluation_cache_hits=stats.evaluation_cache_hits,
+        subproblems=stats.subproblems,
+        operators={op: OperatorStatsOut(**vars(o)) for op, o in stats.operators.items()},
+        operator_rates=stats.rates,
+    )
+    finished = time.perf_counter()
+    timer.add("response", finished - building)
+    if params.engine in ENGINES:
+        evaluations = stats.generations * params.moves_per_generation
+    else:
+        evaluations = looked_up
+    record_run(params.engine, stats.generations, evaluations, stats.evaluation_cache_hits, finished - started, timer)
+    if params.profile:
+        resp.timings = {k: round(v, 6) for k, v in timer.totals.items()}
+    return resp
+
+
+
+def solve_cached(
+    params: GAParams,
+    data: DataScheduling,
+    fingerprint: str,
+    progress: Optional[ProgressFn] = None,
+    problem: Optional[CompiledProblem] = None,
+    timer: Optional[PhaseTimer] = None,
+    run_id: Optional[str] = None,
+) -> GenerateResponse:
+    # solve() behind RESULT_CACHE. Only seeded runs are cached: an unseeded
+    # request asks for a new random run. `fingerprint` identifies the data
+    # (cache.data_fingerprint). With params.checkpoint_every the run is
+    # checkpointed under `run_id` (default: a new id) and never served from
+    # the cache, whose entry would carry another run's checkpoint_id.
+    if params.seed is None or params.checkpoint_every:
+        return _solve_checkpointed(params, data, fingerprint, progress, problem, timer, run_id)
+    timer = timer or new_timer(params.profile)
+    key = result_key(fingerprint, params)
+    with timer.phase("cache"):
+        hit = RESULT_CACHE.get(key)
+    record_cache(hit is not None)
+    if hit is None:
+        resp = _solve_checkpointed(params, data, fingerprint, progress, problem, timer, run_id)
+        RESULT_CACHE.put(key, resp)
+        return resp
+    if progress is not None:
+        progress(hit.generations_run, hit.fitness_history[-1], hit.evaluasi.pelanggaran_keras)
+    timings = {k: round(v, 6) for k, v in timer.totals.items()} if params.profile else None
+    return hit.model_copy(update={"params": params, "cached": True, "timings": timings})
+
+
+def _solve_checkpointed(
+    params: GAParams,
+    data: DataScheduling,
+    fingerprint: str,
+    progress: Optional[ProgressFn],
+    problem: Optional[CompiledProblem],
+    timer: Optional[PhaseTimer],
+    run_id: Optional[str],
+) -> GenerateResponse:
+    if not params.checkpoint_every:
+        return solve(params, data, progress, problem=problem, timer=timer)
+    if not CHECKPOINTS.enabled or not checkpointable(params):
+        raise CheckpointError("Checkpoint hanya untuk engine ga tanpa island/decompose, dengan CHECKPOINT_DIR diatur")
+    run_id = run_id or uuid.uuid4().hex
+    saver = CHECKPOINTS.saver(run_id, params, fingerprint)
+    resp = solve(params, data, progress, problem=problem, timer=timer, checkpoint=saver)
+    resp.checkpoint_id = run_id
+    return resp
+
+
+def resume_run(
+    checkpoint: Checkpoint,
+    params: GAParams,
+    data: DataScheduling,
+    fingerprint: str,
+    progress: Optional[ProgressFn] = None,
+    problem: Optional[CompiledProblem] = None,
+    timer: Optional[PhaseTimer] = None,
+) -> GenerateResponse:
+    # Continue a checkpointed GA run with `params` (its own, stop criteria
+    # possibly changed), checkpointing on under the same run id. The data
+    # must be what the run started on.
+    if checkpoint.fingerprint != fingerprint:
+        raise CheckpointError("Data berubah sejak checkpoint dibuat; jalankan ulang dari awal")
+    saver = CHECKPOINTS.saver(checkpoint.run_id, params, fingerprint)
+    resp = solve(params, data, progress, problem=problem, timer=timer, checkpoint=saver, resume=checkpoint.state)
+    resp.checkpoint_id = checkpoint.run_id
+    return resp
+
+
+def reschedule(
+    req: RescheduleRequest,
+    data: DataScheduling,
+    progress: Optional[ProgressFn] = None,
+    problem: Optional[CompiledProblem] = None,
+    timer: Optional[PhaseTimer] = None,
+) -> RescheduleResponse:
+    # Re-plan after data edits: prior assignments that are still valid are
+    # kept as anchors (moving one costs req.move_penalty), the search works
+    # on the new/invalidated tasks, starting from the prior schedule.
+    timer = timer or new_timer(req.params.profile)
+    with timer.phase("warm_start"), seeded(req.params.seed):
+        problem = problem or compile_problem(data)
+        previous = [Assignment(**a.model_dump()) for a in req.previous]
+        start = build_warm_start(problem, previous, req.move_penalty)
+    resp = solve(req.params, data, progress, problem=problem, start=start, timer=timer)
+
+    result = encode_population(problem, [[Assignment(**a.model_dump()) for a in resp.hasil]])
+    kept_total = int(start.anchored.sum())
+    moved_total = int(start.moved(result)[0])
+    affected_total = problem.n_tasks - kept_total
+    summary = resp.summary + (
+        f" Penjadwalan ulang: {kept_total} jadwal dipertahankan, {affected_total} disusun ulang,"
+        f" {moved_total} jadwal lama dipindah."
+    )
+    return RescheduleResponse(
+        **resp.model_dump(exclude={"summary"}),
+        summary=summary,
+        kept_total=kept_total,
+        affected_total=affected_total,
+        moved_total=moved_total,
+    )
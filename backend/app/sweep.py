@@ -0,0 +1,141 @@
+from __future__ import annotations
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, List, Optional, Tuple, Union
+from dotenv import load_dotenv
+
+from .cache import RESULT_CACHE, result_key
+from .compiled import CompiledProblem, compile_problem
+from .islands import MP_CONTEXT
+from .metrics import NO_TIMER, record_cache, record_run
+from .models import DataScheduling
+from .schemas import GAParams, GenerateResponse, PRESETS, SweepRequest, SweepResponse, SweepRunOut
+from .service import ENGINES, solve
+
+load_dotenv()
+
+# Worker processes per sweep (default: one per CPU)
+SWEEP_WORKERS = int(os.getenv("SWEEP_WORKERS", "0")) or (os.cpu_count() or 1)
+# Runs (parameter sets x seeds) accepted per sweep
+SWEEP_MAX_RUNS = int(os.getenv("SWEEP_MAX_RUNS", "100"))
+
+# Static problem data of a worker process and the sweep's cancel flag, set
+# once by _init_worker
+_WORKER: Optional[Tuple[DataScheduling, CompiledProblem, object]] = None
+
+
+class SweepCancelled(Exception):
+    pass
+
+
+def _init_worker(data: DataScheduling, problem: CompiledProblem, cancel) -> None:
+    global _WORKER
+    _WORKER = (data, problem, cancel)
+
+
+def _run(params: GAParams) -> Tuple[GenerateResponse, float]:
+    # One sweep run inside a worker; aborts between generations once the
+    # sweep is cancelled
+    data, problem, cancel = _WORKER  # type: ignore[misc]
+
+    def progress(generation: int, best_fitness: float, best_hard: int) -> None:
+        if cancel.is_set():  # type: ignore[attr-defined]
+            raise SweepCancelled()
+
+    started = time.perf_counter()
+    resp = solve(params, data, progress, problem=problem)
+    return resp, time.perf_counter() - started
+
+
+def sweep_params(req: SweepRequest) -> List[GAParams]:
+    # Expand the request into one GAParams per run, in index order
+    runs = req.params or [
+        req.base.model_copy(update={"max_generations": p.G, "population_size": p.N, "mutation_rate": p.p_m, "tournament_size": p.k})
+        for p in PRESETS
+    ]
+    if req.seeds:
+        runs = [p.model_copy(update={"seed": seed}) for p in runs for seed in req.seeds]
+    return runs
+
+
+def _rank_key(row: SweepRunOut):
+    return (-row.fitness, row.pelanggaran_keras, row.seconds, row.index)
+
+
+def _row(index: int, params: GAParams, resp: GenerateResponse, seconds: float) -> SweepRunOut:
+    return SweepRunOut(
+        index=index,
+        params=params,
+        fitness=resp.evaluasi.fitness,
+        pelanggaran_keras=resp.evaluasi.pelanggaran_keras,
+        pelanggaran_lunak=resp.evaluasi.pelanggaran_lunak,
+        generations_run=resp.generations_run,
+        stop_reason=resp.stop_reason,
+        seconds=round(seconds, 3),
+        cached=resp.cached,
+    )
+
+
+def _completed(
+    runs: List[GAParams], data: DataScheduling, fingerprint: str, problem: CompiledProblem,
+) -> Iterator[Tuple[int, GenerateResponse, float]]:
+    # (index, response, seconds) per run in completion order: seeded runs
+    # from RESULT_CACHE first, then the rest from the process pool
+    pending: List[int] = []
+    for i, params in enumerate(runs):
+        hit = RESULT_CACHE.get(result_key(fingerprint, params)) if params.seed is not None else None
+        if params.seed is not None:
+            record_cache(hit is not None)
+        if hit is None:
+            pending.append(i)
+        else:
+            yield i, hit.model_copy(update={"params": params, "cached": True}), 0.0
+    if not pending:
+        return
+
+    cancel = MP_CONTEXT.Event()
+    pool = ProcessPoolExecutor(
+        max_workers=min(SWEEP_WORKERS, len(pending)), mp_context=MP_CONTEXT,
+        initializer=_init_worker, initargs=(data, problem, cancel),
+    )
+    try:
+        futures = {pool.submit(_run, runs[i]): i for i in pending}
+        for future in as_completed(futures):
+            i = futures[future]
+            params = runs[i]
+            resp, seconds = future.result()
+            if params.seed is not None:
+                RESULT_CACHE.put(result_key(fingerprint, params), resp)
+            # The worker's own metrics stay in the worker process
+            if params.engine in ENGINES:
+                evaluations = resp.generations_run * params.moves_per_generation
+            else:
+                evaluations = resp.evaluations + resp.evaluation_cache_hits
+            record_run(params.engine, resp.generations_run, evaluations, resp.evaluation_cache_hits, seconds, NO_TIMER)
+            yield i, resp, seconds
+    finally:
+        # Finished, failed or abandoned by the consumer: stop what still runs
+        cancel.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def run_sweep(
+    runs: List[GAParams], data: DataScheduling, fingerprint: str, problem: Optional[CompiledProblem] = None,
+) -> Iterator[Union[SweepRunOut, SweepResponse]]:
+    # Run every parameter set concurrently on a process pool. The data and
+    # compiled problem reach each worker once, through the pool initializer
+    # (as in run_islands); per run only the GAParams and the response travel.
+    # Yields a SweepRunOut as each run finishes, then the ranked
+    # SweepResponse with the full response of the best run. Closing the
+    # iterator early cancels the remaining runs.
+    problem = problem or compile_problem(data)
+    rows: List[SweepRunOut] = []
+    best: Optional[Tuple[SweepRunOut, GenerateResponse]] = None
+    for i, resp, seconds in _completed(runs, data, fingerprint, problem):
+        row = _row(i, runs[i], resp, seconds)
+        rows.append(row)
+        if best is None or _rank_key(row) < _rank_key(best[0]):
+            best = (row, resp)
+        yield row
+    yield SweepResponse(runs=sorted(rows, key=_rank_key), best=best[1])  # type: ignore[index]
@@ -0,0 +1,126 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .compiled import CompiledProblem, GENOME_DOSEN, GENOME_DTYPE, GENOME_RUANGAN, GENOME_SLOT, GENOME_WIDTH
+from .incremental import ScheduleState
+from .models import Assignment
+from .rng import py_random
+
+
+@dataclass
+class WarmStart:
+    """Prior schedule to re-optimize from (rescheduling after data edits).
+
+    Anchored tasks keep their prior assignment as reference; moving one off
+    it costs `penalty` fitness. The other (affected) tasks are new or lost a
+    valid assignment, and are the ones the engines mainly work on.
+    """
+
+    genome: np.ndarray  # (T, GENOME_WIDTH) prior schedule, affected tasks placed
+    anchored: np.ndarray  # (T,) bool
+    penalty: int
+
+    @cached_property
+    def free_tasks(self) -> List[int]:
+        return np.flatnonzero(~self.anchored).tolist()
+
+    @cached_property
+    def _prior(self) -> List[Optional[Tuple[int, int, int]]]:
+        # Per task (slot, ruang, dosen) of anchored tasks, None otherwise
+        rows = self.genome[:, [GENOME_SLOT, GENOME_RUANGAN, GENOME_DOSEN]].tolist()
+        return [tuple(row) if a else None for row, a in zip(rows, self.anchored.tolist())]
+
+    def population(self, problem: CompiledProblem, size: int) -> np.ndarray:
+        # The warm genome, then variants with the affected tasks re-placed
+        # in random order on free cells
+        population = np.empty((size, problem.n_tasks, GENOME_WIDTH), dtype=GENOME_DTYPE)
+        population[0] = self.genome
+        if size > 1:
+            state = ScheduleState(problem, self.genome)
+            for i in range(1, size):
+                state.load(self.genome)
+                _place(state, self.free_tasks)
+                population[i] = state.genome()
+        return population
+
+    def moved(self, population: np.ndarray) -> np.ndarray:
+        # (N,) anchored tasks whose assignment differs from the prior one
+        differs = (population != self.genome).any(axis=2)
+        return (differs & self.anchored).sum(axis=1)
+
+    def move_penalty(self, state: ScheduleState, t: int, slot: Optional[int], ruang: Optional[int], dosen: Optional[int]) -> int:
+        # Change of the moved-task penalty if task t is re-assigned
+        prior = self._prior[t]
+        if prior is None:
+            return 0
+        s, r, d = state.slot[t], state.ruang[t], state.dosen[t]
+        before = (s, r, d) != prior
+        after = (
+            s if slot is None else slot,
+            r if ruang is None else ruang,
+            d if dosen is None else dosen,
+        ) != prior
+        return self.penalty * (after - before)
+
+
+def _place(state: ScheduleState, tasks: List[int]) -> None:
+    # Move each task to a conflict-free cell when one exists, random order
+    rnd = py_random()
+    slots = list(range(state.problem.n_slot))
+    order = tasks[:]
+    rnd.shuffle(order)
+    for t in order:
+        rnd.shuffle(slots)
+        move = state.find_free(t, slots)
+        if move is not None:
+            state.apply_move(t, *move)
+
+
+def build_warm_start(problem: CompiledProblem, previous: List[Assignment], penalty: int) -> WarmStart:
+    # A prior assignment stays anchored when its ids still exist, the room
+    # type and lecturer still fit the matkul, the lecturer is available in
+    # that slot (kesediaan) and it does not clash with an earlier anchored
+    # one. Tasks are matched to prior assignments by (id_kelas, id_matkul).
+    by_task: Dict[Tuple[int, int], List[Assignment]] = {}
+    for a in previous:
+        by_task.setdefault((a.id_kelas, a.id_matkul), []).append(a)
+    kelas_ids = problem.kelas_ids.tolist()
+    matkul_ids = problem.matkul_ids.tolist()
+    pref = problem.pref_table
+
+    rnd = py_random()
+    n_tasks = problem.n_tasks
+    genome = np.empty((n_tasks, GENOME_WIDTH), dtype=GENOME_DTYPE)
+    anchored = np.zeros(n_tasks, dtype=bool)
+    used: Set[Tuple[str, int, int]] = set()
+    for t in range(n_tasks):
+        k, m = int(problem.task_kelas[t]), int(problem.task_matkul[t])
+        rooms = problem.matkul_rooms[m]
+        genome[t] = (rnd.randrange(problem.n_slot), rnd.choice(problem.task_rooms[t]), rnd.choice(problem.task_dosen[t]))
+        prior = by_task.get((kelas_ids[k], matkul_ids[m]))
+        if not prior:
+            continue
+        a = prior.pop(0)
+        s = problem.slot_pos.get(a.id_slot)
+        r = problem.ruangan_pos.get(a.id_ruangan)
+        d = problem.dosen_pos.get(a.id_dosen)
+        if s is None or r is None or d is None:
+            continue
+        if (rooms and r not in rooms) or d not in problem.task_dosen[t] or pref[d][s]:
+            continue
+        genome[t] = (s, r, d)
+        cells = (("r", s, r), ("d", s, d), ("k", s, k))
+        if any(c in used for c in cells):
+            continue
+        used.update(cells)
+        anchored[t] = True
+
+    start = WarmStart(genome=genome, anchored=anchored, penalty=penalty)
+    state = ScheduleState(problem, genome)
+    _place(state, start.free_tasks)
+    start.genome = state.genome()
+    return start
@@ -0,0 +1,141 @@
+"""
+Deterministic synthetic instances for benchmarking, from seed-sized up to
+faculty-wide. Same shapes and conventions as backend/db/seed.sql: "teori"
+and "lab" rooms, 1-sks lab / 3-sks theory matkul, lecturers with batas_sks,
+skills and morning/afternoon kesediaan.
+
+Tightness is demand / supply, in (0, 1]: room_tightness=0.9 means the tasks
+of each room type fill 90% of that type's (slot, room) cells; likewise
+lecturer_tightness for lecturer-slots and sks load.
+
+faculties > 1 splits the instance into that many faculties with their own
+matkul, kelas, lecturers and rooms (sharing only the time slots), i.e.
+independent subproblems as in a university-wide deployment. Each faculty
+gets its own room types ("teori F1", "lab F2", ...), i.e. its own buildings;
+rooms shared across faculties would couple them.
+"""
+from __future__ import annotations
+import math
+import random
+from dataclasses import replace
+from typing import Dict, List
+
+from app.models import DataScheduling, Dosen, Kelas, KelasMatkul, Matkul, Ruangan, SlotWaktu
+
+HARI = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu"]
+MATKUL_PER_KELAS = 8
+BATAS_SKS = 12
+
+# Named instance sizes (number of kelas_matkul rows)
+SIZES: Dict[str, int] = {
+    "seed": 192,
+    "small": 1000,
+    "medium": 4000,
+    "faculty": 12000,
+}
+
+
+def _slots(days: int, slots_per_day: int) -> List[SlotWaktu]:
+    out = []
+    for h in HARI[:days]:
+        for j in range(slots_per_day):
+            mulai = 7 + 2 * j
+            out.append(SlotWaktu(id=len(out) + 1, hari=h, mulai=f"{mulai:02d}:00", selesai=f"{mulai + 2:02d}:00"))
+    return out
+
+
+def generate_instance(
+    n_tasks: int,
+    room_tightness: float = 0.8,
+    lecturer_tightness: float = 0.6,
+    days: int = 5,
+    slots_per_day: int = 4,
+    seed: int = 0,
+    faculties: int = 1,
+) -> DataScheduling:
+    if faculties > 1:
+        return _faculties(n_tasks, room_tightness, lecturer_tightness, days, slots_per_day, seed, faculties)
+    rng = random.Random(seed)
+    slot_waktu = _slots(days, slots_per_day)
+    n_slot = len(slot_waktu)
+
+    n_matkul = max(24, n_tasks // 40)
+    matkul = [
+        Matkul(id=i, nama=f"Matkul {i:04d}", sks=1 if i % 4 == 0 else 3, jenis_ruangan="lab" if i % 4 == 0 else "teori")
+        for i in range(1, n_matkul + 1)
+    ]
+    n_kelas = math.ceil(n_tasks / MATKUL_PER_KELAS)
+    kelas = [Kelas(id=i, nama=f"KEL-{i:04d}", jumlah_mahasiswa=rng.randint(25, 50)) for i in range(1, n_kelas + 1)]
+    kelas_matkul: List[KelasMatkul] = []
+    for k in kelas:
+        for m in rng.sample(matkul, min(MATKUL_PER_KELAS, n_tasks - len(kelas_matkul))):
+            kelas_matkul.append(KelasMatkul(id=len(kelas_matkul) + 1, id_kelas=k.id, id_matkul=m.id))
+
+    by_id = {m.id: m for m in matkul}
+    demand = {"teori": 0, "lab": 0}
+    total_sks = 0
+    for km in kelas_matkul:
+        m = by_id[km.id_matkul]
+        demand[m.jenis_ruangan] += 1
+        total_sks += m.sks
+    ruangan: List[Ruangan] = []
+    for jenis, tasks in demand.items():
+        for _ in range(max(1, math.ceil(tasks / (n_slot * room_tightness)))):
+            prefix = "LAB" if jenis == "lab" else "R"
+            ruangan.append(Ruangan(
+                id=len(ruangan) + 1, nama=f"{prefix}-{len(ruangan) + 1:04d}", jenis=jenis, kapasitas=rng.randint(30, 60),
+            ))
+
+    # Enough lecturers for the slot demand and for the sks load
+    n_dosen = math.ceil(max(n_tasks / n_slot, total_sks / BATAS_SKS) / lecturer_tightness)
+    pagi = {h: [f"{s.mulai}-{s.selesai}" for s in slot_waktu if s.hari == h][:slots_per_day // 2 or 1] for h in HARI[:days]}
+    siang = {h: [f"{s.mulai}-{s.selesai}" for s in slot_waktu if s.hari == h][slots_per_day // 2:] for h in HARI[:days]}
+    dosen: List[Dosen] = []
+    for i in range(1, n_dosen + 1):
+        # Every matkul gets lecturers round-robin, plus a few random skills
+        skills = {matkul[(i - 1) % n_matkul].id} | {m.id for m in rng.sample(matkul, min(3, n_matkul))}
+        kesediaan = rng.choice([pagi, siang, {}])
+        dosen.append(Dosen(
+            id=i, nama=f"Dosen {i:04d}", batas_sks=BATAS_SKS, kesediaan=kesediaan, keahlian_matkul_ids=sorted(skills),
+        ))
+
+    return DataScheduling(
+        dosen=dosen,
+        matkul=matkul,
+        kelas=kelas,
+        kelas_matkul=kelas_matkul,
+        ruangan=ruangan,
+        slot_waktu=slot_waktu,
+    )
+
+
+
+def _faculties(
+    n_tasks: int, room_tightness: float, lecturer_tightness: float, days: int, slots_per_day: int, seed: int, faculties: int,
+) -> DataScheduling:
+    # One instance per faculty, ids shifted past the previous faculties
+    out = DataScheduling(dosen=[], matkul=[], kelas=[], kelas_matkul=[], ruangan=[], slot_waktu=_slots(days, slots_per_day))
+    for f in range(faculties):
+        share = n_tasks // faculties + (f < n_tasks % faculties)
+        part = generate_instance(share, room_tightness, lecturer_tightness, days, slots_per_day, seed=seed * faculties + f)
+        dosen_off, matkul_off, kelas_off = len(out.dosen), len(out.matkul), len(out.kelas)
+        km_off, ruangan_off = len(out.kelas_matkul), len(out.ruangan)
+        prefix = f"F{f + 1} "
+        out.matkul += [
+            replace(m, id=m.id + matkul_off, nama=prefix + m.nama, jenis_ruangan=f"{m.jenis_ruangan} {prefix.strip()}")
+            for m in part.matkul
+        ]
+        out.kelas += [replace(k, id=k.id + kelas_off, nama=prefix + k.nama) for k in part.kelas]
+        out.ruangan += [
+            replace(r, id=r.id + ruangan_off, nama=prefix + r.nama, jenis=f"{r.jenis} {prefix.strip()}")
+            for r in part.ruangan
+        ]
+        out.dosen += [
+            replace(d, id=d.id + dosen_off, nama=prefix + d.nama, keahlian_matkul_ids=[m + matkul_off for m in d.keahlian_matkul_ids])
+            for d in part.dosen
+        ]
+        out.kelas_matkul += [
+            replace(km, id=km.id + km_off, id_kelas=km.id_kelas + kelas_off, id_matkul=km.id_matkul + matkul_off)
+            for km in part.kelas_matkul
+        ]
+    return out
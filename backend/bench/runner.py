@@ -0,0 +1,187 @@
+"""
+Benchmark runner: every preset of app.schemas.PRESETS on synthetic instances
+(bench/generator.py), each run in a fresh process so peak memory is per run.
+
+Run from backend/:
+
+    python -m bench.runner --sizes seed small --out bench_results.json
+    python -m bench.runner --sizes seed --compare bench_results.json
+
+Reported per (size, preset): initialization time, generations/s and
+evaluations/s over the generation loop (individuals scored; moves for the
+sa/tabu engines), the share of evaluations served by the fitness cache,
+peak RSS, time until the best schedule has no hard violations, final
+fitness and why the run stopped. The time limit is only checked between
+generations, so it does not cut initialization short. Results are written
+as JSON; --compare prints the relative change against an earlier results file.
+
+--faculties F generates F independent faculties per instance; with
+--decompose they are solved as parallel subproblems (app/decompose.py).
+Peak RSS is then that of the parent process only.
+
+--crossover, --crossover-rate, --targeted-mutation and --adaptive-rates
+select the GA operators; each result records what every operator
+contributed (children improved / produced, new bests).
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.schemas import GAParams, PRESETS
+from app.service import solve
+from bench.generator import SIZES, generate_instance
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(size: str, preset_index: int, params: Dict[str, Any], instance: Dict[str, Any], seed: int) -> Dict[str, Any]:
+    # One benchmark run; executed in its own worker process
+    data = generate_instance(SIZES[size], seed=seed, **instance)
+    ga_params = GAParams(**params)
+    # seconds since start at generation 0 (initial population ready) and
+    # when the best schedule first had no hard violations
+    init_at: List[float] = []
+    zero_hard_at: List[float] = []
+    started = time.perf_counter()
+
+    def progress(generation: int, best_fitness: float, best_hard: int) -> None:
+        now = time.perf_counter() - started
+        if not init_at:
+            init_at.append(now)
+        if best_hard == 0 and not zero_hard_at:
+            zero_hard_at.append(now)
+
+    resp = solve(ga_params, data, progress)
+    elapsed = time.perf_counter() - started
+    generations = resp.generations_run
+    # Throughput over the generation loop only, initialization excluded
+    loop_s = max(elapsed - init_at[0], 1e-9)
+    per_generation = ga_params.population_size * max(1, ga_params.islands) if ga_params.engine == "ga" else ga_params.moves_per_generation
+    per_generation *= resp.subproblems
+    return {
+        "size": size,
+        "n_tasks": len(data.kelas_matkul),
+        "preset": preset_index,
+        "params": params,
+        "elapsed_s": round(elapsed, 3),
+        "init_s": round(init_at[0], 3),
+        "generations": generations,
+        "subproblems": resp.subproblems,
+        "generations_per_s": round(generations / loop_s, 2),
+        "evaluations_per_s": round(generations * per_generation / loop_s, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        # share of GA evaluations answered by the per-run fitness cache
+        "evaluation_cache_hit_rate": round(resp.evaluation_cache_hits / max(1, resp.evaluations + resp.evaluation_cache_hits), 3),
+        "time_to_zero_hard_s": round(zero_hard_at[0], 3) if zero_hard_at else None,
+        "fitness": resp.evaluasi.fitness,
+        "pelanggaran_keras": resp.evaluasi.pelanggaran_keras,
+        "pelanggaran_lunak": resp.evaluasi.pelanggaran_lunak,
+        "stop_reason": resp.stop_reason,
+        "operators": {op: o.model_dump() for op, o in resp.operators.items()},
+        "operator_rates": resp.operator_rates,
+    }
+
+
+def load_results(path: str) -> Dict[Any, Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return {(r["size"], r["preset"]): r for r in json.load(f)["results"]}
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[Any, Dict[str, Any]], baseline_path: str) -> None:
+    print(f"\nvs {baseline_path}:")
+    for r in results:
+        old = baseline.get((r["size"], r["preset"]))
+        if old is None:
+            continue
+        speed = r["generations_per_s"] / old["generations_per_s"] if old["generations_per_s"] else float("nan")
+        print(
+            f"  {r['size']:>8} preset {r['preset']:>2}: gen/s x{speed:.2f}, "
+            f"fitness {old['fitness']:.0f} -> {r['fitness']:.0f}, peak {old['peak_rss_mb']} -> {r['peak_rss_mb']} MB"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", nargs="+", default=["seed", "small"], choices=list(SIZES))
+    ap.add_argument("--presets", nargs="+", type=int, default=list(range(len(PRESETS))), help="indices into PRESETS")
+    ap.add_argument("--engine", default="ga", choices=["ga", "sa", "tabu"])
+    ap.add_argument("--init", default="csp", choices=["csp", "greedy"])
+    ap.add_argument("--time-limit", type=float, default=120.0, help="seconds per run")
+    ap.add_argument(
+        "--stop-on-perfect", action="store_true",
+        help="end runs at fitness 1000 (default: run all generations, so throughput is measured)",
+    )
+    ap.add_argument("--room-tightness", type=float, default=0.8)
+    ap.add_argument("--lecturer-tightness", type=float, default=0.6)
+    ap.add_argument("--faculties", type=int, default=1, help="independent faculties per instance")
+    ap.add_argument("--decompose", action="store_true", help="solve independent faculties as parallel subproblems")
+    ap.add_argument("--crossover", default="one_point", choices=["one_point", "uniform"])
+    ap.add_argument("--crossover-rate", type=float, default=1.0)
+    ap.add_argument("--targeted-mutation", action="store_true", help="mutate mostly genes in violations")
+    ap.add_argument("--adaptive-rates", action="store_true", help="adapt mutation/crossover rates to diversity and stagnation")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--compare", help="earlier results JSON to compare against")
+    args = ap.parse_args(argv)
+
+    # Read the baseline first: --out may point at the same file
+    baseline = load_results(args.compare) if args.compare else None
+    instance = {"room_tightness": args.room_tightness, "lecturer_tightness": args.lecturer_tightness, "faculties": args.faculties}
+    results: List[Dict[str, Any]] = []
+    for size in args.sizes:
+        for i in args.presets:
+            p = PRESETS[i]
+            params = {
+                "max_generations": p.G, "population_size": p.N, "mutation_rate": p.p_m, "tournament_size": p.k,
+                "engine": args.engine, "init_strategy": args.init, "time_limit_s": args.time_limit,
+                "stop_on_perfect": args.stop_on_perfect, "seed": args.seed, "decompose": args.decompose,
+                "crossover": args.crossover, "crossover_rate": args.crossover_rate,
+                "targeted_mutation": args.targeted_mutation, "adaptive_rates": args.adaptive_rates,
+            }
+            # Fresh process per run: isolated peak RSS, no warm caches
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                r = pool.submit(run_case, size, i, params, instance, args.seed).result()
+            results.append(r)
+            zero = "-" if r["time_to_zero_hard_s"] is None else f"{r['time_to_zero_hard_s']:.2f}s"
+            print(
+                f"{size:>8} ({r['n_tasks']} tugas) preset {i:>2}: init {r['init_s']:.1f}s, "
+                f"{r['generations']} gen in {r['elapsed_s']:.1f}s, {r['subproblems']} subproblem "
+                f"({r['generations_per_s']} gen/s, {r['evaluations_per_s']} eval/s, cache {r['evaluation_cache_hit_rate']:.0%}), peak {r['peak_rss_mb']} MB, "
+                f"hard=0 at {zero}, fitness {r['fitness']:.0f} [{r['stop_reason']}]"
+            )
+            if r["operators"]:
+                print("          operator: " + ", ".join(
+                    f"{op} {o['improved']}/{o['applied']} (best {o['new_best']})" for op, o in r["operators"].items()
+                ))
+
+    out = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(out, f, indent=1)
+    print(f"Wrote {args.out}")
+    if baseline is not None:
+        compare(results, baseline, args.compare)
+
+
+if __name__ == "__main__":
+    main()
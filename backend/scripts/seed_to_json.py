@@ -0,0 +1,63 @@
+"""
+Write `backend/db/seed.json`: the same rows `backend/db/seed.sql` inserts,
+in the shape read by the file data source (DATA_SOURCE=file). Lets the API,
+the loader and the GA run offline without Supabase.
+
+Keep in sync with seed.sql when the seed changes.
+"""
+from __future__ import annotations
+import json
+from pathlib import Path
+
+HARI = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat"]
+JAM = [("08:00", "10:00"), ("10:00", "12:00"), ("12:00", "14:00"), ("14:00", "16:00")]
+RUANGAN = [
+    ("R-101", "teori", 40), ("R-102", "teori", 45), ("R-103", "teori", 50), ("R-104", "teori", 35),
+    ("R-105", "teori", 60), ("R-106", "teori", 48), ("R-107", "teori", 42), ("R-108", "teori", 55),
+    ("R-109", "teori", 38), ("R-110", "teori", 52), ("R-111", "teori", 36), ("R-112", "teori", 44),
+    ("LAB-1", "lab", 40), ("LAB-2", "lab", 35), ("LAB-3", "lab", 45), ("LAB-4", "lab", 32), ("LAB-5", "lab", 50),
+]
+PAGI = {"Senin": ["08:00-10:00", "10:00-12:00"], "Rabu": ["08:00-10:00"], "Jumat": ["08:00-10:00", "10:00-12:00"]}
+SIANG = {"Selasa": ["12:00-14:00", "14:00-16:00"], "Kamis": ["12:00-14:00", "14:00-16:00"]}
+
+
+def build_seed() -> dict:
+    matkul = [
+        {"id": i, "nama": f"Matkul {i:02d}", "sks": 1 if i % 4 == 0 else 3, "jenis_ruangan": "lab" if i % 4 == 0 else "teori"}
+        for i in range(1, 25)
+    ]
+    kelas = [{"id": i, "nama": f"KEL-{i:02d}", "jumlah_mahasiswa": 25 + ((i * 3) % 26)} for i in range(1, 25)]
+    ruangan = [{"id": i, "nama": n, "jenis": j, "kapasitas": c} for i, (n, j, c) in enumerate(RUANGAN, start=1)]
+    slot_waktu = [
+        {"id": i, "hari": h, "waktu_mulai": a, "waktu_selesai": b}
+        for i, (h, (a, b)) in enumerate(((h, jam) for h in HARI for jam in JAM), start=1)
+    ]
+    dosen = [
+        {
+            "id": i,
+            "nama": f"Dosen {i:02d}",
+            "batas_sks": 12,
+            "kesediaan": PAGI if i % 2 == 0 else SIANG,
+            "keahlian_matkul_ids": [((i - 1) % 24) + 1, ((i + 7 - 1) % 24) + 1, ((i + 13 - 1) % 24) + 1],
+        }
+        for i in range(1, 40)
+    ]
+    # Each kelas takes the first 8 matkul with (id + kelas.id) % 3 == 0
+    kelas_matkul = []
+    for k in kelas:
+        for m in [m for m in matkul if (m["id"] + k["id"]) % 3 == 0][:8]:
+            kelas_matkul.append({"id": len(kelas_matkul) + 1, "id_kelas": k["id"], "id_matkul": m["id"]})
+    return {
+        "dosen": dosen,
+        "matkul": matkul,
+        "kelas": kelas,
+        "kelas_matkul": kelas_matkul,
+        "ruangan": ruangan,
+        "slot_waktu": slot_waktu,
+    }
+
+
+if __name__ == "__main__":
+    out = Path(__file__).resolve().parents[1] / "db" / "seed.json"
+    out.write_text(json.dumps(build_seed(), indent=1) + "\n", encoding="utf-8")
+    print(f"Wrote {out}")
@@ -0,0 +1,33 @@
+import os
+
+# Offline data (db/seed.json); set before app.db reads it
+os.environ.setdefault("DATA_SOURCE", "file")
+
+import numpy as np
+import pytest
+
+from app.compiled import GENOME_DOSEN, GENOME_RUANGAN, GENOME_SLOT, GENOME_WIDTH, compile_problem
+from app.db import FileSource, fetch_all_data
+
+
+@pytest.fixture(scope="session")
+def data():
+    return fetch_all_data(FileSource())
+
+
+@pytest.fixture(scope="session")
+def problem(data):
+    return compile_problem(data)
+
+
+@pytest.fixture
+def random_population(problem):
+    # Uniformly random genomes: plenty of hard and soft violations
+    def make(n: int, seed: int = 0) -> np.ndarray:
+        rng = np.random.default_rng(seed)
+        population = np.empty((n, problem.n_tasks, GENOME_WIDTH), dtype=np.int32)
+        population[:, :, GENOME_SLOT] = rng.integers(problem.n_slot, size=(n, problem.n_tasks))
+        population[:, :, GENOME_RUANGAN] = rng.integers(problem.n_ruangan, size=(n, problem.n_tasks))
+        population[:, :, GENOME_DOSEN] = rng.integers(problem.n_dosen, size=(n, problem.n_tasks))
+        return population
+    return make
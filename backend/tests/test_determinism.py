@@ -0,0 +1,70 @@
+import uuid
+
+import pytest
+
+from app import decompose
+from app.cache import data_fingerprint
+from app.checkpoint import CheckpointStore
+from app.decompose import run_decomposed
+from app.islands import run_islands
+from app.rng import seeded
+from app.schemas import GAParams
+from app.service import run_engine, solve
+from bench.generator import generate_instance
+
+# Greedy start, low mutation and no repair: the seed data still improves
+# after generation 60
+RUN = dict(seed=5, population_size=30, mutation_rate=0.01, init_strategy="greedy", repair_budget=0, stop_on_perfect=False)
+RUN_ID = uuid.uuid4().hex
+
+
+@pytest.mark.parametrize("options", [{}, {"crossover": "uniform", "targeted_mutation": True, "adaptive_rates": True}])
+def test_resumed_run_equals_uninterrupted_run(data, problem, tmp_path, options):
+    full = solve(GAParams(max_generations=100, **RUN, **options), data, problem=problem)
+    assert full.fitness_history[-1] > full.fitness_history[60]
+
+    store = CheckpointStore(str(tmp_path))
+    fingerprint = data_fingerprint(data)
+    first = GAParams(max_generations=60, checkpoint_every=60, **RUN, **options)
+    solve(first, data, problem=problem, checkpoint=store.saver(RUN_ID, first, fingerprint))
+    checkpoint = store.load(RUN_ID)
+    assert checkpoint.state.generation == 60
+
+    rest = first.model_copy(update={"max_generations": 100})
+    resumed = solve(rest, data, problem=problem, checkpoint=store.saver(RUN_ID, rest, fingerprint), resume=checkpoint.state)
+    assert resumed.hasil == full.hasil
+    assert resumed.fitness_history == full.fitness_history
+    assert resumed.generations_run == full.generations_run == 100
+    # The fitness memo starts empty on resume: same lookups, split differently
+    assert resumed.evaluations + resumed.evaluation_cache_hits == full.evaluations + full.evaluation_cache_hits
+    assert resumed.operators == full.operators
+    assert store.load(RUN_ID).state.generation == 100
+
+
+def test_seeded_islands_are_reproducible(data, problem):
+    def run():
+        best, evaluation, history, stats = run_islands(
+            data, max_generations=10, population_size=20, islands=2, migration_interval=4, problem=problem,
+            init_strategy="greedy", repair_budget=0, seed=7,
+        )
+        return best, evaluation.fitness, history, stats.generations
+
+    first = run()
+    assert first[3] == 10
+    assert run() == first
+
+
+def test_seeded_decomposition_is_reproducible(monkeypatch):
+    # Two independent faculties; at least two workers so both run in the pool
+    monkeypatch.setattr(decompose, "DECOMPOSE_WORKERS", 2)
+    data = generate_instance(120, seed=3, faculties=2)
+    params = GAParams(max_generations=10, **{**RUN, "seed": 7})
+
+    def run():
+        with seeded(params.seed):
+            best, evaluation, history, stats = run_decomposed(params, data, run_engine)
+        return best, evaluation.fitness, history, stats.generations, stats.subproblems
+
+    first = run()
+    assert first[4] == 2
+    assert run() == first
@@ -0,0 +1,41 @@
+import numpy as np
+
+from app.compiled import decode_genome, evaluate_population
+from app.ga import INIT_CSP, INIT_GREEDY, evaluate_individual, initialize_population
+
+
+def _reference(data, problem, population):
+    evals = [evaluate_individual(data, decode_genome(problem, g), detail=False) for g in population]
+    return (
+        np.array([e.pelanggaran_keras for e in evals]),
+        np.array([e.pelanggaran_lunak for e in evals]),
+        np.array([e.fitness for e in evals]),
+    )
+
+
+def test_random_population_matches_evaluate_individual(data, problem, random_population):
+    population = random_population(20)
+    hard, soft, fitness = evaluate_population(problem, population)
+    ref_hard, ref_soft, ref_fitness = _reference(data, problem, population)
+    assert ref_hard.min() > 0
+    np.testing.assert_array_equal(hard, ref_hard)
+    np.testing.assert_array_equal(soft, ref_soft)
+    np.testing.assert_array_equal(fitness, ref_fitness)
+
+
+def test_initial_populations_match_evaluate_individual(data, problem):
+    for strategy in (INIT_GREEDY, INIT_CSP):
+        population = initialize_population(data, 10, problem, strategy)
+        hard, soft, fitness = evaluate_population(problem, population)
+        ref_hard, ref_soft, ref_fitness = _reference(data, problem, population)
+        np.testing.assert_array_equal(hard, ref_hard)
+        np.testing.assert_array_equal(soft, ref_soft)
+        np.testing.assert_array_equal(fitness, ref_fitness)
+
+
+def test_soft_weights(data, problem, random_population):
+    population = random_population(5, seed=1)
+    _, soft, fitness = evaluate_population(problem, population, w_soft_capacity=2, w_soft_pref=3)
+    for g, s, f in zip(population, soft, fitness):
+        ref = evaluate_individual(data, decode_genome(problem, g), w_soft_capacity=2, w_soft_pref=3, detail=False)
+        assert (s, f) == (ref.pelanggaran_lunak, ref.fitness)
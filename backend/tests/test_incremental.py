@@ -0,0 +1,50 @@
+import random
+
+from app.compiled import evaluate_population
+from app.incremental import ScheduleState
+
+
+def _full(problem, state):
+    hard, soft, fitness = evaluate_population(problem, state.genome()[None])
+    return int(hard[0]), int(soft[0]), int(fitness[0])
+
+
+def test_initial_totals_match_full_evaluation(problem, random_population):
+    for genome in random_population(5):
+        state = ScheduleState(problem, genome)
+        assert (state.hard, state.soft, state.fitness) == _full(problem, state)
+
+
+def test_move_delta_matches_full_evaluation_after_apply_move(problem, random_population):
+    rnd = random.Random(0)
+    state = ScheduleState(problem, random_population(1)[0])
+    hard, soft, fitness = _full(problem, state)
+    for _ in range(500):
+        t = rnd.randrange(problem.n_tasks)
+        # Any subset of the genes, including none
+        slot = rnd.randrange(problem.n_slot) if rnd.random() < 0.5 else None
+        ruang = rnd.randrange(problem.n_ruangan) if rnd.random() < 0.5 else None
+        dosen = rnd.randrange(problem.n_dosen) if rnd.random() < 0.5 else None
+        dh, ds = state.move_delta(t, slot, ruang, dosen)
+        df = state.move_fitness_delta(t, slot, ruang, dosen)
+        state.apply_move(t, slot, ruang, dosen)
+        new_hard, new_soft, new_fitness = _full(problem, state)
+        assert (dh, ds, df) == (new_hard - hard, new_soft - soft, new_fitness - fitness)
+        assert (state.hard, state.soft, state.fitness) == (new_hard, new_soft, new_fitness)
+        hard, soft, fitness = new_hard, new_soft, new_fitness
+
+
+def test_moves_back_restore_the_totals(problem, random_population):
+    genome = random_population(1, seed=2)[0]
+    state = ScheduleState(problem, genome)
+    before = (state.hard, state.soft)
+    rnd = random.Random(1)
+    moves = []
+    for _ in range(50):
+        t = rnd.randrange(problem.n_tasks)
+        moves.append((t, state.slot[t], state.ruang[t], state.dosen[t]))
+        state.apply_move(t, rnd.randrange(problem.n_slot), rnd.randrange(problem.n_ruangan), rnd.randrange(problem.n_dosen))
+    for t, s, r, d in reversed(moves):
+        state.apply_move(t, s, r, d)
+    assert (state.hard, state.soft) == before
+    assert (state.genome() == genome).all()
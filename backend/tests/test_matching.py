@@ -0,0 +1,32 @@
+import numpy as np
+
+from app.compiled import GENOME_RUANGAN, GENOME_SLOT
+from app.matching import RoomMatcher, room_cost_table
+
+
+def test_rooms_distinct_per_slot_and_slot_cost_minimal(problem, random_population):
+    matcher = RoomMatcher(problem)
+    cost = room_cost_table(problem)
+    population = random_population(10)
+    matcher.assign_population(population)
+    for genome in population:
+        for s in range(problem.n_slot):
+            tasks = np.flatnonzero(genome[:, GENOME_SLOT] == s)
+            rooms = genome[tasks, GENOME_RUANGAN]
+            if len(tasks) <= problem.n_ruangan:
+                assert len(set(rooms.tolist())) == len(tasks)
+            # No single task can move to a free room that is cheaper for it
+            free = np.setdiff1d(np.arange(problem.n_ruangan), rooms)
+            if len(free):
+                assert (cost[tasks][:, free].min(axis=1) >= cost[tasks, rooms] - 1e-9).all()
+
+
+def test_memoized_slots_give_the_same_rooms(problem, random_population):
+    matcher = RoomMatcher(problem)
+    genome = random_population(1, seed=3)[0]
+    first = genome.copy()
+    matcher.assign(first)
+    assert matcher._cache
+    again = genome.copy()
+    matcher.assign(again)
+    assert (again == first).all()
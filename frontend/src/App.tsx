@@ -1,5 +1,5 @@
 import React, { useEffect, useState, useMemo, useRef } from 'react'
-import { GAParams, generate, getPresets, GenerateResponse } from './api'
+import { GAParams, getPresets, GenerateResponse, JobProgress, submitJob, watchJob, getJob, getJobResult, cancelJob, sweep, SweepRun } from './api'
 import { Line } from 'react-chartjs-2'
 import {
   Chart as ChartJS,
@@ -31,6 +31,9 @@ export default function App() {
   const [error, setError] = useState<string|undefined>()
   const [result, setResult] = useState<GenerateResponse|undefined>()
   const [presets, setPresets] = useState<{G:number,N:number,p_m:number,k:number}[]>([])
+  const [jobId, setJobId] = useState<string|undefined>()
+  const [progress, setProgress] = useState<JobProgress|undefined>()
+  const [sweepRuns, setSweepRuns] = useState<SweepRun[]>([])
   const tableRef = useRef<HTMLTableElement|null>(null)
 
   useEffect(() => {
@@ -38,16 +41,47 @@ export default function App() {
   }, [])
 
   const onRun = async () => {
-    setLoading(true); setError(undefined); setResult(undefined)
+    setLoading(true); setError(undefined); setResult(undefined); setProgress(undefined)
     try {
-      const res = await generate(params)
-      setResult(res)
+      const job = await submitJob(params)
+      setJobId(job.job_id)
+      watchJob(job.job_id, setProgress, async status => {
+        try {
+          if (status === 'done') setResult(await getJobResult(job.job_id))
+          else if (status === 'failed') setError((await getJob(job.job_id)).error || 'Job gagal')
+          else setError('Job dibatalkan')
+        } catch (e:any) {
+          setError(e.message || String(e))
+        } finally {
+          setLoading(false); setJobId(undefined)
+        }
+      })
+    } catch (e:any) {
+      setError(e.message || String(e))
+      setLoading(false)
+    }
+  }
+
+  // Run every preset with the current seed/other settings in parallel;
+  // rows appear as runs finish, then ranked, and the best is shown below
+  const onSweep = async () => {
+    setLoading(true); setError(undefined); setResult(undefined); setSweepRuns([])
+    try {
+      await sweep(
+        { base: params },
+        run => setSweepRuns(rows => [...rows, run]),
+        done => { setSweepRuns(done.runs); setResult(done.best) },
+      )
     } catch (e:any) {
       setError(e.message || String(e))
     } finally {
       setLoading(false)
     }
   }
+
+  const onCancel = async () => {
+    if (jobId) await cancelJob(jobId).catch(console.error)
+  }
   const chartData = useMemo(() => {
     if (!result) return undefined
     return {
@@ -104,6 +138,7 @@ export default function App() {
 
   const applyPreset = (p: {G:number,N:number,p_m:number,k:number}) => {
     setParams({
+      ...params,
       max_generations: p.G,
       population_size: p.N,
       mutation_rate: p.p_m,
@@ -132,10 +167,34 @@ export default function App() {
           <label>Tournament Size (k)</label>
           <input type="number" value={params.tournament_size} min={2} onChange={e => setParams({...params, tournament_size: Number(e.target.value)})} />
         </div>
+        <div>
+          <label>Seed (kosong = acak)</label>
+          <input type="number" value={params.seed ?? ''} min={0} onChange={e => setParams({...params, seed: e.target.value === '' ? null : Number(e.target.value)})} />
+        </div>
+        <div>
+          <label>Crossover</label>
+          <select value={params.crossover ?? 'one_point'} onChange={e => setParams({...params, crossover: e.target.value as GAParams['crossover']})}>
+            <option value="one_point">Satu titik</option>
+            <option value="uniform">Uniform per tugas</option>
+          </select>
+        </div>
+        <div>
+          <label>
+            <input type="checkbox" checked={!!params.targeted_mutation} onChange={e => setParams({...params, targeted_mutation: e.target.checked})} />
+            Mutasi terarah ke pelanggaran
+          </label>
+        </div>
+        <div>
+          <label>
+            <input type="checkbox" checked={!!params.adaptive_rates} onChange={e => setParams({...params, adaptive_rates: e.target.checked})} />
+            Laju mutasi/crossover adaptif
+          </label>
+        </div>
         <div style={{gridColumn: '1 / -1', marginTop: 8}}>
           <button onClick={onRun} disabled={loading}>
-            {loading ? 'Menghitung...' : 'Generate Jadwal'}
+            {loading ? `Menghitung...${progress ? ` generasi ${progress.generation}/${params.max_generations}, fitness ${progress.best_fitness}` : ''}` : 'Generate Jadwal'}
           </button>
+          {loading && jobId && <button onClick={onCancel} style={{marginLeft: 8}}>Batalkan</button>}
         </div>
       </section>
 
@@ -147,7 +206,32 @@ export default function App() {
               G={p.G}, N={p.N}, p_m={p.p_m}, k={p.k}
             </button>
           ))}
+          <button onClick={onSweep} disabled={loading}>Bandingkan semua preset</button>
         </div>
+        {sweepRuns.length > 0 && (
+          <table style={{marginTop: 12, borderCollapse:'collapse'}}>
+            <thead>
+              <tr>
+                {['Preset','Seed','Fitness','Keras','Lunak','Generasi','Waktu (s)'].map(h => (
+                  <th key={h} style={{borderBottom:'1px solid #ddd', textAlign:'left', paddingRight: 12}}>{h}</th>
+                ))}
+              </tr>
+            </thead>
+            <tbody>
+              {sweepRuns.map(r => (
+                <tr key={r.index}>
+                  <td>G={r.params.max_generations}, N={r.params.population_size}, p_m={r.params.mutation_rate}, k={r.params.tournament_size}</td>
+                  <td>{r.params.seed ?? '-'}</td>
+                  <td>{r.fitness}</td>
+                  <td>{r.pelanggaran_keras}</td>
+                  <td>{r.pelanggaran_lunak}</td>
+                  <td>{r.generations_run}</td>
+                  <td>{r.cached ? 'cache' : r.seconds}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        )}
       </section>
 
       {error && (
@@ -159,7 +243,7 @@ export default function App() {
           <h3>Hasil</h3>
           <div>Fitness: <b>{result.evaluasi.fitness}</b></div>
           <div>Pelanggaran keras: {result.evaluasi.pelanggaran_keras} | lunak: {result.evaluasi.pelanggaran_lunak}</div>
-          <div>Parameter: G={result.params.max_generations}, N={result.params.population_size}, p_m={result.params.mutation_rate}, k={result.params.tournament_size}</div>
+          <div>Parameter: G={result.params.max_generations}, N={result.params.population_size}, p_m={result.params.mutation_rate}, k={result.params.tournament_size}{result.params.seed != null ? `, seed=${result.params.seed}` : ''}{result.cached ? ' (hasil cache)' : ''}</div>
           <p style={{marginTop: 8}}><i>{result.fitness_explanation}</i></p>
           <div style={{marginTop: 8, color: result.schedule_count_ok ? '#16a34a' : '#dc2626'}}>
             {result.schedule_count_message}
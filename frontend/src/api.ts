@@ -3,6 +3,24 @@ export type GAParams = {
   population_size: number
   mutation_rate: number
   tournament_size: number
+  crossover?: 'one_point' | 'uniform'
+  crossover_rate?: number
+  targeted_mutation?: boolean
+  adaptive_rates?: boolean
+  islands?: number
+  migration_interval?: number
+  repair_budget?: number
+  engine?: 'ga' | 'sa' | 'tabu'
+  moves_per_generation?: number
+  init_strategy?: 'csp' | 'greedy'
+  room_decoder?: 'gene' | 'matching'
+  time_limit_s?: number | null
+  stall_generations?: number | null
+  stop_on_perfect?: boolean
+  seed?: number | null
+  profile?: boolean
+  decompose?: boolean
+  checkpoint_every?: number | null
 }
 
 export type AssignmentOut = {
@@ -46,6 +64,26 @@ export type GenerateResponse = {
   generated_total: number
   schedule_count_ok: boolean
   schedule_count_message: string
+  generations_run: number
+  stop_reason: 'max_generations' | 'perfect' | 'stall' | 'time_limit'
+  evaluations?: number
+  evaluation_cache_hits?: number
+  subproblems?: number
+  operators?: Record<'crossover' | 'mutation' | 'repair', OperatorStats>
+  operator_rates?: { mutation: number, crossover: number } | null
+  timings?: Record<string, number> | null
+  cached?: boolean
+  checkpoint_id?: string | null
+}
+
+// What a GA operator contributed over a run: children it produced (repair:
+// individuals changed), how many beat their better parent, by how much in
+// total, and how many new bests it took part in
+export type OperatorStats = {
+  applied: number
+  improved: number
+  gain: number
+  new_best: number
 }
 
 const API_BASE = 'http://localhost:8000'
@@ -65,3 +103,180 @@ export async function generate(params: GAParams) {
   if (!res.ok) throw new Error(await res.text())
   return res.json() as Promise<GenerateResponse>
 }
+
+export type RescheduleResponse = GenerateResponse & {
+  kept_total: number
+  affected_total: number
+  moved_total: number
+}
+
+// Re-plan from a previous `hasil` against the current data; still-valid
+// assignments are kept unless moving them removes a hard conflict
+export async function reschedule(previous: AssignmentOut[], params?: Partial<GAParams>, move_penalty?: number) {
+  const res = await fetch(`${API_BASE}/reschedule`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ previous, params, move_penalty })
+  })
+  if (!res.ok) throw new Error(await res.text())
+  return res.json() as Promise<RescheduleResponse>
+}
+
+export type JobProgress = {
+  generation: number
+  best_fitness: number
+  pelanggaran_keras: number
+}
+
+export type JobStatus = {
+  job_id: string
+  status: 'queued' | 'running' | 'done' | 'failed' | 'cancelled'
+  max_generations: number
+  progress?: JobProgress | null
+  error?: string | null
+  created_at: number
+  started_at?: number | null
+  finished_at?: number | null
+  checkpoint_id?: string | null
+}
+
+export async function submitJob(params: GAParams) {
+  const res = await fetch(`${API_BASE}/jobs`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(params)
+  })
+  if (!res.ok) throw new Error(await res.text())
+  return res.json() as Promise<JobStatus>
+}
+
+export async function getJob(jobId: string) {
+  const res = await fetch(`${API_BASE}/jobs/${jobId}`)
+  if (!res.ok) throw new Error(await res.text())
+  return res.json() as Promise<JobStatus>
+}
+
+export async function getJobResult(jobId: string) {
+  const res = await fetch(`${API_BASE}/jobs/${jobId}/result`)
+  if (!res.ok) throw new Error(await res.text())
+  return res.json() as Promise<GenerateResponse>
+}
+
+// Same run fields as GenerateResponse; `hasil` rows are [kelas, matkul,
+// dosen, ruangan, slot] ids (order in `kolom`) and `nama` maps ids to names
+export type CompactGenerateResponse = Omit<GenerateResponse, 'hasil' | 'hasil_readable' | 'evaluasi'> & {
+  kolom: string[]
+  hasil: [number, number, number, number, number][]
+  nama: Record<'kelas' | 'matkul' | 'dosen' | 'ruangan' | 'slot', Record<string, string>>
+  evaluasi: Omit<EvaluateOut, 'detail_keras_readable' | 'detail_lunak_readable'>
+}
+
+export async function getJobResultCompact(jobId: string) {
+  const res = await fetch(`${API_BASE}/jobs/${jobId}/result?format=compact`)
+  if (!res.ok) throw new Error(await res.text())
+  return res.json() as Promise<CompactGenerateResponse>
+}
+
+// Download URL of a finished job's schedule, whole or for one dosen/kelas/ruangan
+export function exportUrl(jobId: string, format: 'csv' | 'xlsx' | 'ics', by?: 'dosen' | 'kelas' | 'ruangan', id?: number) {
+  const q = new URLSearchParams({ format })
+  if (by) q.set('by', by)
+  if (id !== undefined) q.set('id', String(id))
+  return `${API_BASE}/jobs/${jobId}/export?${q}`
+}
+
+export async function cancelJob(jobId: string) {
+  const res = await fetch(`${API_BASE}/jobs/${jobId}/cancel`, { method: 'POST' })
+  if (!res.ok) throw new Error(await res.text())
+  return res.json() as Promise<JobStatus>
+}
+
+export type CheckpointInfo = {
+  run_id: string
+  generation: number
+  best_fitness: number
+  best_hard: number
+  saved_at: number
+  params: GAParams
+}
+
+export async function listCheckpoints() {
+  const res = await fetch(`${API_BASE}/checkpoints`)
+  if (!res.ok) throw new Error(await res.text())
+  return res.json() as Promise<CheckpointInfo[]>
+}
+
+// Continue a checkpointed run as a new job (optionally with more generations)
+export async function resumeCheckpoint(runId: string, overrides?: { max_generations?: number, time_limit_s?: number | null, stall_generations?: number | null, stop_on_perfect?: boolean }) {
+  const res = await fetch(`${API_BASE}/checkpoints/${runId}/resume`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(overrides ?? {})
+  })
+  if (!res.ok) throw new Error(await res.text())
+  return res.json() as Promise<JobStatus>
+}
+
+// Subscribe to per-generation progress (Server-Sent Events). onEnd receives
+// the terminal status: 'done' | 'failed' | 'cancelled'.
+export function watchJob(jobId: string, onProgress: (p: JobProgress) => void, onEnd: (status: string) => void) {
+  const es = new EventSource(`${API_BASE}/jobs/${jobId}/events`)
+  es.addEventListener('progress', e => onProgress(JSON.parse((e as MessageEvent).data)))
+  for (const status of ['done', 'failed', 'cancelled']) {
+    es.addEventListener(status, () => { es.close(); onEnd(status) })
+  }
+  return es
+}
+
+export type SweepRequest = {
+  params?: GAParams[] | null
+  base?: GAParams
+  seeds?: number[] | null
+}
+
+export type SweepRun = {
+  index: number
+  params: GAParams
+  fitness: number
+  pelanggaran_keras: number
+  pelanggaran_lunak: number
+  generations_run: number
+  stop_reason: string
+  seconds: number
+  cached?: boolean
+}
+
+export type SweepResponse = {
+  runs: SweepRun[]
+  best: GenerateResponse
+}
+
+// Run several parameter sets in parallel (default: every preset applied to
+// `base`). onRun gets each run as it finishes, onDone the ranked table and
+// the best full result. EventSource cannot POST, so the SSE body is read here.
+export async function sweep(req: SweepRequest, onRun: (r: SweepRun) => void, onDone: (r: SweepResponse) => void, signal?: AbortSignal) {
+  const res = await fetch(`${API_BASE}/sweep/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(req),
+    signal,
+  })
+  if (!res.ok || !res.body) throw new Error(await res.text())
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader()
+  let buffer = ''
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (done) return
+    buffer += value
+    let end: number
+    while ((end = buffer.indexOf('\n\n')) >= 0) {
+      const block = buffer.slice(0, end)
+      buffer = buffer.slice(end + 2)
+      const event = /^event: (.*)$/m.exec(block)?.[1]
+      const data = JSON.parse(/^data: (.*)$/m.exec(block)?.[1] ?? 'null')
+      if (event === 'run') onRun(data)
+      else if (event === 'done') onDone(data)
+      else if (event === 'failed') throw new Error(data.error)
+    }
+  }
+}